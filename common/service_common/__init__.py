@@ -0,0 +1,4 @@
+"""
+Code shared by the Poll Service and the User Service. Each service installs this
+package from ../common (see their requirements.txt) instead of keeping its own copy.
+"""
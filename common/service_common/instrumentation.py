@@ -0,0 +1,151 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+import httpx
+from databases import Database
+from prometheus_client import CollectorRegistry, Histogram, generate_latest, multiprocess
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests handled by this service",
+    ["method", "route", "status"],
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Latency of database queries, by the route that issued them and the pool that ran them",
+    ["route", "pool", "operation"],
+)
+OUTBOUND_LATENCY = Histogram(
+    "http_client_request_duration_seconds",
+    "Latency of outbound HTTP calls to other services, by the route that issued them",
+    ["route", "target", "method", "status"],
+)
+
+
+def render_latest() -> bytes:
+    """
+    Text exposition for /metrics. When PROMETHEUS_MULTIPROC_DIR is set (multi-worker
+    mode, see gunicorn.conf.py) the samples of every worker process are merged.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+
+_current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+
+
+def current_route() -> str:
+    """
+    Route template of the request being handled, e.g. '/questions/{question_id}'.
+    Work done outside a request (startup tasks, dispatchers) is labelled 'background'.
+    """
+    scope = _current_scope.get()
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per method, route template and status.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        token = _current_scope.set(scope)
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_LATENCY.labels(scope["method"], current_route(), str(status_code)).observe(
+                time.perf_counter() - start
+            )
+            _current_scope.reset(token)
+
+
+class InstrumentedDatabase(Database):
+    """
+    databases.Database that times every query and attributes it to the current route.
+    `pool` names the server it talks to ('primary' or 'replica') in the metric labels.
+    """
+
+    def __init__(self, url: str, pool: str = "primary", **options):
+        super().__init__(url, **options)
+        self._pool = pool
+
+    async def fetch_all(self, query, values: Optional[dict] = None):
+        start = time.perf_counter()
+        try:
+            return await super().fetch_all(query, values)
+        finally:
+            DB_QUERY_LATENCY.labels(current_route(), self._pool, "fetch_all").observe(time.perf_counter() - start)
+
+    async def fetch_one(self, query, values: Optional[dict] = None):
+        start = time.perf_counter()
+        try:
+            return await super().fetch_one(query, values)
+        finally:
+            DB_QUERY_LATENCY.labels(current_route(), self._pool, "fetch_one").observe(time.perf_counter() - start)
+
+    async def fetch_val(self, query, values: Optional[dict] = None, column=0):
+        start = time.perf_counter()
+        try:
+            return await super().fetch_val(query, values, column=column)
+        finally:
+            DB_QUERY_LATENCY.labels(current_route(), self._pool, "fetch_val").observe(time.perf_counter() - start)
+
+    async def execute(self, query, values: Optional[dict] = None):
+        start = time.perf_counter()
+        try:
+            return await super().execute(query, values)
+        finally:
+            DB_QUERY_LATENCY.labels(current_route(), self._pool, "execute").observe(time.perf_counter() - start)
+
+    async def execute_many(self, query, values: list):
+        start = time.perf_counter()
+        try:
+            return await super().execute_many(query, values)
+        finally:
+            DB_QUERY_LATENCY.labels(current_route(), self._pool, "execute_many").observe(time.perf_counter() - start)
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """
+    httpx transport that times outbound calls until the response headers arrive.
+    """
+
+    def __init__(self, target: str, **kwargs):
+        super().__init__(**kwargs)
+        self._target = target
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = await super().handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            OUTBOUND_LATENCY.labels(current_route(), self._target, request.method, status).observe(
+                time.perf_counter() - start
+            )
@@ -0,0 +1,229 @@
+"""
+Numbered schema migrations, applied in order and tracked in schema_migrations.
+
+A service keeps its migrations as NNN_name.sql or NNN_name.py files in one
+directory and binds the functions below to it (see migrations/runner.py in each
+service). A .py migration defines `async def upgrade(database)`.
+"""
+import argparse
+import asyncio
+import hashlib
+import importlib.util
+import os
+import re
+from typing import List, Optional
+
+from databases import Database
+
+MIGRATION_FILE = re.compile(r"^(\d+)_([\w-]+)\.(sql|py)$")
+LOCK_NAME = "schema_migrations"
+LOCK_TIMEOUT_SECONDS = 60
+
+
+class Migration:
+    def __init__(self, version: int, name: str, path: str):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, "rb") as f:
+            self.checksum = hashlib.sha256(f.read()).hexdigest()
+
+    @property
+    def is_python(self) -> bool:
+        return self.path.endswith(".py")
+
+
+def discover(directory: str) -> List[Migration]:
+    """
+    Find numbered migration files (e.g. 003_answer_indexes.sql or 004_backfill.py), ordered by version.
+    """
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    migrations.sort(key=lambda migration: migration.version)
+
+    versions = [migration.version for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise Exception(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Split a SQL script on ';', ignoring semicolons inside quotes and comments:
+    '--' and '#' to the end of the line, and /* ... */ blocks.
+    """
+    statements = []
+    current = []
+    quote = None
+    i = 0
+    while i < len(sql):
+        char = sql[i]
+        if quote:
+            current.append(char)
+            if char == "\\" and i + 1 < len(sql):
+                current.append(sql[i + 1])
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in ("'", '"', "`"):
+            quote = char
+            current.append(char)
+        elif sql.startswith("--", i) or char == "#":
+            newline = sql.find("\n", i)
+            i = len(sql) if newline == -1 else newline
+            continue
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            end = len(sql) if end == -1 else end + 2
+            # Executable /*! ... */ comments are SQL to MySQL and are kept; any other
+            # comment separates the tokens around it like whitespace.
+            current.append(sql[i:end] if sql.startswith("/*!", i) else " ")
+            i = end
+            continue
+        elif char == ";":
+            statements.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    statements.append("".join(current).strip())
+    return [statement for statement in statements if statement]
+
+
+async def backfill_in_batches(database: Database, table: str, statement: str,
+                              batch_size: int, pause_seconds: float) -> int:
+    """
+    Run `statement` once per primary-key range of `table`, committing after each batch and
+    pausing between batches so a backfill over millions of rows never holds long locks.
+    `statement` receives :batch_start and :batch_end (inclusive id bounds).
+    Returns the number of batches run.
+    """
+    bounds = await database.fetch_one(f"SELECT MIN(id) AS min_id, MAX(id) AS max_id FROM {table}")
+    if bounds is None or bounds["min_id"] is None:
+        return 0
+
+    batches = 0
+    for batch_start in range(bounds["min_id"], bounds["max_id"] + 1, batch_size):
+        await database.execute(statement, values={
+            "batch_start": batch_start,
+            "batch_end": batch_start + batch_size - 1,
+        })
+        batches += 1
+        if pause_seconds:
+            await asyncio.sleep(pause_seconds)
+    return batches
+
+
+async def _execute_raw(database: Database, statement: str) -> None:
+    # Bypass bind-parameter parsing so literal ':' in SQL files is left alone.
+    connection = database.connection().raw_connection
+    async with connection.cursor() as cursor:
+        await cursor.execute(statement)
+
+
+async def _ensure_version_table(database: Database) -> None:
+    await database.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+async def applied_migrations(database: Database) -> dict:
+    await _ensure_version_table(database)
+    results = await database.fetch_all("SELECT version, name, checksum, applied_at FROM schema_migrations")
+    return {record["version"]: dict(record) for record in results}
+
+
+async def _record(database: Database, migration: Migration) -> None:
+    await database.execute(
+        "INSERT INTO schema_migrations (version, name, checksum) VALUES (:version, :name, :checksum)",
+        values={"version": migration.version, "name": migration.name, "checksum": migration.checksum},
+    )
+
+
+async def _apply(database: Database, migration: Migration) -> None:
+    if migration.is_python:
+        spec = importlib.util.spec_from_file_location(f"migration_{migration.version}", migration.path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        await module.upgrade(database)
+    else:
+        with open(migration.path, encoding="utf-8") as f:
+            for statement in split_statements(f.read()):
+                await _execute_raw(database, statement)
+
+
+async def migrate(database: Database, directory: str, target: Optional[int] = None,
+                  baseline: Optional[int] = None) -> List[Migration]:
+    """
+    Apply pending migrations from `directory` in version order, up to `target` if given.
+    With `baseline`, mark every migration up to that version as applied without running it
+    (for databases created before the runner existed).
+    Holds a MySQL named lock so concurrent runners (e.g. several workers starting) apply each file once.
+    Returns the migrations that were applied or baselined.
+    """
+    migrations = discover(directory)
+    done = []
+    if baseline is not None:
+        target = baseline
+
+    async with database.connection():
+        acquired = await database.fetch_val(
+            "SELECT GET_LOCK(:name, :timeout)", values={"name": LOCK_NAME, "timeout": LOCK_TIMEOUT_SECONDS}
+        )
+        if acquired != 1:
+            raise Exception("Timed out waiting for the schema migration lock")
+        try:
+            applied = await applied_migrations(database)
+            for migration in migrations:
+                if target is not None and migration.version > target:
+                    break
+                if migration.version in applied:
+                    if applied[migration.version]["checksum"] != migration.checksum:
+                        print(f"Warning: migration {migration.version}_{migration.name} changed after it was applied")
+                    continue
+                if baseline is None:
+                    print(f"Applying migration {migration.version}_{migration.name}")
+                    await _apply(database, migration)
+                await _record(database, migration)
+                done.append(migration)
+        finally:
+            await database.fetch_val("SELECT RELEASE_LOCK(:name)", values={"name": LOCK_NAME})
+
+    return done
+
+
+async def cli(database: Database, directory: str, argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point behind each service's migrate.py.
+    """
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--status", action="store_true", help="list migrations without applying them")
+    parser.add_argument("--target", type=int, help="highest version to apply")
+    parser.add_argument("--baseline", type=int, help="record versions up to this one as applied without running them")
+    args = parser.parse_args(argv)
+
+    await database.connect()
+    try:
+        if args.status:
+            applied = await applied_migrations(database)
+            for migration in discover(directory):
+                record = applied.get(migration.version)
+                state = f"applied {record['applied_at']}" if record else "pending"
+                if record and record["checksum"] != migration.checksum:
+                    state += " (file changed since)"
+                print(f"{migration.version:>4}  {migration.name:<40} {state}")
+            return 0
+
+        done = await migrate(database, directory, target=args.target, baseline=args.baseline)
+        print(f"{len(done)} migration(s) {'baselined' if args.baseline is not None else 'applied'}")
+        return 0
+    finally:
+        await database.disconnect()
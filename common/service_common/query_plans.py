@@ -0,0 +1,94 @@
+"""
+EXPLAIN every statement a piece of code sends to MySQL, for the services'
+query-plan tests.
+
+    with PlanRecorder(database) as recorder:
+        await answer_repository.get_answers_by_question(1)
+    assert not full_scans(recorder.statements)
+"""
+from typing import List, Optional, Tuple
+
+import aiomysql
+from databases import Database
+
+# Plan access types that read every row of a table (ALL) or of an index (index).
+FULL_SCAN_TYPES = ("ALL", "index")
+
+_METHODS = ("fetch_all", "fetch_one", "fetch_val", "execute", "fetch_rows")
+
+
+def is_explainable(query: str) -> bool:
+    statement = " ".join(query.split()).upper()
+    if statement.startswith("SELECT"):
+        return " FROM " in statement
+    if statement.startswith("INSERT"):
+        return " SELECT " in statement
+    return statement.startswith(("UPDATE", "DELETE"))
+
+
+class PlanRecorder:
+    """
+    Wraps a Database so every SELECT, UPDATE, DELETE and INSERT ... SELECT it runs
+    is EXPLAINed first, on the same connection and inside the same transaction.
+    `statements` collects (query, plan rows) pairs; plan rows are dicts keyed by
+    EXPLAIN's column names (id, select_type, table, type, possible_keys, key, ...).
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+        self.statements: List[Tuple[str, List[dict]]] = []
+        self._originals = {}
+
+    def __enter__(self) -> "PlanRecorder":
+        for name in _METHODS:
+            if hasattr(self.database, name):
+                self._originals[name] = getattr(self.database, name)
+                setattr(self.database, name, self._explaining(name))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        # The wrappers are instance attributes shadowing the class methods.
+        for name in self._originals:
+            delattr(self.database, name)
+        self._originals = {}
+
+    def _explaining(self, name: str):
+        original = self._originals[name]
+
+        async def run(query, values: Optional[dict] = None, **kwargs):
+            if isinstance(query, str) and is_explainable(query):
+                self.statements.append((query, await self._explain(name, query, values)))
+            return await original(query, values, **kwargs)
+        return run
+
+    async def _explain(self, name: str, query: str, values: Optional[dict]) -> List[dict]:
+        if name == "fetch_rows":
+            # Driver-level query with %(name)s placeholders.
+            async with self.database.connection() as connection:
+                async with connection.raw_connection.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute("EXPLAIN " + query, values)
+                    return list(await cursor.fetchall())
+        rows = await self._originals["fetch_all"]("EXPLAIN " + query, values)
+        return [dict(row) for row in rows]
+
+
+def full_scans(statements: List[Tuple[str, List[dict]]]) -> List[str]:
+    """
+    Describe every plan row that reads a whole table or a whole index. Derived and
+    union result tables (<derived2>, <union1,2>) are skipped; the tables they are
+    built from are separate plan rows.
+    """
+    problems = []
+    for query, rows in statements:
+        for row in rows:
+            table = row.get("table") or ""
+            if row.get("type") in FULL_SCAN_TYPES and not table.startswith("<"):
+                problems.append(f"type {row['type']} on {table} (key {row.get('key')}): {' '.join(query.split())}")
+    return problems
+
+
+def plan_rows(statements: List[Tuple[str, List[dict]]], table: str) -> List[dict]:
+    """
+    Every plan row that reads `table`, across all recorded statements.
+    """
+    return [row for _, rows in statements for row in rows if row.get("table") == table]
@@ -0,0 +1,127 @@
+"""
+Fixtures for the services' tests; each service's tests/conftest.py loads them
+with `pytest_plugins = ["service_common.testing"]`.
+
+Database-backed tests run only against a dedicated MySQL database named by
+TEST_DATABASE_URL (same form as DATABASE_URL); they migrate it, seed it and commit
+to it. Without the variable they are skipped.
+"""
+import asyncio
+import os
+from typing import Awaitable, Callable, List, Optional, Sequence, TypeVar
+
+import pytest
+from databases import Database
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+T = TypeVar("T")
+
+
+def use_test_database() -> Optional[str]:
+    """
+    Point the service configuration at TEST_DATABASE_URL, with no replica and no
+    shared store. Call from conftest.py before any service module is imported.
+    """
+    if TEST_DATABASE_URL:
+        os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    os.environ["DATABASE_REPLICA_URL"] = ""
+    os.environ["SHARED_STORE_URL"] = ""
+    os.environ["RUN_MIGRATIONS_ON_STARTUP"] = "false"
+    return TEST_DATABASE_URL
+
+
+def require_test_database() -> None:
+    if not TEST_DATABASE_URL:
+        pytest.skip("set TEST_DATABASE_URL to a dedicated MySQL database to run database tests")
+
+
+@pytest.fixture(scope="session")
+def run():
+    """
+    Run a coroutine to completion on one event loop shared by the whole session,
+    which the connection pools opened by other fixtures are bound to.
+    """
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def db(run):
+    """
+    The service's primary database, connected and migrated to the latest version.
+    Relies on the service's own repository.database and migrations.runner modules.
+    """
+    require_test_database()
+    from repository.database import database
+    from migrations import runner
+
+    run(database.connect())
+    run(runner.migrate(database))
+    yield database
+    run(database.disconnect())
+
+
+async def rolled_back(database: Database, work: Callable[[], Awaitable[T]]) -> T:
+    """
+    Await `work()` inside a transaction that is rolled back afterwards, so the
+    writes it makes leave no trace. Everything `work` runs in this task uses the
+    transaction's connection.
+    """
+    transaction = database.transaction()
+    await transaction.start()
+    try:
+        return await work()
+    finally:
+        await transaction.rollback()
+
+
+class _CannedCursor:
+    def __init__(self, columns: Sequence[str], rows: List[tuple]):
+        # (name, type_code, display_size, internal_size, precision, scale, null_ok), as aiomysql reports it.
+        self.description = [(name, 253, None, None, None, None, True) for name in columns]
+        self._rows = rows
+
+    async def execute(self, query, args=None) -> None:
+        pass
+
+    async def fetchall(self) -> List[tuple]:
+        return list(self._rows)
+
+    async def fetchone(self) -> Optional[tuple]:
+        return self._rows[0] if self._rows else None
+
+    async def close(self) -> None:
+        pass
+
+
+class _CannedConnection:
+    def __init__(self, columns: Sequence[str], rows: List[tuple]):
+        self._columns = columns
+        self._rows = rows
+
+    async def cursor(self) -> _CannedCursor:
+        return _CannedCursor(self._columns, self._rows)
+
+
+class _CannedPool:
+    def __init__(self, columns: Sequence[str], rows: List[tuple]):
+        self._connection = _CannedConnection(columns, rows)
+
+    async def acquire(self) -> _CannedConnection:
+        return self._connection
+
+    async def release(self, connection) -> None:
+        pass
+
+
+async def fetch_canned(columns: Sequence[str], rows: List[tuple]) -> list:
+    """
+    Records exactly as databases' MySQL backend builds them from a cursor that
+    returned `rows`, without a server: for testing code that maps records.
+    """
+    database = Database("mysql://test@localhost/test")
+    database._backend._pool = _CannedPool(columns, rows)
+    database.is_connected = True
+    return await database.fetch_all(f"SELECT {', '.join(columns)} FROM canned")
@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("databases")
+
+from service_common.migrations import split_statements
+
+
+def test_splits_on_semicolons():
+    assert split_statements("CREATE TABLE a (id INT);\nCREATE TABLE b (id INT);") == [
+        "CREATE TABLE a (id INT)",
+        "CREATE TABLE b (id INT)",
+    ]
+
+
+def test_ignores_semicolons_in_quotes():
+    sql = "INSERT INTO t VALUES ('a;b', \"c;d\", 'it\\'s;');SELECT `odd;name` FROM t"
+    assert split_statements(sql) == [
+        "INSERT INTO t VALUES ('a;b', \"c;d\", 'it\\'s;')",
+        "SELECT `odd;name` FROM t",
+    ]
+
+
+@pytest.mark.parametrize("comment", [
+    "-- drop it; really\n",
+    "# drop it; really\n",
+    "/* drop it; really */",
+    "/* spans\n   two; lines */",
+])
+def test_ignores_semicolons_in_comments(comment):
+    assert split_statements(f"{comment}SELECT 1;\nSELECT 2") == ["SELECT 1", "SELECT 2"]
+
+
+def test_block_comment_separates_tokens():
+    assert split_statements("SELECT/* x */1") == ["SELECT 1"]
+
+
+def test_keeps_executable_comments():
+    assert split_statements("CREATE TABLE t (id INT) /*!80016 ENGINE=InnoDB */;") == [
+        "CREATE TABLE t (id INT) /*!80016 ENGINE=InnoDB */"
+    ]
+
+
+def test_comment_markers_inside_quotes_are_text():
+    assert split_statements("SELECT '#1', '-- x', '/* y */'") == ["SELECT '#1', '-- x', '/* y */'"]
+
+
+def test_drops_empty_statements():
+    assert split_statements(";;\n-- only a comment\n;") == []
@@ -1,25 +1,152 @@
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
 import httpx
+from cache.ttl_lru_cache import TTLLRUCache
+from cache.shared_store import SharedCache
 from config.config import Config
+from service_common.instrumentation import InstrumentedTransport
 
 config = Config()
 
+_client: Optional[httpx.AsyncClient] = None
+
+VERIFY_BATCH_SIZE = 1000
+
+registration_cache = SharedCache(
+    "poll:registrations",
+    TTLLRUCache(
+        max_size=config.USER_REGISTRATION_CACHE_MAX_SIZE,
+        ttl_seconds=config.USER_REGISTRATION_CACHE_TTL_SECONDS,
+        enabled=config.USER_REGISTRATION_CACHE_ENABLED,
+        name="registrations",
+    ),
+    encode=json.dumps,
+    decode=json.loads,
+)
+
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=config.USER_SERVICE_BASE_URL,
+        timeout=httpx.Timeout(
+            config.USER_SERVICE_TIMEOUT_SECONDS,
+            connect=config.USER_SERVICE_CONNECT_TIMEOUT_SECONDS,
+        ),
+        transport=InstrumentedTransport(
+            "user-service",
+            http2=config.USER_SERVICE_HTTP2,
+            limits=httpx.Limits(
+                max_connections=config.USER_SERVICE_MAX_CONNECTIONS,
+                max_keepalive_connections=config.USER_SERVICE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config.USER_SERVICE_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        ),
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the shared User Service client, creating it on first use.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+    return _client
+
+
+async def start_client() -> None:
+    get_client()
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 async def verify_user_registered(user_id: int) -> dict:
     """
     Verify if a user exists and is registered in the User Service.
     Returns dict with 'exists' and 'is_registered' fields.
+    Existing users are served from the local registration cache, which the
+    User Service invalidates on every change; the TTL covers missed events.
     Raises exception if User Service is unavailable.
     """
-    url = f"{config.USER_SERVICE_BASE_URL}/users/{user_id}/verify"
-    async with httpx.AsyncClient() as client:
+    cached = await registration_cache.get(user_id)
+    if cached is not None:
+        return dict(cached)
+
+    generation = await registration_cache.generation()
+    url = f"/users/{user_id}/verify"
+    try:
+        response = await get_client().get(url)
+        response.raise_for_status()
+        user_info = response.json()
+        await registration_cache.set(user_id, user_info, generation)
+        return dict(user_info)
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code == 404:
+            return {"exists": False, "is_registered": False}
+        raise Exception(f"User Service error: {exc}")
+    except httpx.RequestError as exc:
+        raise Exception(f"Cannot connect to User Service: {exc}")
+
+
+async def verify_users_registered(user_ids: List[int]) -> Dict[int, dict]:
+    """
+    Verify many users at once. Returns dict mapping user_id to the same
+    'exists'/'is_registered' dict as verify_user_registered.
+    Cached users are answered from the cache; the rest are resolved with batched
+    calls to the User Service verify-batch endpoint.
+    Raises exception if User Service is unavailable.
+    """
+    unique_ids = list(dict.fromkeys(user_ids))
+    generation = await registration_cache.generation()
+    cached = await registration_cache.get_many(unique_ids)
+    result = {user_id: dict(user_info) for user_id, user_info in cached.items()}
+    missing = [user_id for user_id in unique_ids if user_id not in result]
+
+    for start in range(0, len(missing), VERIFY_BATCH_SIZE):
+        chunk = missing[start:start + VERIFY_BATCH_SIZE]
         try:
-            response = await client.get(url)
+            response = await get_client().post("/users/verify-batch", json={"user_ids": chunk})
             response.raise_for_status()
-            return response.json()
         except httpx.HTTPStatusError as exc:
-            if exc.response.status_code == 404:
-                return {"exists": False, "is_registered": False}
             raise Exception(f"User Service error: {exc}")
         except httpx.RequestError as exc:
             raise Exception(f"Cannot connect to User Service: {exc}")
 
+        for user_info in response.json():
+            user_id = user_info["user_id"]
+            result[user_id] = {"exists": user_info["exists"], "is_registered": user_info["is_registered"]}
+            if user_info["exists"]:
+                await registration_cache.set(user_id, user_info, generation)
+
+    return result
+
+
+async def invalidate_registrations(user_ids: Iterable[int]) -> None:
+    """
+    Drop cached registration status for the given users.
+    """
+    await registration_cache.invalidate(*user_ids)
+
+
+async def get_user_changes(since: datetime, after_id: int, limit: int) -> List[dict]:
+    """
+    Fetch one page of users created or changed since `since`, ordered by (updated_at, id).
+    Each dict has 'id', 'age', 'joining_date', 'is_registered' and 'updated_at'.
+    Raises exception if User Service is unavailable.
+    """
+    params = {"since": since.isoformat(), "after_id": after_id, "limit": limit}
+    try:
+        response = await get_client().get("/users/changes", params=params)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as exc:
+        raise Exception(f"User Service error: {exc}")
+    except httpx.RequestError as exc:
+        raise Exception(f"Cannot connect to User Service: {exc}")
@@ -0,0 +1,132 @@
+"""
+Load test: POST /answers latency with the pooled User Service client versus a
+new connection per verification, against a local stub User Service.
+
+Starts the stub (this module's `stub` app) and then the Poll Service twice under
+uvicorn, once with keep-alive disabled (USER_SERVICE_MAX_KEEPALIVE_CONNECTIONS=0,
+so every verify call opens a new connection, as the per-call clients did) and once
+with the pooled defaults. The registration cache and background refresh are off
+so every submission calls the stub. Prints p50/p99 per mode.
+
+Needs a migrated MySQL database (TEST_DATABASE_URL or DATABASE_URL); the question
+it answers is created first and deleted at the end together with its answers.
+
+Usage:
+    python benchmarks/answers_load_test.py
+    python benchmarks/answers_load_test.py --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+from service_common.testing import use_test_database  # noqa: E402
+
+STUB_PORT = 8101
+POLL_PORT = 8102
+USER_ID_START = 600000
+
+stub = FastAPI()
+
+
+@stub.get("/users/{user_id}/verify")
+async def verify(user_id: int):
+    return {"user_id": user_id, "exists": True, "is_registered": True}
+
+
+def _start(app: str, port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        cwd=SERVICE_DIR, env=env,
+    )
+
+
+async def _wait_until_up(url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise Exception(f"{url} did not come up")
+
+
+def _percentile(latencies: list, fraction: float) -> float:
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def _load(question_id: int, first_user_id: int, requests: int, concurrency: int) -> list:
+    latencies = []
+    user_ids = iter(range(first_user_id, first_user_id + requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{POLL_PORT}", limits=limits) as client:
+        async def worker():
+            for user_id in user_ids:
+                body = {"user_id": user_id, "question_id": question_id, "selected_option": user_id % 4 + 1}
+                started = time.perf_counter()
+                response = await client.post("/answers", json=body)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def main(requests: int, concurrency: int) -> None:
+    use_test_database()
+    from model.question import QuestionCreate
+    from repository.database import database
+    from repository import question_repository
+
+    env = dict(
+        os.environ,
+        USER_SERVICE_BASE_URL=f"http://127.0.0.1:{STUB_PORT}",
+        USER_REGISTRATION_CACHE_ENABLED="false",
+        USER_ATTRIBUTES_REFRESH_ENABLED="false",
+    )
+    modes = [
+        ("new connection per call", {"USER_SERVICE_MAX_KEEPALIVE_CONNECTIONS": "0"}),
+        ("pooled keep-alive", {}),
+    ]
+
+    await database.connect()
+    question_id = await question_repository.create_question(QuestionCreate(
+        title="Load test question", option_1="a", option_2="b", option_3="c", option_4="d"
+    ))
+    stub_process = _start("benchmarks.answers_load_test:stub", STUB_PORT, env)
+    try:
+        await _wait_until_up(f"http://127.0.0.1:{STUB_PORT}/docs")
+        print(f"{requests} POST /answers at concurrency {concurrency}")
+        for i, (name, overrides) in enumerate(modes):
+            poll_process = _start("main:app", POLL_PORT, dict(env, **overrides))
+            try:
+                await _wait_until_up(f"http://127.0.0.1:{POLL_PORT}/")
+                latencies = await _load(question_id, USER_ID_START + i * requests, requests, concurrency)
+            finally:
+                poll_process.terminate()
+                poll_process.wait()
+            print(f"{name:>24}: p50 {_percentile(latencies, 0.50) * 1000:7.2f} ms"
+                  f"  p99 {_percentile(latencies, 0.99) * 1000:7.2f} ms")
+    finally:
+        stub_process.terminate()
+        stub_process.wait()
+        # Cascades to the answers the load test created.
+        await question_repository.delete_question(question_id)
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="POST /answers latency, pooled vs per-call connections")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
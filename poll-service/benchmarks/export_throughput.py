@@ -0,0 +1,100 @@
+"""
+Benchmark: rows/sec of the answer export per format, with and without gzip.
+
+By default rows come from answer_repository.iter_answer_rows against a populated
+database, as GET /export/answers reads them (benchmarks/timeseries.py seeds 10M
+answers). With --encoder-only, synthetic batches of --rows rows are encoded
+without a database, isolating the encoders. Peak RSS is printed after each run;
+it should stay flat as the row count grows.
+
+Uses TEST_DATABASE_URL if set, otherwise DATABASE_URL.
+
+Usage:
+    python benchmarks/export_throughput.py
+    python benchmarks/export_throughput.py --question-id 42
+    python benchmarks/export_throughput.py --encoder-only --rows 2000000
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service_common.testing import use_test_database  # noqa: E402
+
+use_test_database()
+
+from config.config import Config  # noqa: E402
+from repository.database import database  # noqa: E402
+from repository import answer_repository  # noqa: E402
+from service import export  # noqa: E402
+
+config = Config()
+
+
+def _synthetic_batch() -> list:
+    moment = datetime(2024, 1, 1)
+    return [
+        (i, 1000000 + i, 1 + i % 500, 1 + i % 4, moment + timedelta(seconds=i), moment + timedelta(seconds=i))
+        for i in range(config.EXPORT_BATCH_SIZE)
+    ]
+
+
+async def _synthetic_batches(batch: list, rows: int):
+    # The same prebuilt batch over and over, so only encoding is timed.
+    for batch_start in range(0, rows, len(batch)):
+        yield batch[:rows - batch_start]
+
+
+async def _counted(batches, counter: dict):
+    async for batch in batches:
+        counter["rows"] += len(batch)
+        yield batch
+
+
+async def _run(make_batches, format: str, compress: bool) -> tuple:
+    counter = {"rows": 0}
+    size = 0
+    started = time.perf_counter()
+    async for chunk in export.encode(_counted(make_batches(), counter), export.ANSWER_COLUMNS, format, compress):
+        size += len(chunk)
+    return counter["rows"], size, time.perf_counter() - started
+
+
+async def main(encoder_only: bool, rows: int, question_id) -> None:
+    if encoder_only:
+        batch = _synthetic_batch()
+
+        def make_batches():
+            return _synthetic_batches(batch, rows)
+    else:
+        await database.connect()
+
+        def make_batches():
+            return answer_repository.iter_answer_rows(question_id)
+
+    formats = ["csv", "ndjson"] + (["parquet"] if export.parquet_available() else [])
+    try:
+        print(f"{'format':>8} {'gzip':>5} {'rows':>12} {'MB':>9} {'rows/s':>12} {'peak RSS MB':>12}")
+        for format in formats:
+            for compress in (False, True):
+                count, size, seconds = await _run(make_batches, format, compress)
+                peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+                print(f"{format:>8} {'yes' if compress else 'no':>5} {count:>12,} {size / 1e6:>9.1f} "
+                      f"{count / seconds:>12,.0f} {peak_mb:>12.0f}")
+    finally:
+        if not encoder_only:
+            await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer export throughput per format")
+    parser.add_argument("--encoder-only", action="store_true", help="encode synthetic rows without a database")
+    parser.add_argument("--rows", type=int, default=1000000, help="synthetic rows for --encoder-only")
+    parser.add_argument("--question-id", type=int, help="export one question instead of every answer")
+    args = parser.parse_args()
+    asyncio.run(main(args.encoder_only, args.rows, args.question_id))
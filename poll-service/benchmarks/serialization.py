@@ -0,0 +1,75 @@
+"""
+Microbenchmark: turn N question rows into a GET /questions response body, the way
+the service did before rows were trusted and the way it does now.
+
+  before: Question(**dict(record)) -> QuestionResponse(**q.dict()) -> FastAPI
+          response_model validation and jsonable serialization -> JSONResponse
+  after:  Question.model_construct(**record._mapping) -> TypeAdapter.dump_json
+
+Rows are databases 0.9.0 Records built by its MySQL backend from canned cursor
+results, so no server is needed.
+
+Usage:
+    python benchmarks/serialization.py            # 100000 rows
+    python benchmarks/serialization.py --rows 10000 --repeat 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from service_common.testing import fetch_canned  # noqa: E402
+from model.question import Question, QuestionResponse  # noqa: E402
+from repository import question_repository  # noqa: E402
+
+_RESPONSE_FIELD = create_response_field(name="Response_get_all_questions", type_=List[QuestionResponse])
+_QUESTION_LIST = TypeAdapter(List[Question])
+
+
+async def before(records) -> bytes:
+    questions = [Question(**dict(record)) for record in records]
+    responses = [QuestionResponse(**question.dict()) for question in questions]
+    content = await serialize_response(field=_RESPONSE_FIELD, response_content=responses)
+    return JSONResponse(content).body
+
+
+async def after(records) -> bytes:
+    questions = [question_repository._to_question(record) for record in records]
+    return _QUESTION_LIST.dump_json(questions)
+
+
+async def main(rows: int, repeat: int) -> None:
+    columns = [column.strip() for column in question_repository._COLUMNS.split(",")]
+    records = await fetch_canned(columns, [
+        (i, f"Question number {i}?", "Option one", "Option two", "Option three", "Option four")
+        for i in range(1, rows + 1)
+    ])
+
+    timings = {}
+    for name, path in (("before", before), ("after", after)):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = await path(records)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+        print(f"{name:>6}: {best * 1000:8.1f} ms  ({rows / best:>10,.0f} rows/s, {len(body):,} bytes)")
+    print(f"speedup: {timings['before'] / timings['after']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time building a GET /questions body from N rows")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,120 @@
+"""
+Benchmark: database round trips and latency of API 5 (/statistics/all-questions)
+as the number of questions grows, for the old per-question loop (2N+1 queries)
+and the grouped query in poll_service.get_all_questions_statistics.
+
+Questions and answers are added inside a transaction that is rolled back, so any
+scratch database with the schema migrated will do. Uses TEST_DATABASE_URL if set,
+otherwise DATABASE_URL; replica and shared store are disabled so every read sees
+the seeded rows.
+
+Usage:
+    python benchmarks/statistics_round_trips.py
+    python benchmarks/statistics_round_trips.py --questions 10 100 1000 10000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service_common.testing import rolled_back, use_test_database  # noqa: E402
+
+use_test_database()
+
+from model.answer import AnswerCreate  # noqa: E402
+from repository.database import database  # noqa: E402
+from repository import answer_repository, question_repository  # noqa: E402
+from service import poll_service  # noqa: E402
+
+ANSWERS_PER_QUESTION = 3
+_METHODS = ("fetch_all", "fetch_one", "fetch_val", "execute", "iterate")
+
+
+class RoundTrips:
+    """
+    Counts statements sent through `database` while active.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self) -> "RoundTrips":
+        for name in _METHODS:
+            setattr(database, name, self._counting(getattr(database, name)))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for name in _METHODS:
+            delattr(database, name)
+
+    def _counting(self, original):
+        def run(*args, **kwargs):
+            self.count += 1
+            return original(*args, **kwargs)
+        return run
+
+
+async def per_question_loop() -> list:
+    # API 5 before the grouped query: two queries per question.
+    result = []
+    for question in await question_repository.get_all():
+        counts = await answer_repository.get_option_counts_for_question(question.id)
+        total = await answer_repository.count_answers_by_question(question.id)
+        result.append((question.id, counts, total))
+    return result
+
+
+async def _seed(questions: int) -> None:
+    await database.execute(f"""
+        INSERT /*+ SET_VAR(cte_max_recursion_depth = {questions}) */
+        INTO questions (title, option_1, option_2, option_3, option_4)
+        WITH RECURSIVE seq (n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < {questions})
+        SELECT CONCAT('Benchmark question ', n), 'a', 'b', 'c', 'd' FROM seq
+    """)
+    question_ids = [
+        record["id"]
+        for record in await database.fetch_all(
+            "SELECT id FROM questions ORDER BY id DESC LIMIT :limit", values={"limit": questions}
+        )
+    ]
+    await answer_repository.create_answers_bulk([
+        AnswerCreate(user_id=800000 + user, question_id=question_id, selected_option=user + 1)
+        for question_id in question_ids
+        for user in range(ANSWERS_PER_QUESTION)
+    ])
+
+
+async def _measure(path) -> tuple:
+    await question_repository.question_cache.clear()
+    with RoundTrips() as round_trips:
+        started = time.perf_counter()
+        await path()
+        elapsed = time.perf_counter() - started
+    return round_trips.count, elapsed
+
+
+async def main(sizes) -> None:
+    await database.connect()
+    try:
+        print(f"{'questions':>10} {'loop trips':>11} {'loop ms':>9} {'grouped trips':>14} {'grouped ms':>11}")
+        for questions in sizes:
+            async def run_size():
+                await _seed(questions)
+                total = await database.fetch_val("SELECT COUNT(*) FROM questions")
+                loop_trips, loop_seconds = await _measure(per_question_loop)
+                grouped_trips, grouped_seconds = await _measure(poll_service.get_all_questions_statistics)
+                print(f"{total:>10} {loop_trips:>11} {loop_seconds * 1000:>9.1f} "
+                      f"{grouped_trips:>14} {grouped_seconds * 1000:>11.1f}")
+            await rolled_back(database, run_size)
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Round trips of API 5 by number of questions")
+    parser.add_argument("--questions", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    args = parser.parse_args()
+    asyncio.run(main(args.questions))
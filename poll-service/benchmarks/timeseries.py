@@ -0,0 +1,157 @@
+"""
+Benchmark: /statistics/questions/{id}/timeseries from answer_rollups versus the
+same buckets computed ad hoc from answers, over a synthetic 10M-answer dataset.
+
+The first run seeds QUESTIONS benchmark questions and spreads the answers evenly
+over 90 days, then builds their rollups and option counts; later runs reuse them.
+Each query shape is timed over one question at minute (1 day), hour (30 days)
+and day (90 days) granularity, best of --repeat runs.
+
+Uses TEST_DATABASE_URL if set, otherwise DATABASE_URL; the database must be
+migrated. Seeding 10M rows takes several minutes and about 1 GB.
+
+Usage:
+    python benchmarks/timeseries.py
+    python benchmarks/timeseries.py --answers 1000000 --repeat 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service_common import migrations  # noqa: E402
+from service_common.testing import use_test_database  # noqa: E402
+
+use_test_database()
+
+from repository.database import database  # noqa: E402
+from repository import answer_repository  # noqa: E402
+from service import poll_service  # noqa: E402
+
+QUESTIONS = 10
+TITLE = "Timeseries benchmark question"
+USER_ID_START = 3000000
+SEED_BATCH = 500000
+SPAN = timedelta(days=90)
+FIRST_ANSWER_AT = datetime(2024, 1, 1)
+
+AD_HOC = """
+    SELECT FLOOR(TIMESTAMPDIFF(SECOND, :origin, created_at) / :width_seconds) AS bucket,
+           selected_option,
+           COUNT(*) AS count
+    FROM answers
+    WHERE question_id = :question_id
+      AND created_at >= :origin
+      AND created_at < :end
+    GROUP BY bucket, selected_option
+"""
+
+SHAPES = [
+    ("minute", timedelta(minutes=1), timedelta(days=1)),
+    ("hour", timedelta(hours=1), timedelta(days=30)),
+    ("day", timedelta(days=1), timedelta(days=90)),
+]
+
+
+async def _seed(answers: int) -> list:
+    question_ids = [record["id"] for record in await database.fetch_all(
+        "SELECT id FROM questions WHERE title = :title ORDER BY id", values={"title": TITLE}
+    )]
+    if question_ids:
+        return question_ids
+
+    for _ in range(QUESTIONS):
+        await database.execute(
+            "INSERT INTO questions (title, option_1, option_2, option_3, option_4) "
+            "VALUES (:title, 'a', 'b', 'c', 'd')",
+            values={"title": TITLE},
+        )
+    question_ids = [record["id"] for record in await database.fetch_all(
+        "SELECT id FROM questions WHERE title = :title ORDER BY id", values={"title": TITLE}
+    )]
+
+    seconds_per_answer = SPAN.total_seconds() / answers
+    for batch_start in range(0, answers, SEED_BATCH):
+        rows = min(SEED_BATCH, answers - batch_start)
+        await database.execute(f"""
+            INSERT /*+ SET_VAR(cte_max_recursion_depth = {rows}) */
+            INTO answers (user_id, question_id, selected_option, created_at)
+            WITH RECURSIVE seq (n) AS (
+                SELECT {batch_start} UNION ALL SELECT n + 1 FROM seq WHERE n < {batch_start + rows - 1}
+            )
+            SELECT {USER_ID_START} + n DIV {QUESTIONS},
+                   {question_ids[0]} + n % {QUESTIONS},
+                   1 + (n DIV {QUESTIONS}) % 4,
+                   TIMESTAMP('{FIRST_ANSWER_AT}') + INTERVAL FLOOR(n * {seconds_per_answer}) SECOND
+            FROM seq
+        """)
+        print(f"seeded {batch_start + rows:,} answers")
+
+    # Rollups and option counts for the seeded answers, as answer_repository keeps them.
+    in_seed = f"a.question_id BETWEEN {question_ids[0]} AND {question_ids[-1]}"
+    rollup_batch = answer_repository._ROLLUP_UPSERT.format(
+        sign="", where=f"{in_seed} AND a.id BETWEEN :batch_start AND :batch_end"
+    )
+    await migrations.backfill_in_batches(database, "answers", rollup_batch, batch_size=100000, pause_seconds=0)
+    await database.execute(f"""
+        INSERT INTO question_option_counts (question_id, selected_option, answer_count)
+        SELECT a.question_id, a.selected_option, COUNT(*)
+        FROM answers a
+        WHERE {in_seed}
+        GROUP BY a.question_id, a.selected_option
+    """)
+    await database.execute("ANALYZE TABLE answers, answer_rollups")
+    return question_ids
+
+
+async def _best(repeat: int, call) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+async def main(answers: int, repeat: int) -> None:
+    await database.connect()
+    try:
+        question_ids = await _seed(answers)
+        question_id = question_ids[0]
+        total = await database.fetch_val(
+            "SELECT COUNT(*) FROM answers WHERE question_id BETWEEN :first AND :last",
+            values={"first": question_ids[0], "last": question_ids[-1]},
+        )
+        print(f"{total:,} benchmark answers; timing question {question_id}")
+        print(f"{'granularity':>11} {'range':>8} {'buckets':>8} {'ad hoc ms':>10} {'rollups ms':>11}")
+        for granularity, width, length in SHAPES:
+            end = FIRST_ANSWER_AT + length
+
+            async def ad_hoc():
+                await database.fetch_all(AD_HOC, values={
+                    "question_id": question_id, "origin": FIRST_ANSWER_AT, "end": end,
+                    "width_seconds": int(width.total_seconds()),
+                })
+
+            async def rollups():
+                await poll_service.get_question_timeseries(question_id, granularity, 1, FIRST_ANSWER_AT, end)
+
+            ad_hoc_seconds = await _best(repeat, ad_hoc)
+            rollup_seconds = await _best(repeat, rollups)
+            print(f"{granularity:>11} {length.days:>6} d {length // width:>8} "
+                  f"{ad_hoc_seconds * 1000:>10.1f} {rollup_seconds * 1000:>11.1f}")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Timeseries from rollups vs ad hoc over many answers")
+    parser.add_argument("--answers", type=int, default=10000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.answers, args.repeat))
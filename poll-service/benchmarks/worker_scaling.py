@@ -0,0 +1,109 @@
+"""
+Benchmark: throughput of POST /answers and GET /statistics/all-questions as the
+number of gunicorn workers grows from 1 to N.
+
+For each worker count the Poll Service is started with gunicorn.conf.py, and each
+endpoint is driven for a fixed time by concurrent clients; successful requests per
+second are reported. Submissions verify users against the stub User Service from
+answers_load_test.py, and every submission uses a new user id so none is a
+duplicate.
+
+Uses the service's own configuration: DATABASE_URL must point at a migrated
+database and SHARED_STORE_URL at Redis (required for more than one worker). The
+question it answers is deleted at the end together with its answers.
+
+Usage:
+    python benchmarks/worker_scaling.py
+    python benchmarks/worker_scaling.py --max-workers 8 --seconds 20 --concurrency 128
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+from benchmarks.answers_load_test import STUB_PORT, USER_ID_START, _start, _wait_until_up  # noqa: E402
+from model.question import QuestionCreate  # noqa: E402
+from repository.database import database  # noqa: E402
+from repository import question_repository  # noqa: E402
+
+POLL_PORT = 8103
+
+
+async def _drive(request, seconds: float, concurrency: int) -> float:
+    """
+    Call `request(client)` from `concurrency` clients for `seconds`; return successes per second.
+    """
+    done = 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{POLL_PORT}", limits=limits, timeout=30) as client:
+        async def worker():
+            nonlocal done
+            while time.perf_counter() < deadline:
+                response = await request(client)
+                if response.is_success:
+                    done += 1
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return done / (time.perf_counter() - started)
+
+
+async def main(max_workers: int, seconds: float, concurrency: int) -> None:
+    env = dict(os.environ, USER_SERVICE_BASE_URL=f"http://127.0.0.1:{STUB_PORT}",
+               USER_ATTRIBUTES_REFRESH_ENABLED="false")
+    user_ids = itertools.count(USER_ID_START)
+
+    await database.connect()
+    question_id = await question_repository.create_question(QuestionCreate(
+        title="Worker scaling question", option_1="a", option_2="b", option_3="c", option_4="d"
+    ))
+
+    def submit(client):
+        user_id = next(user_ids)
+        return client.post("/answers", json={
+            "user_id": user_id, "question_id": question_id, "selected_option": user_id % 4 + 1
+        })
+
+    def statistics(client):
+        return client.get("/statistics/all-questions")
+
+    stub_process = _start("benchmarks.answers_load_test:stub", STUB_PORT, env)
+    try:
+        await _wait_until_up(f"http://127.0.0.1:{STUB_PORT}/docs")
+        print(f"{'workers':>7} {'POST /answers req/s':>20} {'GET /statistics/all-questions req/s':>36}")
+        for workers in range(1, max_workers + 1):
+            poll_process = subprocess.Popen(
+                [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+                cwd=SERVICE_DIR, env=dict(env, WORKERS=str(workers), BIND=f"127.0.0.1:{POLL_PORT}"),
+            )
+            try:
+                await _wait_until_up(f"http://127.0.0.1:{POLL_PORT}/")
+                answers_rate = await _drive(submit, seconds, concurrency)
+                statistics_rate = await _drive(statistics, seconds, concurrency)
+            finally:
+                poll_process.terminate()
+                poll_process.wait()
+            print(f"{workers:>7} {answers_rate:>20,.0f} {statistics_rate:>36,.0f}")
+    finally:
+        stub_process.terminate()
+        stub_process.wait()
+        # Cascades to the answers the benchmark created.
+        await question_repository.delete_question(question_id)
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Poll Service throughput by gunicorn worker count")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(main(args.max_workers, args.seconds, args.concurrency))
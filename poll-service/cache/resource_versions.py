@@ -0,0 +1,80 @@
+import time
+import uuid
+from typing import Optional
+
+import redis.asyncio as redis
+
+from cache import shared_store
+
+# Write counters for HTTP validators. The boot id keeps ETags from one process
+# lifetime from ever matching another's after a restart. With a shared store the
+# counters and boot id live in one Redis hash, so every worker hands out the
+# same ETag, and losing the hash also replaces the boot id.
+_BOOT_ID = uuid.uuid4().hex[:12]
+_versions = {"questions": 0, "answers": 0}
+_written_at = {"questions": 0.0, "answers": 0.0}
+_SHARED_KEY = "poll:resource-versions"
+# Set when a bump could not reach Redis: the shared counters missed a write, so
+# the next etag() that reaches Redis replaces the boot id to change every ETag.
+_missed_bump = False
+
+
+async def bump(*resources: str) -> None:
+    """
+    Record that a write to these resources ('questions', 'answers') has committed.
+    Never raises: the write is already committed, so a Redis failure is logged.
+    """
+    global _missed_bump
+    now = time.time()
+    if shared_store.is_shared():
+        pipe = shared_store.get_client().pipeline(transaction=False)
+        for resource in resources:
+            pipe.hincrby(_SHARED_KEY, resource, 1)
+            pipe.hset(_SHARED_KEY, f"{resource}:written_at", now)
+        try:
+            await pipe.execute()
+        except redis.RedisError as e:
+            _missed_bump = True
+            print(f"Failed to record a write to {', '.join(resources)}: {e}")
+        return
+
+    for resource in resources:
+        _versions[resource] += 1
+        _written_at[resource] = now
+
+
+async def etag(*resources: str, settled_seconds: float = 0.0) -> Optional[str]:
+    """
+    Weak ETag that changes whenever any of the given resources is written.
+
+    Returns None while any of them was written less than `settled_seconds` ago:
+    a response read from a lagging replica could predate that write, and must
+    not be labelled with a version the client would then revalidate forever.
+    Also None while Redis is unreachable, so clients get full responses.
+    """
+    global _missed_bump
+    if shared_store.is_shared():
+        client = shared_store.get_client()
+        fields = ["boot", *resources, *(f"{resource}:written_at" for resource in resources)]
+        try:
+            if _missed_bump:
+                await client.hdel(_SHARED_KEY, "boot")
+                _missed_bump = False
+            boot_id, *values = await client.hmget(_SHARED_KEY, *fields)
+            if boot_id is None:
+                await client.hsetnx(_SHARED_KEY, "boot", uuid.uuid4().hex[:12])
+                boot_id, *values = await client.hmget(_SHARED_KEY, *fields)
+        except redis.RedisError as e:
+            print(f"Shared store unavailable, responding without an ETag: {e}")
+            return None
+        versions = [int(value or 0) for value in values[:len(resources)]]
+        last_written = max(float(value or 0) for value in values[len(resources):])
+        boot_id = boot_id.decode()
+    else:
+        versions = [_versions[resource] for resource in resources]
+        last_written = max(_written_at[resource] for resource in resources)
+        boot_id = _BOOT_ID
+
+    if time.time() - last_written < settled_seconds:
+        return None
+    return 'W/"' + "-".join([boot_id] + [f"{version}" for version in versions]) + '"'
@@ -0,0 +1,236 @@
+import asyncio
+import json
+import uuid
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import redis.asyncio as redis
+
+from cache.ttl_lru_cache import TTLLRUCache
+from config.config import Config
+
+config = Config()
+
+# State that every worker process must agree on (caches, write counters, live
+# vote deltas) lives in Redis when SHARED_STORE_URL is set, e.g.
+# unix:///var/run/redis/redis.sock or redis://localhost:6379/0. Without it the
+# service runs as a single process and everything stays in memory.
+
+_client: Optional[redis.Redis] = None
+_listener: Optional[asyncio.Task] = None
+_handlers: Dict[str, Callable[[dict], None]] = {}
+
+# Tags broadcasts so a worker can skip the messages it sent itself.
+WORKER_ID = uuid.uuid4().hex[:12]
+
+# Returned by SharedCache.generation while Redis is unreachable; never matches a
+# stored generation, so a value read in the meantime is not cached.
+UNKNOWN_GENERATION = -1
+
+# Store `value` only if no invalidation happened since the reader captured `generation`.
+_SET_IF_GENERATION = """
+if (redis.call('GET', KEYS[1]) or '0') == ARGV[1] then
+    return redis.call('SET', KEYS[2], ARGV[2], 'PX', ARGV[3])
+end
+return false
+"""
+
+
+def is_shared() -> bool:
+    return _client is not None
+
+
+def get_client() -> redis.Redis:
+    return _client
+
+
+async def start() -> None:
+    global _client, _listener
+    if not config.SHARED_STORE_URL or _client is not None:
+        return
+    _client = redis.from_url(config.SHARED_STORE_URL, max_connections=config.SHARED_STORE_MAX_CONNECTIONS)
+    await _client.ping()
+    if _handlers:
+        _listener = asyncio.create_task(_listen())
+
+
+async def stop() -> None:
+    global _client, _listener
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+        _listener = None
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def subscribe(channel: str, handler: Callable[[dict], None]) -> None:
+    """
+    Call `handler` with every message other workers broadcast on `channel`.
+    Must be registered before start().
+    """
+    _handlers[channel] = handler
+
+
+async def broadcast(channel: str, message: dict) -> None:
+    """
+    Best-effort fan-out of `message` to the other workers. No-op in single-process mode.
+    """
+    if _client is None:
+        return
+    try:
+        await _client.publish(channel, json.dumps({**message, "origin": WORKER_ID}))
+    except Exception as e:
+        print(f"Failed to broadcast on {channel}: {e}")
+
+
+async def _listen() -> None:
+    while True:
+        pubsub = _client.pubsub()
+        try:
+            await pubsub.subscribe(*_handlers)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                payload = json.loads(message["data"])
+                if payload.pop("origin", None) == WORKER_ID:
+                    continue
+                try:
+                    _handlers[message["channel"].decode()](payload)
+                except Exception as e:
+                    print(f"Failed to handle broadcast on {message['channel']}: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Shared store listener error, reconnecting: {e}")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
+
+
+def _unavailable(action: str, error: Exception) -> None:
+    print(f"Shared store unavailable, {action}: {error}")
+
+
+class SharedCache:
+    """
+    Async front for a TTLLRUCache that every worker process sees consistently.
+
+    In single-process mode it delegates to `local`. With a shared store, entries
+    and the invalidation generation live in Redis under `namespace`, so a write
+    in one worker invalidates the entry for all of them at once; values cross
+    the process boundary via `encode`/`decode`. Redis enforces the TTL, and its
+    volatile-lru maxmemory policy takes the place of the local LRU bound.
+
+    Redis errors never reach the caller: a failed read is a miss (the caller reads
+    the database), a failed store is skipped, and a failed invalidation is logged
+    and left to the TTL, since the write it follows has already committed.
+    """
+
+    def __init__(self, namespace: str, local: TTLLRUCache,
+                 encode: Callable[[Any], str], decode: Callable[[bytes], Any]):
+        self.namespace = namespace
+        self.local = local
+        self._encode = encode
+        self._decode = decode
+        self._generation_key = f"{namespace}:generation"
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        if _client is None or not self.local.enabled:
+            return self.local.get(key)
+
+        try:
+            raw = await _client.get(self._key(key))
+        except redis.RedisError as e:
+            _unavailable(f"reading {self._key(key)} from the database", e)
+            raw = None
+        if raw is None:
+            self.local.record_miss()
+            return None
+        self.local.record_hit()
+        return self._decode(raw)
+
+    async def get_many(self, keys: list) -> Dict[Hashable, Any]:
+        """
+        Look up several keys in one round trip; missing keys are left out.
+        """
+        if _client is None or not self.local.enabled:
+            found = {key: self.local.get(key) for key in keys}
+            return {key: value for key, value in found.items() if value is not None}
+        if not keys:
+            return {}
+
+        try:
+            raws = await _client.mget([self._key(key) for key in keys])
+        except redis.RedisError as e:
+            _unavailable(f"reading {len(keys)} {self.namespace} entries from the database", e)
+            raws = [None] * len(keys)
+
+        result = {}
+        for key, raw in zip(keys, raws):
+            if raw is None:
+                self.local.record_miss()
+            else:
+                self.local.record_hit()
+                result[key] = self._decode(raw)
+        return result
+
+    async def generation(self) -> int:
+        if _client is None or not self.local.enabled:
+            return self.local.generation
+        try:
+            return int(await _client.get(self._generation_key) or 0)
+        except redis.RedisError as e:
+            _unavailable(f"not caching {self.namespace} reads", e)
+            return UNKNOWN_GENERATION
+
+    async def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        if _client is None or not self.local.enabled:
+            self.local.set(key, value, generation)
+            return
+
+        if generation == UNKNOWN_GENERATION:
+            return
+        ttl_ms = int(self.local.ttl_seconds * 1000)
+        try:
+            if generation is None:
+                await _client.set(self._key(key), self._encode(value), px=ttl_ms)
+            else:
+                await _client.eval(_SET_IF_GENERATION, 2, self._generation_key, self._key(key),
+                                   str(generation), self._encode(value), ttl_ms)
+        except redis.RedisError as e:
+            _unavailable(f"not caching {self._key(key)}", e)
+
+    async def invalidate(self, *keys: Hashable) -> None:
+        if _client is None or not self.local.enabled:
+            self.local.invalidate(*keys)
+            return
+
+        pipe = _client.pipeline(transaction=True)
+        pipe.incr(self._generation_key)
+        if keys:
+            pipe.delete(*(self._key(key) for key in keys))
+        try:
+            await pipe.execute()
+        except redis.RedisError as e:
+            _unavailable(f"{self.namespace} entries may be stale until they expire", e)
+
+    async def clear(self) -> None:
+        if _client is None or not self.local.enabled:
+            self.local.clear()
+            return
+
+        try:
+            await _client.incr(self._generation_key)
+            keys = [key async for key in _client.scan_iter(match=f"{self.namespace}:*")
+                    if key.decode() != self._generation_key]
+            if keys:
+                await _client.delete(*keys)
+        except redis.RedisError as e:
+            _unavailable(f"{self.namespace} entries may be stale until they expire", e)
@@ -0,0 +1,92 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from prometheus_client import Counter
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+CACHE_EVICTIONS = Counter(
+    "cache_evictions",
+    "Entries evicted to keep a cache within its max_size",
+    ["cache"],
+)
+
+
+class TTLLRUCache:
+    """
+    Bounded in-process cache with LRU eviction and a per-entry TTL.
+    Not thread-safe; meant to be used from a single asyncio event loop.
+
+    `generation` is bumped on every invalidation. Readers that fetch from the
+    database should capture it before the fetch and pass it to `set`, so a value
+    read before a concurrent write is never stored after that write invalidated it.
+
+    Hits, misses and evictions are also exported on /metrics, labelled with `name`.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, enabled: bool = True, name: str = "default"):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled and max_size > 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._hit_counter = CACHE_LOOKUPS.labels(name, "hit")
+        self._miss_counter = CACHE_LOOKUPS.labels(name, "miss")
+        self._eviction_counter = CACHE_EVICTIONS.labels(name)
+
+    def record_hit(self) -> None:
+        self.hits += 1
+        self._hit_counter.inc()
+
+    def record_miss(self) -> None:
+        self.misses += 1
+        self._miss_counter.inc()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.record_miss()
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.record_miss()
+            return None
+
+        self._entries.move_to_end(key)
+        self.record_hit()
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+        if generation is not None and generation != self.generation:
+            return
+
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+            self._eviction_counter.inc()
+
+    def invalidate(self, *keys: Hashable) -> None:
+        self.generation += 1
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
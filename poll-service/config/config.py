@@ -1,3 +1,4 @@
+from typing import List
 from pydantic_settings import BaseSettings
 
 
@@ -10,3 +11,47 @@ class Config(BaseSettings):
     DATABASE_URL: str = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
     USER_SERVICE_BASE_URL: str = "http://localhost:8000"
 
+    QUESTION_CACHE_ENABLED: bool = True
+    QUESTION_CACHE_MAX_SIZE: int = 1024
+    QUESTION_CACHE_TTL_SECONDS: float = 60.0
+    USER_SERVICE_TIMEOUT_SECONDS: float = 5.0
+    USER_SERVICE_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    USER_SERVICE_MAX_CONNECTIONS: int = 100
+    USER_SERVICE_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    USER_SERVICE_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    USER_SERVICE_HTTP2: bool = False
+    USER_REGISTRATION_CACHE_ENABLED: bool = True
+    USER_REGISTRATION_CACHE_MAX_SIZE: int = 100000
+    USER_REGISTRATION_CACHE_TTL_SECONDS: float = 30.0
+    BULK_ANSWERS_MAX_ROWS: int = 10000
+    BULK_INSERT_CHUNK_SIZE: int = 500
+    BULK_INSERT_MAX_ATTEMPTS: int = 3
+    STREAM_BATCH_SIZE: int = 1000
+    LIVE_MAX_UPDATES_PER_SECOND: float = 4.0
+    LIVE_RESYNC_SECONDS: float = 5.0
+    ANSWER_GROUP_COMMIT_ENABLED: bool = False
+    ANSWER_GROUP_COMMIT_MAX_ROWS: int = 500
+    ANSWER_GROUP_COMMIT_MAX_DELAY_MS: float = 5.0
+    RUN_MIGRATIONS_ON_STARTUP: bool = False
+    MIGRATION_BACKFILL_BATCH_SIZE: int = 5000
+    MIGRATION_BACKFILL_PAUSE_SECONDS: float = 0.05
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 0
+    WORKERS: int = 1
+    BIND: str = "0.0.0.0:8001"
+    SHARED_STORE_URL: str = ""
+    SHARED_STORE_MAX_CONNECTIONS: int = 50
+    DATABASE_POOL_MIN_SIZE: int = 1
+    DATABASE_POOL_MAX_SIZE: int = 10
+    DATABASE_REPLICA_URL: str = ""
+    DATABASE_REPLICA_POOL_MIN_SIZE: int = 1
+    DATABASE_REPLICA_POOL_MAX_SIZE: int = 10
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 1.0
+    TIMESERIES_DEFAULT_BUCKETS: int = 60
+    TIMESERIES_MAX_BUCKETS: int = 10000
+    USER_ATTRIBUTES_REFRESH_ENABLED: bool = True
+    USER_ATTRIBUTES_REFRESH_SECONDS: float = 30.0
+    USER_ATTRIBUTES_OVERLAP_SECONDS: float = 5.0
+    USER_ATTRIBUTES_BATCH_SIZE: int = 5000
+    BREAKDOWN_FETCH_BATCH_SIZE: int = 100000
+    BREAKDOWN_AGE_BANDS: List[int] = [18, 25, 35, 45, 55, 65]
+    EXPORT_BATCH_SIZE: int = 10000
@@ -1,12 +1,70 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, status
-from model.question import QuestionCreate, QuestionUpdate, QuestionResponse
-from model.answer import AnswerCreate, AnswerUpdate, UserAnswerResponse
-from model.statistics import QuestionStatistics, AllQuestionsStatistics, UserStatistics
-from service import poll_service
+import json
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from model.question import Question, QuestionCreate, QuestionUpdate, QuestionResponse
+from model.answer import (AnswerCreate, AnswerUpdate, UserAnswerResponse, BulkAnswerCreate, BulkAnswerResponse,
+                          UserAnswersDelete)
+from model.statistics import (QuestionStatistics, AllQuestionsStatistics, UserStatistics, QuestionTimeSeries,
+                              QuestionBreakdown)
+from model.user_registration import UserRegistrationInvalidation
+from service import export, poll_service
+from cache import resource_versions
+from config.config import Config
+
+config = Config()
+
+# While a replica may still be catching up with a write, responses go out without
+# an ETag; see resource_versions.etag.
+_SETTLED_SECONDS = config.DATABASE_REPLICA_MAX_LAG_SECONDS if config.DATABASE_REPLICA_URL else 0.0
 
 router = APIRouter(tags=["polls"])
 
+# List endpoints serialize trusted models straight to JSON bytes instead of
+# re-validating them through response_model.
+_QUESTION_LIST = TypeAdapter(List[Question])
+_USER_ANSWER_LIST = TypeAdapter(List[UserAnswerResponse])
+_ALL_QUESTIONS_STATISTICS_LIST = TypeAdapter(List[AllQuestionsStatistics])
+_QUESTION_BREAKDOWN_LIST = TypeAdapter(List[QuestionBreakdown])
+_BREAKDOWN_DIMENSIONS = "^(age_band|joining_year|is_registered)$"
+_EXPORT_FORMATS = "^(csv|ndjson|parquet)$"
+
+
+def _export_response(chunks, name: str, format: str, compress: bool) -> StreamingResponse:
+    media_type, extension = export.FORMATS[format]
+    filename = f"{name}.{extension}"
+    if compress:
+        media_type, filename = "application/gzip", filename + ".gz"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"}
+    )
+
+
+def _cache_headers(etag: Optional[str]) -> dict:
+    if etag is None:
+        return {"Cache-Control": "no-cache"}
+    return {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={config.HTTP_CACHE_MAX_AGE_SECONDS}, must-revalidate",
+    }
+
+
+def _not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """
+    Return a 304 response if the client's If-None-Match already names this ETag.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match or etag is None:
+        return None
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cache_headers(etag))
+    return None
+
 
 @router.post("/questions/create", response_model=QuestionResponse, status_code=status.HTTP_201_CREATED)
 async def create_question(question: QuestionCreate):
@@ -14,30 +72,60 @@ async def create_question(question: QuestionCreate):
     Create a new poll question with 4 options.
     """
     question_id = await poll_service.create_question(question)
-    created_question = await poll_service.get_question_by_id(question_id)
+    created_question = await poll_service.get_question_by_id(question_id, fresh=True)
     return created_question
 
 
 @router.get("/questions", response_model=List[QuestionResponse], status_code=status.HTTP_200_OK)
-async def get_all_questions():
+async def get_all_questions(request: Request,
+                            after_id: Optional[int] = Query(None, ge=0),
+                            limit: Optional[int] = Query(None, ge=1, le=1000),
+                            format: str = Query("json", pattern="^(json|ndjson)$")):
     """
     Get all poll questions.
+    Pass limit (and after_id from the X-Next-After-Id header) to page by id,
+    or format=ndjson to stream every question one JSON object per line.
+    Supports If-None-Match: unchanged questions are answered with 304.
     """
-    questions = await poll_service.get_all_questions()
-    return questions
+    etag = await resource_versions.etag("questions", settled_seconds=_SETTLED_SECONDS)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    headers = _cache_headers(etag)
+
+    if format == "ndjson":
+        lines = (question.model_dump_json() + "\n" async for question in poll_service.iter_questions(after_id))
+        return StreamingResponse(lines, media_type="application/x-ndjson", headers=headers)
+
+    if limit is None and after_id is None:
+        questions = await poll_service.get_all_questions()
+        return Response(_QUESTION_LIST.dump_json(questions), media_type="application/json", headers=headers)
+
+    page_size = limit or 1000
+    questions = await poll_service.get_questions_page(after_id, page_size)
+    if len(questions) == page_size:
+        headers["X-Next-After-Id"] = str(questions[-1].id)
+    return Response(_QUESTION_LIST.dump_json(questions), media_type="application/json", headers=headers)
 
 
 @router.get("/questions/{question_id}", response_model=QuestionResponse, status_code=status.HTTP_200_OK)
-async def get_question(question_id: int):
+async def get_question(question_id: int, request: Request, response: Response):
     """
     Get a specific question by ID.
+    Supports If-None-Match: an unchanged question is answered with 304.
     """
+    etag = await resource_versions.etag("questions", settled_seconds=_SETTLED_SECONDS)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
     question = await poll_service.get_question_by_id(question_id)
     if not question:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Question with id {question_id} not found"
         )
+    response.headers.update(_cache_headers(etag))
     return question
 
 
@@ -52,7 +140,7 @@ async def update_question(question_id: int, question_update: QuestionUpdate):
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Question with id {question_id} not found"
         )
-    return await poll_service.get_question_by_id(question_id)
+    return await poll_service.get_question_by_id(question_id, fresh=True)
 
 
 @router.delete("/questions/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -85,6 +173,15 @@ async def submit_answer(answer: AnswerCreate):
     }
 
 
+@router.post("/answers/bulk", response_model=BulkAnswerResponse, status_code=status.HTTP_200_OK)
+async def submit_answers_bulk(bulk: BulkAnswerCreate):
+    """
+    Submit many answers at once, e.g. results imported from offline kiosks.
+    Returns a result per row: created, duplicate, invalid_user or missing_question.
+    """
+    return await poll_service.submit_answers_bulk(bulk.answers)
+
+
 @router.put("/answers/{user_id}/{question_id}", status_code=status.HTTP_200_OK)
 async def update_answer(user_id: int, question_id: int, answer_update: AnswerUpdate):
     """
@@ -121,6 +218,31 @@ async def get_question_option_counts(question_id: int):
     return statistics
 
 
+@router.get("/statistics/questions/{question_id}/live", status_code=status.HTTP_200_OK)
+async def stream_question_option_counts(question_id: int):
+    """
+    Live option counts for a question as Server-Sent Events.
+    Each event carries the full counts; bursts of votes are coalesced so a client
+    receives at most LIVE_MAX_UPDATES_PER_SECOND events per second.
+    """
+    question = await poll_service.get_question_by_id(question_id)
+    if not question:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Question with id {question_id} not found"
+        )
+
+    events = (
+        f"data: {json.dumps(snapshot)}\n\n"
+        async for snapshot in poll_service.stream_live_counts(question_id)
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/statistics/questions/{question_id}/total-responses", status_code=status.HTTP_200_OK)
 async def get_question_total_responses(question_id: int):
     """
@@ -139,15 +261,56 @@ async def get_question_total_responses(question_id: int):
     }
 
 
+@router.get("/statistics/questions/{question_id}/timeseries", response_model=QuestionTimeSeries,
+            status_code=status.HTTP_200_OK)
+async def get_question_timeseries(question_id: int,
+                                  granularity: str = Query("hour", pattern="^(minute|hour|day)$"),
+                                  step: int = Query(1, ge=1, le=1000),
+                                  start: Optional[datetime] = Query(None),
+                                  end: Optional[datetime] = Query(None)):
+    """
+    Votes per option over time, in buckets of `step` x `granularity` (e.g. granularity=minute&step=15).
+    start/end are ISO 8601 datetimes, UTC when no offset is given; by default the last
+    60 buckets up to now. Served from pre-aggregated rollups, so cost depends on the number
+    of buckets rather than the number of answers.
+    """
+    timeseries = await poll_service.get_question_timeseries(question_id, granularity, step, start, end)
+    if not timeseries:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Question with id {question_id} not found"
+        )
+    return Response(timeseries.model_dump_json(), media_type="application/json")
+
+
+@router.get("/statistics/questions/{question_id}/breakdown", response_model=QuestionBreakdown,
+            status_code=status.HTTP_200_OK)
+async def get_question_breakdown(question_id: int, by: str = Query("age_band", pattern=_BREAKDOWN_DIMENSIONS)):
+    """
+    Option counts of a question split by a respondent attribute: age_band, joining_year or is_registered.
+    Respondents the Poll Service has no attributes for yet are counted under 'unknown'.
+    """
+    breakdown = await poll_service.get_question_breakdown(question_id, by)
+    if not breakdown:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Question with id {question_id} not found"
+        )
+    return Response(breakdown.model_dump_json(), media_type="application/json")
+
+
 @router.get("/statistics/users/{user_id}/answers", response_model=List[UserAnswerResponse],
             status_code=status.HTTP_200_OK)
-async def get_user_answers(user_id: int):
+async def get_user_answers(user_id: int,
+                           limit: Optional[int] = Query(None, ge=1, le=1000),
+                           offset: int = Query(0, ge=0)):
     """
     API 3: By passing the user id → Return the user answer to each question he submitted.
     Shows all questions answered by this user with their selected options.
+    Use limit/offset to page through very large answer histories.
     """
-    answers = await poll_service.get_user_answers(user_id)
-    return answers
+    answers = await poll_service.get_user_answers(user_id, limit, offset)
+    return Response(_USER_ANSWER_LIST.dump_json(answers), media_type="application/json")
 
 
 @router.get("/statistics/users/{user_id}/total-answered", response_model=UserStatistics, status_code=status.HTTP_200_OK)
@@ -164,14 +327,71 @@ async def get_user_total_answered(user_id: int):
 
 
 @router.get("/statistics/all-questions", response_model=List[AllQuestionsStatistics], status_code=status.HTTP_200_OK)
-async def get_all_questions_statistics():
+async def get_all_questions_statistics(request: Request):
     """
     API 5: Return all questions and all possible options and for each question
     return how many users choose each of the question options.
     Comprehensive view of all questions with option counts.
+    Supports If-None-Match: unchanged statistics are answered with 304 without querying.
     """
+    etag = await resource_versions.etag("questions", "answers", settled_seconds=_SETTLED_SECONDS)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
     statistics = await poll_service.get_all_questions_statistics()
-    return statistics
+    return Response(_ALL_QUESTIONS_STATISTICS_LIST.dump_json(statistics), media_type="application/json",
+                    headers=_cache_headers(etag))
+
+
+@router.get("/statistics/all-questions/breakdown", response_model=List[QuestionBreakdown],
+            status_code=status.HTTP_200_OK)
+async def get_all_questions_breakdown(by: str = Query("age_band", pattern=_BREAKDOWN_DIMENSIONS)):
+    """
+    Option counts of every question split by a respondent attribute, computed in one pass over all answers.
+    """
+    breakdowns = await poll_service.get_all_questions_breakdown(by)
+    return Response(_QUESTION_BREAKDOWN_LIST.dump_json(breakdowns), media_type="application/json")
+
+
+@router.get("/export/answers", status_code=status.HTTP_200_OK)
+async def export_answers(format: str = Query("csv", pattern=_EXPORT_FORMATS),
+                         gzip: bool = Query(False),
+                         question_id: Optional[int] = Query(None),
+                         user_id: Optional[int] = Query(None),
+                         start: Optional[datetime] = Query(None),
+                         end: Optional[datetime] = Query(None)):
+    """
+    Download answers as csv, ndjson or parquet (parquet only when pyarrow is installed),
+    optionally gzip-compressed and filtered by question, user and created_at window.
+    Rows are read and encoded in batches while the response is sent, so any number of
+    answers can be exported in constant memory.
+    """
+    chunks = poll_service.export_answers(format, gzip, question_id, user_id, start, end)
+    return _export_response(chunks, "answers", format, gzip)
+
+
+@router.get("/export/statistics", status_code=status.HTTP_200_OK)
+async def export_statistics(format: str = Query("csv", pattern=_EXPORT_FORMATS),
+                            gzip: bool = Query(False),
+                            question_id: Optional[int] = Query(None),
+                            start: Optional[datetime] = Query(None),
+                            end: Optional[datetime] = Query(None)):
+    """
+    Download the answer count of every question option, all-time or for answers
+    created between start and end (to the minute).
+    """
+    chunks = poll_service.export_statistics(format, gzip, question_id, start, end)
+    return _export_response(chunks, "statistics", format, gzip)
+
+
+@router.delete("/internal/users/answers", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_users_answers(deletion: UserAnswersDelete):
+    """
+    Internal endpoint: Delete all answers for many users.
+    Called by the User Service deletion outbox dispatcher; safe to retry.
+    """
+    await poll_service.delete_users_answers(deletion.user_ids)
 
 
 @router.delete("/internal/users/{user_id}/answers", status_code=status.HTTP_204_NO_CONTENT)
@@ -181,3 +401,12 @@ async def delete_user_answers(user_id: int):
     Called by User Service when a user is deleted.
     """
     await poll_service.delete_user_answers(user_id)
+
+
+@router.post("/internal/users/registration-invalidations", status_code=status.HTTP_204_NO_CONTENT)
+async def invalidate_user_registrations(invalidation: UserRegistrationInvalidation):
+    """
+    Internal endpoint: Drop cached registration status for users.
+    Called by User Service whenever a user is registered, updated or deleted.
+    """
+    await poll_service.invalidate_user_registrations(invalidation.user_ids)
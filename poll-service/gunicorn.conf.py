@@ -0,0 +1,38 @@
+"""
+Multi-worker launch configuration.
+
+Usage:
+    WORKERS=4 SHARED_STORE_URL=redis://localhost:6379/0 gunicorn -c gunicorn.conf.py main:app
+
+Each worker is a separate process with its own event loop and database pool,
+so the service scales across cores. With more than one worker, SHARED_STORE_URL
+is required and must point at the Redis instance from docker-compose.yaml (a
+unix:// socket URL works too) so that the question and registration caches, the
+ETag counters and the live vote fan-out are shared instead of diverging per
+process; startup is refused without it.
+"""
+import os
+import tempfile
+
+from config.config import Config
+
+config = Config()
+
+bind = config.BIND
+workers = config.WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+graceful_timeout = 30
+keepalive = 5
+
+if workers > 1:
+    # Let /metrics aggregate the histograms of every worker.
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="poll-service-metrics-"))
+    if not config.SHARED_STORE_URL:
+        raise SystemExit(f"Refusing to start {workers} workers without SHARED_STORE_URL: "
+                         "caches, ETags and live counts would diverge between workers")
+
+
+def child_exit(server, worker):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,6 +1,15 @@
-from fastapi import FastAPI
-2from controller.poll_controller import router as poll_router
-from repository.database import database
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from controller.poll_controller import router as poll_router
+from repository.database import database, connect_all, disconnect_all
+from config.config import Config
+from migrations import runner
+from service_common.instrumentation import MetricsMiddleware, render_latest
+from api.internal_api import user_service_api
+from service import answer_buffer, user_attributes
+from cache import shared_store
+
+config = Config()
 
 app = FastAPI(
     title="Poll Service API",
@@ -8,17 +17,28 @@ app = FastAPI(
     version="1.0.0"
 )
 
+app.add_middleware(MetricsMiddleware)
 app.include_router(poll_router)
 
 
 @app.on_event("startup")
 async def startup():
-    await database.connect()
+    await connect_all()
+    if config.RUN_MIGRATIONS_ON_STARTUP:
+        await runner.migrate(database)
+    await shared_store.start()
+    await user_service_api.start_client()
+    await answer_buffer.start()
+    await user_attributes.start()
 
 
 @app.on_event("shutdown")
 async def shutdown():
-    await database.disconnect()
+    await user_attributes.stop()
+    await answer_buffer.stop()
+    await user_service_api.close_client()
+    await shared_store.stop()
+    await disconnect_all()
 
 
 @app.get("/")
@@ -29,3 +49,10 @@ async def root():
         "version": "1.0.0"
     }
 
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint: request, database query and outbound call latencies.
+    """
+    return Response(render_latest(), media_type=CONTENT_TYPE_LATEST)
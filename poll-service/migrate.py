@@ -0,0 +1,18 @@
+"""
+Apply the numbered migrations in resources/db-migrations and track them in schema_migrations.
+
+Usage:
+    python migrate.py                 # apply every pending migration
+    python migrate.py --target 3      # apply pending migrations up to version 3
+    python migrate.py --status        # list migrations and whether they are applied
+    python migrate.py --baseline 3    # mark 1..3 as applied without running them
+"""
+import asyncio
+import sys
+
+from repository.database import database
+from migrations import runner
+from service_common import migrations
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(migrations.cli(database, runner.MIGRATIONS_DIR, sys.argv[1:])))
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -36,3 +36,24 @@ class UserAnswerResponse(BaseModel):
     selected_option: int
     selected_option_text: str
 
+
+class BulkAnswerCreate(BaseModel):
+    answers: List[AnswerCreate] = Field(..., min_length=1)
+
+
+class BulkAnswerResult(BaseModel):
+    index: int
+    user_id: int
+    question_id: int
+    status: str = Field(..., description="created, duplicate, invalid_user or missing_question")
+    answer_id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkAnswerResponse(BaseModel):
+    created: int
+    results: List[BulkAnswerResult]
+
+
+class UserAnswersDelete(BaseModel):
+    user_ids: List[int] = Field(..., min_length=1, max_length=10000)
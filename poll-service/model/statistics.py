@@ -1,5 +1,6 @@
+from datetime import datetime
 from pydantic import BaseModel
-from typing import Dict
+from typing import Dict, List
 
 
 class QuestionStatistics(BaseModel):
@@ -28,4 +29,35 @@ class UserStatistics(BaseModel):
     total_questions_answered: int
 
 
+class TimeSeriesBucket(BaseModel):
+    bucket_start: datetime
+    total_responses: int
+    option_1_count: int
+    option_2_count: int
+    option_3_count: int
+    option_4_count: int
+
+
+class QuestionTimeSeries(BaseModel):
+    question_id: int
+    granularity: str
+    step: int
+    start: datetime
+    end: datetime
+    buckets: List[TimeSeriesBucket]
+
 
+class BreakdownGroup(BaseModel):
+    group: str
+    total_responses: int
+    option_1_count: int
+    option_2_count: int
+    option_3_count: int
+    option_4_count: int
+
+
+class QuestionBreakdown(BaseModel):
+    question_id: int
+    question_title: str
+    by: str
+    groups: List[BreakdownGroup]
@@ -0,0 +1,6 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class UserRegistrationInvalidation(BaseModel):
+    user_ids: List[int] = Field(..., min_length=1)
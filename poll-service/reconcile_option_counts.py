@@ -0,0 +1,40 @@
+"""
+Rebuild the question_option_counts summary table from the answers table.
+
+Usage:
+    python reconcile_option_counts.py            # report drift and rebuild
+    python reconcile_option_counts.py --dry-run  # only report drift
+"""
+import argparse
+import asyncio
+
+from repository.database import database
+from cache import shared_store
+from repository import answer_repository
+
+
+async def main(dry_run: bool) -> int:
+    await database.connect()
+    await shared_store.start()
+    try:
+        drift = await answer_repository.reconcile_option_counts(dry_run=dry_run)
+    finally:
+        await shared_store.stop()
+        await database.disconnect()
+
+    if not drift:
+        print("question_option_counts is in sync with answers")
+        return 0
+
+    for row in drift:
+        print(f"question {row['question_id']} option {row['selected_option']}: "
+              f"stored={row['stored']} actual={row['actual']}")
+    print(f"{len(drift)} drifted row(s) {'found' if dry_run else 'rebuilt'}")
+    return 1 if dry_run else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile question option counts")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without rebuilding")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(main(args.dry_run)))
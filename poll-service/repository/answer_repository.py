@@ -1,48 +1,146 @@
-from typing import List, Optional
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import numpy as np
+from pymysql.err import IntegrityError, OperationalError
 from model.answer import Answer, AnswerCreate
-from repository.database import database
+from repository.database import database, replica_database
+from cache import resource_versions
+from config.config import Config
+
+config = Config()
+
+ER_DUP_ENTRY = 1062
+ER_NO_REFERENCED_ROW_2 = 1452
+ER_LOCK_DEADLOCK = 1213
+
+# Answer history and statistics reads use replica_database; writes, and reads
+# made inside a write transaction, stay on the primary.
+_COLUMNS = "id, user_id, question_id, selected_option"
+_FIELDS = tuple(_COLUMNS.split(", "))
+
+# Adds (or with sign '-' removes) the answers matching {where} to the minute, hour
+# and day answer_rollups buckets holding their created_at. Must run while those
+# answer rows exist: after an insert, before an update or delete.
+# The SELECT is wrapped in a derived table so ON DUPLICATE KEY UPDATE can name its
+# count column; VALUES() for that is deprecated in MySQL 8.0.20+.
+_ROLLUP_UPSERT = """
+        INSERT INTO answer_rollups (question_id, granularity, bucket_start, selected_option, answer_count)
+        SELECT * FROM (
+            SELECT a.question_id,
+                   g.granularity,
+                   CASE g.granularity
+                       WHEN 'minute' THEN DATE(a.created_at) + INTERVAL HOUR(a.created_at) HOUR
+                                                             + INTERVAL MINUTE(a.created_at) MINUTE
+                       WHEN 'hour' THEN DATE(a.created_at) + INTERVAL HOUR(a.created_at) HOUR
+                       ELSE CAST(DATE(a.created_at) AS DATETIME)
+                   END AS bucket_start,
+                   a.selected_option,
+                   {sign}COUNT(*) AS batch_count
+            FROM answers a
+            CROSS JOIN (SELECT 'minute' AS granularity UNION ALL SELECT 'hour' UNION ALL SELECT 'day') g
+            WHERE {where}
+            GROUP BY a.question_id, g.granularity, bucket_start, a.selected_option
+        ) AS batch
+        ON DUPLICATE KEY UPDATE answer_count = answer_count + batch.batch_count
+"""
+_PAIR_WHERE = "a.user_id = :user_id AND a.question_id = :question_id"
+
+
+class DuplicateAnswerError(Exception):
+    pass
+
+
+class QuestionNotFoundError(Exception):
+    pass
+
+
+def _to_answer(record) -> Answer:
+    # Rows come from our own table, so skip validation and build the model directly.
+    # record._mapping is the driver row, which iterates like a tuple in _COLUMNS
+    # order; zipping it is much cheaper than looking each column up by name.
+    return Answer.model_construct(**dict(zip(_FIELDS, record._mapping)))
 
 
 async def get_by_id(answer_id: int) -> Optional[Answer]:
-    query = "SELECT * FROM answers WHERE id = :answer_id"
+    query = f"SELECT {_COLUMNS} FROM answers WHERE id = :answer_id"
     result = await database.fetch_one(query, values={"answer_id": answer_id})
     if result:
-        return Answer(**dict(result))
+        return _to_answer(result)
     return None
 
 
 async def get_by_user_and_question(user_id: int, question_id: int) -> Optional[Answer]:
-    query = """
-            SELECT *
+    query = f"""
+            SELECT {_COLUMNS}
             FROM answers
             WHERE user_id = :user_id
               AND question_id = :question_id \
             """
     result = await database.fetch_one(query, values={"user_id": user_id, "question_id": question_id})
     if result:
-        return Answer(**dict(result))
+        return _to_answer(result)
     return None
 
 
 async def get_all_answers() -> List[Answer]:
-    query = "SELECT * FROM answers ORDER BY id"
-    results = await database.fetch_all(query)
-    return [Answer(**dict(record)) for record in results]
+    query = f"SELECT {_COLUMNS} FROM answers ORDER BY id"
+    results = await replica_database.fetch_all(query)
+    return [_to_answer(record) for record in results]
 
 
 async def get_answers_by_user(user_id: int) -> List[Answer]:
-    query = "SELECT * FROM answers WHERE user_id = :user_id ORDER BY question_id"
-    results = await database.fetch_all(query, values={"user_id": user_id})
-    return [Answer(**dict(record)) for record in results]
+    query = f"SELECT {_COLUMNS} FROM answers WHERE user_id = :user_id ORDER BY question_id"
+    results = await replica_database.fetch_all(query, values={"user_id": user_id})
+    return [_to_answer(record) for record in results]
+
+
+async def get_answers_with_questions_by_user(user_id: int, limit: Optional[int] = None,
+                                             offset: int = 0) -> List[dict]:
+    """
+    Get a user's answers joined with the question title and the selected option text.
+    Returns one row per answer, ordered by question_id, optionally paged with limit/offset.
+    """
+    query = """
+            SELECT a.user_id,
+                   a.question_id,
+                   q.title AS question_title,
+                   a.selected_option,
+                   CASE a.selected_option
+                       WHEN 1 THEN q.option_1
+                       WHEN 2 THEN q.option_2
+                       WHEN 3 THEN q.option_3
+                       WHEN 4 THEN q.option_4
+                   END AS selected_option_text
+            FROM answers a
+            JOIN questions q ON q.id = a.question_id
+            WHERE a.user_id = :user_id
+            ORDER BY a.question_id \
+            """
+    values = {"user_id": user_id}
+
+    if limit is not None:
+        query += " LIMIT :limit OFFSET :offset"
+        values["limit"] = limit
+        values["offset"] = offset
+
+    results = await replica_database.fetch_all(query, values=values)
+    return [record._mapping for record in results]
 
 
 async def get_answers_by_question(question_id: int) -> List[Answer]:
-    query = "SELECT * FROM answers WHERE question_id = :question_id"
-    results = await database.fetch_all(query, values={"question_id": question_id})
-    return [Answer(**dict(record)) for record in results]
+    query = f"SELECT {_COLUMNS} FROM answers WHERE question_id = :question_id"
+    results = await replica_database.fetch_all(query, values={"question_id": question_id})
+    return [_to_answer(record) for record in results]
 
 
 async def create_answer(answer: AnswerCreate) -> int:
+    """
+    Insert an answer, relying on the unique_user_question key and the question foreign key
+    instead of reading first.
+    Raises DuplicateAnswerError if the user already answered the question and
+    QuestionNotFoundError if the question does not exist.
+    """
     query = """
             INSERT INTO answers (user_id, question_id, selected_option)
             VALUES (:user_id, :question_id, :selected_option) \
@@ -53,14 +151,133 @@ async def create_answer(answer: AnswerCreate) -> int:
         "selected_option": answer.selected_option,
     }
 
-    async with database.transaction():
+    try:
+        async with database.transaction():
+            answer_id = await database.execute(query, values)
+            await _adjust_option_count(answer.question_id, answer.selected_option, 1)
+            await _adjust_rollups("a.id = :answer_id", {"answer_id": answer_id}, 1)
+    except IntegrityError as exc:
+        if exc.args and exc.args[0] == ER_DUP_ENTRY:
+            raise DuplicateAnswerError() from exc
+        if exc.args and exc.args[0] == ER_NO_REFERENCED_ROW_2:
+            raise QuestionNotFoundError() from exc
+        raise
+
+    await resource_versions.bump("answers")
+    return answer_id
+
+
+async def create_answers_bulk(answers: List[AnswerCreate]) -> dict:
+    """
+    Insert many answers in one transaction using chunked multi-row INSERT IGNOREs.
+    `answers` must not contain the same (user_id, question_id) pair twice. A pair that
+    is already answered, including by a write committing at the same time, is
+    reported as a duplicate. The whole transaction is retried if MySQL rolls it back
+    to break a deadlock.
+    Returns dict with:
+      'missing_questions': set of question ids that do not exist
+      'duplicates': set of (user_id, question_id) pairs that were already answered
+      'created': dict mapping (user_id, question_id) to the new answer id
+    """
+    # Inserting in (user_id, question_id) order makes overlapping batches take their
+    # unique-index locks in the same order, so they mostly queue instead of deadlocking.
+    answers = sorted(answers, key=lambda answer: (answer.user_id, answer.question_id))
+    for attempt in range(1, config.BULK_INSERT_MAX_ATTEMPTS + 1):
+        try:
+            async with database.transaction():
+                outcome = await _insert_answers(answers)
+            break
+        except OperationalError as exc:
+            if not exc.args or exc.args[0] != ER_LOCK_DEADLOCK or attempt == config.BULK_INSERT_MAX_ATTEMPTS:
+                raise
+            print(f"Bulk answer insert deadlocked, retrying (attempt {attempt})")
+            await asyncio.sleep(0.05 * attempt)
+
+    if outcome["created"]:
+        await resource_versions.bump("answers")
+    return outcome
+
+
+async def _insert_answers(answers: List[AnswerCreate]) -> dict:
+    chunk_size = config.BULK_INSERT_CHUNK_SIZE
+    question_ids = sorted({answer.question_id for answer in answers})
+
+    existing_questions = set()
+    for chunk in _chunks(question_ids, chunk_size):
+        placeholders, values = _in_clause("question_id", chunk)
+        query = f"SELECT id FROM questions WHERE id IN ({placeholders}) FOR SHARE"
+        existing_questions.update(record["id"] for record in await database.fetch_all(query, values=values))
+
+    # The transaction's first plain read, which fixes its REPEATABLE READ snapshot:
+    # the read-backs below see answers that existed before plus this transaction's
+    # own inserts, never answers another writer commits meanwhile. It takes no
+    # locks, unlike a FOR UPDATE over the user_id x question_id cross product,
+    # whose gap locks deadlocked concurrent batches.
+    candidates = [answer for answer in answers if answer.question_id in existing_questions]
+    existing = await _find_existing_pairs(candidates)
+    to_insert = [
+        answer for answer in candidates
+        if (answer.user_id, answer.question_id) not in existing
+    ]
+
+    created = {}
+    for chunk in _chunks(to_insert, chunk_size):
+        rows = []
+        values = {}
+        for i, answer in enumerate(chunk):
+            rows.append(f"(:user_id_{i}, :question_id_{i}, :selected_option_{i})")
+            values[f"user_id_{i}"] = answer.user_id
+            values[f"question_id_{i}"] = answer.question_id
+            values[f"selected_option_{i}"] = answer.selected_option
+        # IGNORE skips a pair answered after the lookup above instead of failing the
+        # chunk with a duplicate key error; the read-back leaves it out of `created`.
+        query = f"INSERT IGNORE INTO answers (user_id, question_id, selected_option) VALUES {', '.join(rows)}"
+        await database.execute(query, values)
+        chunk_ids = await _find_existing_pairs(chunk)
+        created.update(chunk_ids)
+        if chunk_ids:
+            id_placeholders, id_values = _in_clause("answer_id", sorted(chunk_ids.values()))
+            await _adjust_rollups(f"a.id IN ({id_placeholders})", id_values, 1)
+
+    option_deltas = {}
+    for answer in to_insert:
+        if (answer.user_id, answer.question_id) in created:
+            key = (answer.question_id, answer.selected_option)
+            option_deltas[key] = option_deltas.get(key, 0) + 1
+    for chunk in _chunks(sorted(option_deltas.items()), chunk_size):
+        rows = []
+        values = {}
+        for i, ((question_id, selected_option), delta) in enumerate(chunk):
+            rows.append(f"(:question_id_{i}, :selected_option_{i}, :delta_{i})")
+            values[f"question_id_{i}"] = question_id
+            values[f"selected_option_{i}"] = selected_option
+            values[f"delta_{i}"] = delta
+        query = f"""
+                INSERT INTO question_option_counts (question_id, selected_option, answer_count)
+                VALUES {', '.join(rows)} AS new
+                ON DUPLICATE KEY UPDATE answer_count = answer_count + new.answer_count
+                """
         await database.execute(query, values)
-        last_record_id = await database.fetch_one("SELECT LAST_INSERT_ID() as id")
 
-    return last_record_id["id"]
+    return {
+        "missing_questions": set(question_ids) - existing_questions,
+        "duplicates": {(answer.user_id, answer.question_id) for answer in candidates} - created.keys(),
+        "created": created,
+    }
 
 
-async def update_answer(user_id: int, question_id: int, selected_option: int) -> bool:
+async def update_answer(user_id: int, question_id: int, selected_option: int) -> Optional[int]:
+    """
+    Change the selected option of an existing answer.
+    Returns the previously selected option, or None if the answer does not exist.
+    """
+    select_query = """
+            SELECT selected_option
+            FROM answers
+            WHERE user_id = :user_id
+              AND question_id = :question_id
+            FOR UPDATE \
+            """
     query = """
             UPDATE answers
             SET selected_option = :selected_option
@@ -72,47 +289,120 @@ async def update_answer(user_id: int, question_id: int, selected_option: int) ->
         "question_id": question_id,
         "selected_option": selected_option,
     }
-    result = await database.execute(query, values)
-    return result > 0
+
+    async with database.transaction():
+        existing = await database.fetch_one(
+            select_query, values={"user_id": user_id, "question_id": question_id}
+        )
+        if not existing:
+            return None
+
+        changed = existing["selected_option"] != selected_option
+        pair = {"user_id": user_id, "question_id": question_id}
+        if changed:
+            await _adjust_rollups(_PAIR_WHERE, pair, -1)
+        await database.execute(query, values)
+        if changed:
+            await _adjust_option_count(question_id, existing["selected_option"], -1)
+            await _adjust_option_count(question_id, selected_option, 1)
+            await _adjust_rollups(_PAIR_WHERE, pair, 1)
+
+    await resource_versions.bump("answers")
+    return existing["selected_option"]
 
 
 async def delete_answer(answer_id: int) -> bool:
+    select_query = "SELECT question_id, selected_option FROM answers WHERE id = :answer_id FOR UPDATE"
     query = "DELETE FROM answers WHERE id = :answer_id"
-    result = await database.execute(query, values={"answer_id": answer_id})
-    return result > 0
+
+    async with database.transaction():
+        existing = await database.fetch_one(select_query, values={"answer_id": answer_id})
+        if not existing:
+            return False
+
+        await _adjust_rollups("a.id = :answer_id", {"answer_id": answer_id}, -1)
+        await database.execute(query, values={"answer_id": answer_id})
+        await _adjust_option_count(existing["question_id"], existing["selected_option"], -1)
+
+    await resource_versions.bump("answers")
+    return True
 
 
 async def delete_answers_by_user(user_id: int) -> bool:
+    counts_query = """
+            UPDATE question_option_counts c
+            JOIN (SELECT question_id, selected_option, COUNT(*) AS removed
+                  FROM answers
+                  WHERE user_id = :user_id
+                  GROUP BY question_id, selected_option) d
+              ON d.question_id = c.question_id
+             AND d.selected_option = c.selected_option
+            SET c.answer_count = c.answer_count - d.removed \
+            """
     query = "DELETE FROM answers WHERE user_id = :user_id"
-    await database.execute(query, values={"user_id": user_id})
+
+    async with database.transaction():
+        await database.execute(counts_query, values={"user_id": user_id})
+        await _adjust_rollups("a.user_id = :user_id", {"user_id": user_id}, -1)
+        await database.execute(query, values={"user_id": user_id})
+    await resource_versions.bump("answers")
     return True
 
 
+async def delete_answers_by_users(user_ids: List[int]) -> None:
+    """
+    Delete the answers of many users in one transaction, keeping question_option_counts in step.
+    """
+    user_placeholders, values = _in_clause("user_id", sorted(set(user_ids)))
+    counts_query = f"""
+            UPDATE question_option_counts c
+            JOIN (SELECT question_id, selected_option, COUNT(*) AS removed
+                  FROM answers
+                  WHERE user_id IN ({user_placeholders})
+                  GROUP BY question_id, selected_option) d
+              ON d.question_id = c.question_id
+             AND d.selected_option = c.selected_option
+            SET c.answer_count = c.answer_count - d.removed
+            """
+    query = f"DELETE FROM answers WHERE user_id IN ({user_placeholders})"
+
+    async with database.transaction():
+        await database.execute(counts_query, values)
+        await _adjust_rollups(f"a.user_id IN ({user_placeholders})", values, -1)
+        await database.execute(query, values)
+    await resource_versions.bump("answers")
+
+
 async def count_answers_by_user(user_id: int) -> int:
     query = "SELECT COUNT(*) as count FROM answers WHERE user_id = :user_id"
-    result = await database.fetch_one(query, values={"user_id": user_id})
+    result = await replica_database.fetch_one(query, values={"user_id": user_id})
     return result["count"]
 
 
 async def count_answers_by_question(question_id: int) -> int:
-    query = "SELECT COUNT(*) as count FROM answers WHERE question_id = :question_id"
-    result = await database.fetch_one(query, values={"question_id": question_id})
-    return result["count"]
+    query = """
+            SELECT COALESCE(SUM(answer_count), 0) as count
+            FROM question_option_counts
+            WHERE question_id = :question_id \
+            """
+    result = await replica_database.fetch_one(query, values={"question_id": question_id})
+    return int(result["count"])
 
 
-async def get_option_counts_for_question(question_id: int) -> dict:
+async def get_option_counts_for_question(question_id: int, fresh: bool = False) -> dict:
     """
     Get count of users who selected each option for a specific question.
     Returns dict with keys 'option_1', 'option_2', 'option_3', 'option_4'
+    Reads the replica unless `fresh` asks for the primary.
     """
     query = """
             SELECT selected_option,
-                   COUNT(*) as count
-            FROM answers
-            WHERE question_id = :question_id
-            GROUP BY selected_option \
+                   answer_count as count
+            FROM question_option_counts
+            WHERE question_id = :question_id \
             """
-    results = await database.fetch_all(query, values={"question_id": question_id})
+    db = database if fresh else replica_database
+    results = await db.fetch_all(query, values={"question_id": question_id})
 
     counts = {"option_1": 0, "option_2": 0, "option_3": 0, "option_4": 0}
 
@@ -121,3 +411,317 @@ async def get_option_counts_for_question(question_id: int) -> dict:
         counts[option_key] = record["count"]
 
     return counts
+
+
+async def get_option_counts_for_all_questions() -> Dict[int, dict]:
+    """
+    Get option counts and total responses for every question in a single query.
+    Returns dict keyed by question_id, each value with keys 'option_1'..'option_4' and 'total'.
+    Questions without answers are not present in the result.
+    """
+    query = """
+            SELECT question_id,
+                   selected_option,
+                   answer_count as count
+            FROM question_option_counts
+            WHERE answer_count > 0 \
+            """
+    results = await replica_database.fetch_all(query)
+
+    counts_by_question = {}
+
+    for record in results:
+        counts = counts_by_question.setdefault(
+            record["question_id"],
+            {"option_1": 0, "option_2": 0, "option_3": 0, "option_4": 0, "total": 0}
+        )
+        counts[f"option_{record['selected_option']}"] = record["count"]
+        counts["total"] += record["count"]
+
+    return counts_by_question
+
+
+async def _adjust_option_count(question_id: int, selected_option: int, delta: int) -> None:
+    """
+    Apply delta to the summary count of one question option.
+    Must be called inside the transaction that performs the matching answer write.
+    """
+    query = """
+            INSERT INTO question_option_counts (question_id, selected_option, answer_count)
+            VALUES (:question_id, :selected_option, :delta)
+            ON DUPLICATE KEY UPDATE answer_count = answer_count + :delta \
+            """
+    await database.execute(query, values={
+        "question_id": question_id,
+        "selected_option": selected_option,
+        "delta": delta,
+    })
+
+
+async def _adjust_rollups(where: str, values: dict, sign: int) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) the answers matching `where` in answer_rollups.
+    Must be called inside the transaction that performs the matching answer write.
+    """
+    query = _ROLLUP_UPSERT.format(where=where, sign="-" if sign < 0 else "")
+    await database.execute(query, values)
+
+
+async def get_option_timeseries(question_id: int, granularity: str, origin: datetime, end: datetime,
+                                width_seconds: int) -> Dict[int, dict]:
+    """
+    Sum the `granularity` rollups of a question into buckets of `width_seconds` starting at `origin`.
+    Returns dict keyed by bucket index (0 for the bucket starting at origin), each value with keys
+    'option_1'..'option_4'. Buckets without answers are not present in the result.
+    """
+    query = """
+            SELECT FLOOR(TIMESTAMPDIFF(SECOND, :origin, bucket_start) / :width_seconds) AS bucket,
+                   selected_option,
+                   SUM(answer_count) AS count
+            FROM answer_rollups
+            WHERE question_id = :question_id
+              AND granularity = :granularity
+              AND bucket_start >= :origin
+              AND bucket_start < :end
+            GROUP BY bucket, selected_option \
+            """
+    results = await replica_database.fetch_all(query, values={
+        "question_id": question_id,
+        "granularity": granularity,
+        "origin": origin,
+        "end": end,
+        "width_seconds": width_seconds,
+    })
+
+    counts_by_bucket = {}
+    for record in results:
+        counts = counts_by_bucket.setdefault(
+            int(record["bucket"]), {"option_1": 0, "option_2": 0, "option_3": 0, "option_4": 0}
+        )
+        counts[f"option_{record['selected_option']}"] = int(record["count"])
+
+    return counts_by_bucket
+
+
+async def iter_answer_columns(question_id: Optional[int] = None) -> AsyncIterator[np.ndarray]:
+    """
+    Yield answers as (N, 3) int64 arrays of question_id, user_id, selected_option,
+    BREAKDOWN_FETCH_BATCH_SIZE rows at a time, for one question or all of them.
+    Batches are keyset-paged by id: per option over idx_answers_question_option for a
+    single question, over the primary key otherwise.
+    """
+    batch_size = config.BREAKDOWN_FETCH_BATCH_SIZE
+    if question_id is None:
+        scans = [("", {})]
+    else:
+        scans = [
+            ("AND question_id = %(question_id)s AND selected_option = %(selected_option)s",
+             {"question_id": question_id, "selected_option": option})
+            for option in range(1, 5)
+        ]
+
+    for condition, values in scans:
+        after_id = 0
+        while True:
+            query = f"""
+                    SELECT id, question_id, user_id, selected_option
+                    FROM answers
+                    WHERE id > %(after_id)s {condition}
+                    ORDER BY id
+                    LIMIT %(limit)s
+                    """
+            rows = await replica_database.fetch_rows(query, {**values, "after_id": after_id, "limit": batch_size})
+            if not rows:
+                break
+            batch = np.array(rows, dtype=np.int64)
+            yield batch[:, 1:]
+            if len(rows) < batch_size:
+                break
+            after_id = int(batch[-1, 0])
+
+
+async def iter_answer_rows(question_id: Optional[int] = None, user_id: Optional[int] = None,
+                           start: Optional[datetime] = None, end: Optional[datetime] = None) -> AsyncIterator[list]:
+    """
+    Yield answers as lists of (id, user_id, question_id, selected_option, created_at, updated_at)
+    tuples, EXPORT_BATCH_SIZE at a time in id order, optionally filtered by question, user and
+    a created_at window [start, end). Each batch is a separate keyset query, so no connection
+    or cursor is held between batches however slowly the caller consumes them.
+    """
+    batch_size = config.EXPORT_BATCH_SIZE
+    conditions = ""
+    values = {"limit": batch_size}
+    if question_id is not None:
+        conditions += " AND question_id = %(question_id)s"
+        values["question_id"] = question_id
+    if user_id is not None:
+        conditions += " AND user_id = %(user_id)s"
+        values["user_id"] = user_id
+    if start is not None:
+        conditions += " AND created_at >= %(start)s"
+        values["start"] = start
+    if end is not None:
+        conditions += " AND created_at < %(end)s"
+        values["end"] = end
+
+    query = f"""
+            SELECT id, user_id, question_id, selected_option, created_at, updated_at
+            FROM answers
+            WHERE id > %(after_id)s{conditions}
+            ORDER BY id
+            LIMIT %(limit)s
+            """
+    after_id = 0
+    while True:
+        rows = await replica_database.fetch_rows(query, {**values, "after_id": after_id})
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+        after_id = rows[-1][0]
+
+
+async def iter_option_count_rows(question_id: Optional[int] = None, start: Optional[datetime] = None,
+                                 end: Optional[datetime] = None) -> AsyncIterator[list]:
+    """
+    Yield (question_id, question_title, selected_option, option_text, answer_count) tuples,
+    one per question option including options nobody chose, batched by EXPORT_BATCH_SIZE questions.
+    All-time counts come from question_option_counts; with start/end the counts are summed
+    from the minute rollups instead, so the window is applied to the minute.
+    """
+    batch_size = config.EXPORT_BATCH_SIZE
+    question_filter = " AND id = %(question_id)s" if question_id is not None else ""
+    if start is None and end is None:
+        answer_count = "COALESCE(c.answer_count, 0)"
+    else:
+        # Summed per question through the rollups' primary key, never across the whole table.
+        answer_count = f"""(SELECT COALESCE(SUM(r.answer_count), 0)
+                    FROM answer_rollups r
+                    WHERE r.question_id = q.id
+                      AND r.granularity = 'minute'
+                      {"AND r.bucket_start >= %(start)s" if start is not None else ""}
+                      {"AND r.bucket_start < %(end)s" if end is not None else ""}
+                      AND r.selected_option = o.selected_option)"""
+    query = f"""
+            SELECT q.id,
+                   q.title,
+                   o.selected_option,
+                   CASE o.selected_option
+                       WHEN 1 THEN q.option_1
+                       WHEN 2 THEN q.option_2
+                       WHEN 3 THEN q.option_3
+                       WHEN 4 THEN q.option_4
+                   END AS option_text,
+                   {answer_count} AS answer_count
+            FROM (SELECT id, title, option_1, option_2, option_3, option_4
+                  FROM questions
+                  WHERE id > %(after_id)s{question_filter}
+                  ORDER BY id
+                  LIMIT %(limit)s) q
+            CROSS JOIN (SELECT 1 AS selected_option UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4) o
+            LEFT JOIN question_option_counts c
+              ON c.question_id = q.id
+             AND c.selected_option = o.selected_option
+            ORDER BY q.id, o.selected_option
+            """
+    values = {"limit": batch_size, "question_id": question_id, "start": start, "end": end}
+    after_id = 0
+    while True:
+        rows = await replica_database.fetch_rows(query, {**values, "after_id": after_id})
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size * 4:
+            return
+        after_id = rows[-1][0]
+
+
+async def reconcile_option_counts(dry_run: bool = False) -> List[dict]:
+    """
+    Recompute question_option_counts from the answers table.
+    Returns the rows that drifted, each with 'question_id', 'selected_option',
+    'stored' and 'actual'. When dry_run is False the summary table is rebuilt.
+    """
+    actual_query = """
+            SELECT question_id,
+                   selected_option,
+                   COUNT(*) as count
+            FROM answers
+            GROUP BY question_id, selected_option \
+            """
+    stored_query = "SELECT question_id, selected_option, answer_count as count FROM question_option_counts"
+    rebuild_query = """
+            INSERT INTO question_option_counts (question_id, selected_option, answer_count)
+            SELECT question_id, selected_option, COUNT(*)
+            FROM answers
+            GROUP BY question_id, selected_option \
+            """
+
+    async with database.transaction():
+        actual = {
+            (record["question_id"], record["selected_option"]): record["count"]
+            for record in await database.fetch_all(actual_query)
+        }
+        stored = {
+            (record["question_id"], record["selected_option"]): record["count"]
+            for record in await database.fetch_all(stored_query)
+        }
+
+        drift = []
+        for key in sorted(actual.keys() | stored.keys()):
+            if actual.get(key, 0) != stored.get(key, 0):
+                drift.append({
+                    "question_id": key[0],
+                    "selected_option": key[1],
+                    "stored": stored.get(key, 0),
+                    "actual": actual.get(key, 0),
+                })
+
+        if drift and not dry_run:
+            await database.execute("DELETE FROM question_option_counts")
+            await database.execute(rebuild_query)
+
+    if drift and not dry_run:
+        await resource_versions.bump("answers")
+    return drift
+
+
+async def _find_existing_pairs(answers: List[AnswerCreate]) -> Dict[Tuple[int, int], int]:
+    """
+    Return the answer id for every (user_id, question_id) pair of `answers` already stored.
+    """
+    pairs = {(answer.user_id, answer.question_id) for answer in answers}
+    found = {}
+
+    for chunk in _chunks(sorted(pairs), config.BULK_INSERT_CHUNK_SIZE):
+        user_placeholders, values = _in_clause("user_id", sorted({user_id for user_id, _ in chunk}))
+        question_placeholders, question_values = _in_clause(
+            "question_id", sorted({question_id for _, question_id in chunk})
+        )
+        values.update(question_values)
+        query = f"""
+                SELECT id, user_id, question_id
+                FROM answers
+                WHERE user_id IN ({user_placeholders})
+                  AND question_id IN ({question_placeholders})
+                """
+        for record in await database.fetch_all(query, values=values):
+            key = (record["user_id"], record["question_id"])
+            if key in pairs:
+                found[key] = record["id"]
+
+    return found
+
+
+def _in_clause(name: str, items: List[int]) -> Tuple[str, dict]:
+    """
+    Build named placeholders for an IN (...) list, e.g. ':name_0, :name_1'.
+    """
+    values = {f"{name}_{i}": item for i, item in enumerate(items)}
+    return ", ".join(f":{key}" for key in values), values
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
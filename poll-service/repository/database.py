@@ -1,6 +1,63 @@
-from databases import Database
+import time
+from typing import Optional
+from service_common.instrumentation import DB_QUERY_LATENCY, InstrumentedDatabase, current_route
 from config.config import Config
 
 config = Config()
-database = Database(config.DATABASE_URL)
 
+
+class PollDatabase(InstrumentedDatabase):
+    """
+    InstrumentedDatabase with a raw-cursor read path for the analytics queries.
+    """
+
+    async def fetch_rows(self, query: str, values: Optional[dict] = None) -> list:
+        """
+        Run `query` on the driver cursor and return plain tuples, skipping Record objects.
+        For large analytical reads; `query` uses the driver's %(name)s placeholders.
+        """
+        start = time.perf_counter()
+        try:
+            async with self.connection() as connection:
+                async with connection.raw_connection.cursor() as cursor:
+                    await cursor.execute(query, values)
+                    return await cursor.fetchall()
+        finally:
+            DB_QUERY_LATENCY.labels(current_route(), self._pool, "fetch_rows").observe(time.perf_counter() - start)
+
+
+# Every connection works in UTC. answer_rollups buckets are computed in SQL from
+# TIMESTAMP columns, which MySQL renders in the session time zone; without this
+# they would follow whatever default the server has.
+_SESSION_INIT = "SET time_zone = '+00:00'"
+
+database = PollDatabase(
+    config.DATABASE_URL,
+    pool="primary",
+    min_size=config.DATABASE_POOL_MIN_SIZE,
+    max_size=config.DATABASE_POOL_MAX_SIZE,
+    init_command=_SESSION_INIT,
+)
+
+# Read-only queries that tolerate replication lag go to the replica. Writes and
+# reads that must see a write just made stay on `database`. Without
+# DATABASE_REPLICA_URL both names refer to the primary.
+replica_database = PollDatabase(
+    config.DATABASE_REPLICA_URL,
+    pool="replica",
+    min_size=config.DATABASE_REPLICA_POOL_MIN_SIZE,
+    max_size=config.DATABASE_REPLICA_POOL_MAX_SIZE,
+    init_command=_SESSION_INIT,
+) if config.DATABASE_REPLICA_URL else database
+
+
+async def connect_all() -> None:
+    await database.connect()
+    if replica_database is not database:
+        await replica_database.connect()
+
+
+async def disconnect_all() -> None:
+    if replica_database is not database:
+        await replica_database.disconnect()
+    await database.disconnect()
@@ -1,20 +1,97 @@
+import json
 from typing import List, Optional
 from model.question import Question, QuestionCreate, QuestionUpdate
-from repository.database import database
+from repository.database import database, replica_database
+from cache.ttl_lru_cache import TTLLRUCache
+from cache.shared_store import SharedCache
+from cache import resource_versions
+from config.config import Config
 
+config = Config()
+_ALL_QUESTIONS_KEY = "__all__"
+_COLUMNS = "id, title, option_1, option_2, option_3, option_4"
+_FIELDS = tuple(_COLUMNS.split(", "))
 
-async def get_by_id(question_id: int) -> Optional[Question]:
-    query = "SELECT * FROM questions WHERE id = :question_id"
-    result = await database.fetch_one(query, values={"question_id": question_id})
+
+def _to_question(record) -> Question:
+    # Rows come from our own table, so skip validation and build the model directly.
+    # record._mapping is the driver row, which iterates like a tuple in _COLUMNS
+    # order; zipping it is much cheaper than looking each column up by name.
+    return Question.model_construct(**dict(zip(_FIELDS, record._mapping)))
+
+
+def _encode(value) -> str:
+    if isinstance(value, tuple):
+        return json.dumps([question.model_dump() for question in value])
+    return value.model_dump_json()
+
+
+def _decode(raw: bytes):
+    data = json.loads(raw)
+    if isinstance(data, list):
+        return tuple(Question.model_construct(**item) for item in data)
+    return Question.model_construct(**data)
+
+
+question_cache = SharedCache(
+    "poll:questions",
+    TTLLRUCache(
+        max_size=config.QUESTION_CACHE_MAX_SIZE,
+        ttl_seconds=config.QUESTION_CACHE_TTL_SECONDS,
+        enabled=config.QUESTION_CACHE_ENABLED,
+        name="questions",
+    ),
+    encode=_encode,
+    decode=_decode,
+)
+
+
+def _reader(fresh: bool = False):
+    # Cache fills read the primary: the generation check only guards against writes
+    # the fill could have seen, and a lagging replica would put invalidated data back.
+    if fresh or question_cache.local.enabled:
+        return database
+    return replica_database
+
+
+async def get_by_id(question_id: int, fresh: bool = False) -> Optional[Question]:
+    """
+    Pass fresh=True to read your own write, e.g. right after create_question.
+    """
+    cached = await question_cache.get(question_id)
+    if cached is not None:
+        return cached
+
+    generation = await question_cache.generation()
+    query = f"SELECT {_COLUMNS} FROM questions WHERE id = :question_id"
+    result = await _reader(fresh).fetch_one(query, values={"question_id": question_id})
     if result:
-        return Question(**dict(result))
+        question = _to_question(result)
+        await question_cache.set(question_id, question, generation)
+        return question
     return None
 
 
 async def get_all() -> List[Question]:
-    query = "SELECT * FROM questions ORDER BY id"
-    results = await database.fetch_all(query)
-    return [Question(**dict(record)) for record in results]
+    cached = await question_cache.get(_ALL_QUESTIONS_KEY)
+    if cached is not None:
+        return list(cached)
+
+    generation = await question_cache.generation()
+    query = f"SELECT {_COLUMNS} FROM questions ORDER BY id"
+    results = await _reader().fetch_all(query)
+    questions = [_to_question(record) for record in results]
+    await question_cache.set(_ALL_QUESTIONS_KEY, tuple(questions), generation)
+    return questions
+
+
+async def get_page(after_id: Optional[int], limit: int) -> List[Question]:
+    """
+    Keyset pagination: up to `limit` questions with id greater than `after_id`, ordered by id.
+    """
+    query = f"SELECT {_COLUMNS} FROM questions WHERE id > :after_id ORDER BY id LIMIT :limit"
+    results = await replica_database.fetch_all(query, values={"after_id": after_id or 0, "limit": limit})
+    return [_to_question(record) for record in results]
 
 
 async def create_question(question: QuestionCreate) -> int:
@@ -34,6 +111,8 @@ async def create_question(question: QuestionCreate) -> int:
         await database.execute(query, values)
         last_record_id = await database.fetch_one("SELECT LAST_INSERT_ID() as id")
 
+    await question_cache.invalidate(_ALL_QUESTIONS_KEY)
+    await resource_versions.bump("questions")
     return last_record_id["id"]
 
 
@@ -62,11 +141,15 @@ async def update_question(question_id: int, question: QuestionUpdate) -> bool:
 
     query = f"UPDATE questions SET {', '.join(update_fields)} WHERE id = :question_id"
     result = await database.execute(query, values)
+    await question_cache.invalidate(question_id, _ALL_QUESTIONS_KEY)
+    await resource_versions.bump("questions")
     return result > 0
 
 
 async def delete_question(question_id: int) -> bool:
     query = "DELETE FROM questions WHERE id = :question_id"
     result = await database.execute(query, values={"question_id": question_id})
+    await question_cache.invalidate(question_id, _ALL_QUESTIONS_KEY)
+    await resource_versions.bump("questions", "answers")
     return result > 0
 
@@ -1,7 +1,4 @@
-DROP TABLE IF EXISTS answers;
-DROP TABLE IF EXISTS questions;
-
-CREATE TABLE questions (
+CREATE TABLE IF NOT EXISTS questions (
     id INT AUTO_INCREMENT PRIMARY KEY,
     title TEXT NOT NULL,
     option_1 VARCHAR(500) NOT NULL,
@@ -12,7 +9,7 @@ CREATE TABLE questions (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
-CREATE TABLE answers (
+CREATE TABLE IF NOT EXISTS answers (
     id INT AUTO_INCREMENT PRIMARY KEY,
     user_id INT NOT NULL,
     question_id INT NOT NULL,
@@ -24,17 +21,16 @@ CREATE TABLE answers (
 );
 
 -- Sample poll questions
-INSERT INTO questions (title, option_1, option_2, option_3, option_4)
+INSERT IGNORE INTO questions (id, title, option_1, option_2, option_3, option_4)
 VALUES
-    ('Between the following, what do you most love to do?', 'Watch TV', 'Play the computer', 'Hanging out with friends', 'Travel the world'),
-    ('Where is your preferred place to travel?', 'USA', 'France', 'South America', 'Thailand'),
-    ('What is your favorite type of movie?', 'Action', 'Comedy', 'Drama', 'Sci-Fi');
+    (1, 'Between the following, what do you most love to do?', 'Watch TV', 'Play the computer', 'Hanging out with friends', 'Travel the world'),
+    (2, 'Where is your preferred place to travel?', 'USA', 'France', 'South America', 'Thailand'),
+    (3, 'What is your favorite type of movie?', 'Action', 'Comedy', 'Drama', 'Sci-Fi');
 
 -- Sample answers (assuming user IDs 1 and 2 exist in User Service)
-INSERT INTO answers (user_id, question_id, selected_option)
+INSERT IGNORE INTO answers (user_id, question_id, selected_option)
 VALUES
     (1, 1, 4),
     (1, 2, 2),
     (2, 1, 3),
     (2, 2, 1);
-
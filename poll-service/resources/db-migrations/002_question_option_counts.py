@@ -0,0 +1,79 @@
+"""
+Per-question, per-option answer counts maintained by answer_repository in the
+same transaction as every answer write. Existing answers are backfilled in id
+batches so the migration never locks the answers table for long. Answers the
+service writes meanwhile can be counted by both a batch and the service, so the
+migration ends by recounting every question whose counts drifted, locking only
+that question's answers.
+"""
+from migrations import runner
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS question_option_counts (
+        question_id INT NOT NULL,
+        selected_option INT NOT NULL CHECK (selected_option BETWEEN 1 AND 4),
+        answer_count INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (question_id, selected_option),
+        FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+    )
+"""
+
+BACKFILL = """
+    INSERT INTO question_option_counts (question_id, selected_option, answer_count)
+    SELECT * FROM (
+        SELECT question_id, selected_option, COUNT(*) AS batch_count
+        FROM answers
+        WHERE id BETWEEN :batch_start AND :batch_end
+        GROUP BY question_id, selected_option
+    ) AS batch
+    ON DUPLICATE KEY UPDATE answer_count = answer_count + batch.batch_count
+"""
+
+ACTUAL_COUNTS = """
+    SELECT question_id, selected_option, COUNT(*) AS answer_count
+    FROM answers
+    GROUP BY question_id, selected_option
+"""
+
+RECOUNT = """
+    INSERT INTO question_option_counts (question_id, selected_option, answer_count)
+    SELECT question_id, selected_option, COUNT(*)
+    FROM answers
+    WHERE question_id = :question_id
+    GROUP BY question_id, selected_option
+"""
+
+
+async def _recount_drifted(database) -> None:
+    # Compared in one snapshot without locks; each drifted question is then
+    # recounted on its own.
+    async with database.transaction():
+        actual = {
+            (record["question_id"], record["selected_option"]): record["answer_count"]
+            for record in await database.fetch_all(ACTUAL_COUNTS)
+        }
+        stored = {
+            (record["question_id"], record["selected_option"]): record["answer_count"]
+            for record in await database.fetch_all(
+                "SELECT question_id, selected_option, answer_count FROM question_option_counts"
+            )
+        }
+    drifted = sorted({key[0] for key in actual.keys() | stored.keys() if actual.get(key, 0) != stored.get(key, 0)})
+
+    for question_id in drifted:
+        # INSERT ... SELECT locks the question's answers, so concurrent writes to it
+        # wait and the recount cannot race them.
+        async with database.transaction():
+            await database.execute("DELETE FROM question_option_counts WHERE question_id = :question_id",
+                                   values={"question_id": question_id})
+            await database.execute(RECOUNT, values={"question_id": question_id})
+    if drifted:
+        print(f"Recounted option counts of {len(drifted)} question(s) changed during the backfill")
+
+
+async def upgrade(database) -> None:
+    await database.execute(CREATE_TABLE)
+    # A backfill interrupted part-way is re-run from scratch.
+    await database.execute("DELETE FROM question_option_counts")
+    await runner.backfill_in_batches(database, "answers", BACKFILL)
+    await _recount_drifted(database)
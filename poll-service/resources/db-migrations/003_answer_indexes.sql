@@ -0,0 +1,5 @@
+-- Covering index for per-question statistics: the reconcile/rebuild GROUP BY,
+-- get_answers_by_question and the question_id foreign key all lead with question_id.
+-- The unique_user_question key already covers every user_id lookup.
+-- A single statement, so a failed run leaves nothing behind and can simply be retried.
+ALTER TABLE answers ADD INDEX idx_answers_question_option (question_id, selected_option);
@@ -0,0 +1,53 @@
+"""
+Time-bucketed answer counts per question option at minute, hour and day granularity.
+answer_repository keeps them in step in the same transaction as every answer write;
+an answer counts in the buckets holding its created_at. Existing answers are
+backfilled in id batches so the migration never locks the answers table for long.
+Buckets are in UTC: created_at is a TIMESTAMP, which MySQL renders in the session
+time zone, so this migration pins its session to UTC as repository/database.py
+does for every service connection.
+Run it before starting the new version: answers written while it runs are
+either missed or counted twice.
+"""
+from migrations import runner
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS answer_rollups (
+        question_id INT NOT NULL,
+        granularity ENUM('minute', 'hour', 'day') NOT NULL,
+        bucket_start DATETIME NOT NULL,
+        selected_option INT NOT NULL CHECK (selected_option BETWEEN 1 AND 4),
+        answer_count INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (question_id, granularity, bucket_start, selected_option),
+        FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+    )
+"""
+
+BACKFILL = """
+    INSERT INTO answer_rollups (question_id, granularity, bucket_start, selected_option, answer_count)
+    SELECT * FROM (
+        SELECT a.question_id,
+               g.granularity,
+               CASE g.granularity
+                   WHEN 'minute' THEN DATE(a.created_at) + INTERVAL HOUR(a.created_at) HOUR
+                                                         + INTERVAL MINUTE(a.created_at) MINUTE
+                   WHEN 'hour' THEN DATE(a.created_at) + INTERVAL HOUR(a.created_at) HOUR
+                   ELSE CAST(DATE(a.created_at) AS DATETIME)
+               END AS bucket_start,
+               a.selected_option,
+               COUNT(*) AS batch_count
+        FROM answers a
+        CROSS JOIN (SELECT 'minute' AS granularity UNION ALL SELECT 'hour' UNION ALL SELECT 'day') g
+        WHERE a.id BETWEEN :batch_start AND :batch_end
+        GROUP BY a.question_id, g.granularity, bucket_start, a.selected_option
+    ) AS batch
+    ON DUPLICATE KEY UPDATE answer_count = answer_count + batch.batch_count
+"""
+
+
+async def upgrade(database) -> None:
+    await database.execute("SET time_zone = '+00:00'")
+    await database.execute(CREATE_TABLE)
+    # A backfill interrupted part-way is re-run from scratch.
+    await database.execute("DELETE FROM answer_rollups")
+    await runner.backfill_in_batches(database, "answers", BACKFILL)
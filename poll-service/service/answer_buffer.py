@@ -0,0 +1,105 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+from config.config import Config
+from model.answer import AnswerCreate
+from repository import answer_repository
+
+config = Config()
+
+_queue: Optional[asyncio.Queue] = None
+_task: Optional[asyncio.Task] = None
+_accepting = False
+_STOP = object()
+
+
+async def submit(answer: AnswerCreate) -> int:
+    """
+    Queue a validated answer for the next group commit and wait until it is durable.
+    Raises the same DuplicateAnswerError / QuestionNotFoundError as answer_repository.create_answer.
+    """
+    if not _accepting:
+        return await answer_repository.create_answer(answer)
+
+    future = asyncio.get_running_loop().create_future()
+    _queue.put_nowait((answer, future))
+    return await future
+
+
+async def _collect_batch() -> Tuple[List[Tuple[AnswerCreate, asyncio.Future]], bool]:
+    """
+    Wait for the first queued answer, then keep collecting until the batch is full
+    or the group-commit delay has passed. Also returns whether stop() was requested.
+    """
+    batch = []
+    item = await _queue.get()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + config.ANSWER_GROUP_COMMIT_MAX_DELAY_MS / 1000
+
+    while item is not _STOP:
+        batch.append(item)
+        if len(batch) >= config.ANSWER_GROUP_COMMIT_MAX_ROWS:
+            return batch, False
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return batch, False
+        try:
+            item = await asyncio.wait_for(_queue.get(), timeout=remaining)
+        except asyncio.TimeoutError:
+            return batch, False
+    return batch, True
+
+
+async def _flush(batch: List[Tuple[AnswerCreate, asyncio.Future]]) -> None:
+    unique = {}
+    for answer, _ in batch:
+        unique.setdefault((answer.user_id, answer.question_id), answer)
+
+    try:
+        outcome = await answer_repository.create_answers_bulk(list(unique.values()))
+    except Exception as e:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(e)
+        return
+
+    for answer, future in batch:
+        if future.done():
+            continue
+        key = (answer.user_id, answer.question_id)
+        if answer.question_id in outcome["missing_questions"]:
+            future.set_exception(answer_repository.QuestionNotFoundError())
+        elif unique[key] is not answer or key in outcome["duplicates"]:
+            future.set_exception(answer_repository.DuplicateAnswerError())
+        else:
+            future.set_result(outcome["created"][key])
+
+
+async def _run() -> None:
+    stopping = False
+    while not stopping:
+        batch, stopping = await _collect_batch()
+        if batch:
+            await _flush(batch)
+
+
+async def start() -> None:
+    global _queue, _task, _accepting
+    if not config.ANSWER_GROUP_COMMIT_ENABLED or _task is not None:
+        return
+    _queue = asyncio.Queue()
+    _task = asyncio.create_task(_run())
+    _accepting = True
+
+
+async def stop() -> None:
+    """
+    Stop accepting answers, flush everything still queued and stop the flusher.
+    """
+    global _task, _accepting
+    if _task is None:
+        return
+    _accepting = False
+    _queue.put_nowait(_STOP)
+    await _task
+    _task = None
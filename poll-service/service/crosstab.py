@@ -0,0 +1,92 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config.config import Config
+from model.question import Question
+from model.statistics import BreakdownGroup, QuestionBreakdown
+from repository import answer_repository
+from service import user_attributes
+
+config = Config()
+
+DIMENSIONS = ("age_band", "joining_year", "is_registered")
+UNKNOWN_GROUP = "unknown"
+
+
+def _lookup(sorted_keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Position of each value in sorted_keys, and a mask of the values that are present.
+    """
+    positions = np.searchsorted(sorted_keys, values)
+    if not len(sorted_keys):
+        return positions, np.zeros(len(values), dtype=np.bool_)
+    positions = np.minimum(positions, len(sorted_keys) - 1)
+    return positions, sorted_keys[positions] == values
+
+
+def _user_groups(by: str, ages: np.ndarray, joining_dates: np.ndarray,
+                 is_registered: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+    """
+    Group code of every user for dimension `by`, and the label of each code.
+    """
+    if by == "age_band":
+        edges = config.BREAKDOWN_AGE_BANDS
+        labels = [f"<{edges[0]}"] + [f"{low}-{high - 1}" for low, high in zip(edges, edges[1:])] + [f"{edges[-1]}+"]
+        return np.digitize(ages, edges), labels
+    if by == "is_registered":
+        return is_registered.astype(np.int64), ["not_registered", "registered"]
+    if by == "joining_year":
+        years = joining_dates.astype("datetime64[Y]").astype(np.int64) + 1970
+        unique_years, codes = np.unique(years, return_inverse=True)
+        return codes, [str(year) for year in unique_years]
+    raise ValueError(f"Unknown breakdown dimension: {by}")
+
+
+async def breakdown(questions: List[Question], by: str,
+                    question_id: Optional[int] = None) -> List[QuestionBreakdown]:
+    """
+    Cross-tabulate answers by option and user group for `questions`.
+    Answers stream in array batches and are counted with one bincount per batch over a
+    (question, group, option) cell index, so there is no per-answer Python work.
+    Respondents missing from the user attribute copy fall in the 'unknown' group.
+    Pass question_id when `questions` is that single question to read only its answers.
+    """
+    await user_attributes.ensure_loaded()
+    user_ids, ages, joining_dates, is_registered = user_attributes.user_attributes.columns()
+    user_codes, labels = _user_groups(by, ages, joining_dates, is_registered)
+    labels.append(UNKNOWN_GROUP)
+    group_count = len(labels)
+
+    question_ids = np.array(sorted(question.id for question in questions), dtype=np.int64)
+    counts = np.zeros(len(question_ids) * group_count * 4, dtype=np.int64)
+
+    async for batch in answer_repository.iter_answer_columns(question_id):
+        question_index, known_question = _lookup(question_ids, batch[:, 0])
+        user_index, known_user = _lookup(user_ids, batch[:, 1])
+        groups = np.where(known_user, user_codes[user_index] if len(user_codes) else 0, group_count - 1)
+        cells = (question_index * group_count + groups) * 4 + (batch[:, 2] - 1)
+        counts += np.bincount(cells[known_question], minlength=counts.size)
+
+    counts = counts.reshape(len(question_ids), group_count, 4)
+    titles = {question.id: question.title for question in questions}
+    result = []
+    for index, qid in enumerate(question_ids.tolist()):
+        groups = []
+        for group, label in enumerate(labels):
+            option_counts = counts[index, group].tolist()
+            groups.append(BreakdownGroup.model_construct(
+                group=label,
+                total_responses=sum(option_counts),
+                option_1_count=option_counts[0],
+                option_2_count=option_counts[1],
+                option_3_count=option_counts[2],
+                option_4_count=option_counts[3],
+            ))
+        result.append(QuestionBreakdown.model_construct(
+            question_id=qid,
+            question_title=titles[qid],
+            by=by,
+            groups=groups,
+        ))
+    return result
@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, List, Tuple
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export is only offered when pyarrow is installed.
+    pyarrow = None
+
+# Export formats: name -> (media type, file extension).
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# (column name, Arrow type) in the order the repository yields row tuples.
+ANSWER_COLUMNS = [
+    ("id", "int64"),
+    ("user_id", "int64"),
+    ("question_id", "int64"),
+    ("selected_option", "int8"),
+    ("created_at", "timestamp[s]"),
+    ("updated_at", "timestamp[s]"),
+]
+STATISTICS_COLUMNS = [
+    ("question_id", "int64"),
+    ("question_title", "string"),
+    ("selected_option", "int8"),
+    ("option_text", "string"),
+    ("answer_count", "int64"),
+]
+
+Columns = List[Tuple[str, str]]
+
+
+def parquet_available() -> bool:
+    return pyarrow is not None
+
+
+def encode(batches: AsyncIterator[list], columns: Columns, format: str, compress: bool) -> AsyncIterator[bytes]:
+    """
+    Encode row batches as they arrive, yielding roughly one chunk per batch, so memory
+    use is bounded by the batch size rather than by the number of rows exported.
+    """
+    if format == "csv":
+        chunks = _csv(batches, columns)
+    elif format == "ndjson":
+        chunks = _ndjson(batches, columns)
+    else:
+        chunks = _parquet(batches, columns)
+    return _gzip(chunks) if compress else chunks
+
+
+async def _csv(batches: AsyncIterator[list], columns: Columns) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow([name for name, _ in columns])
+    async for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header only: nothing matched the filters.
+        yield buffer.getvalue().encode()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def _ndjson(batches: AsyncIterator[list], columns: Columns) -> AsyncIterator[bytes]:
+    names = [name for name, _ in columns]
+    dumps = json.JSONEncoder(default=_json_default, separators=(",", ":")).encode
+    async for rows in batches:
+        yield "".join([dumps(dict(zip(names, row))) + "\n" for row in rows]).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file that keeps what was written until `take()` hands it out.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _parquet(batches: AsyncIterator[list], columns: Columns) -> AsyncIterator[bytes]:
+    # One row group per batch; the footer is written when the writer closes.
+    schema = pyarrow.schema([(name, pyarrow.type_for_alias(type_name)) for name, type_name in columns])
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    try:
+        async for rows in batches:
+            arrays = [pyarrow.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
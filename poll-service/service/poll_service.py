@@ -1,10 +1,21 @@
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List, Optional
 from fastapi import HTTPException, status
-from model.question import Question, QuestionCreate, QuestionUpdate, QuestionResponse
-from model.answer import Answer, AnswerCreate, AnswerUpdate, UserAnswerResponse
-from model.statistics import QuestionStatistics, AllQuestionsStatistics
+from model.question import Question, QuestionCreate, QuestionUpdate
+from model.answer import (Answer, AnswerCreate, AnswerUpdate, UserAnswerResponse, BulkAnswerResult,
+                          BulkAnswerResponse)
+from model.statistics import (QuestionStatistics, AllQuestionsStatistics, QuestionTimeSeries, TimeSeriesBucket,
+                              QuestionBreakdown)
 from repository import question_repository, answer_repository
 from api.internal_api import user_service_api
+from service.vote_hub import vote_hub
+from service import answer_buffer, crosstab, export, user_attributes
+from config.config import Config
+
+config = Config()
+
+GRANULARITY_SECONDS = {"minute": 60, "hour": 3600, "day": 86400}
+_EPOCH = datetime(1970, 1, 1)
 
 
 async def create_question(question: QuestionCreate) -> int:
@@ -15,29 +26,46 @@ async def create_question(question: QuestionCreate) -> int:
     return question_id
 
 
-async def get_all_questions() -> List[QuestionResponse]:
+async def get_all_questions() -> List[Question]:
     """
     Get all poll questions.
     """
-    questions = await question_repository.get_all()
-    return [QuestionResponse(**q.dict()) for q in questions]
+    return await question_repository.get_all()
+
+
+async def get_questions_page(after_id: Optional[int], limit: int) -> List[Question]:
+    """
+    Get one page of questions with id greater than after_id.
+    """
+    return await question_repository.get_page(after_id, limit)
 
 
-async def get_question_by_id(question_id: int) -> Optional[QuestionResponse]:
+async def iter_questions(after_id: Optional[int] = None) -> AsyncIterator[Question]:
+    """
+    Yield all questions with id greater than after_id, fetched in keyset batches.
+    """
+    while True:
+        questions = await question_repository.get_page(after_id, config.STREAM_BATCH_SIZE)
+        for question in questions:
+            yield question
+        if len(questions) < config.STREAM_BATCH_SIZE:
+            return
+        after_id = questions[-1].id
+
+
+async def get_question_by_id(question_id: int, fresh: bool = False) -> Optional[Question]:
     """
     Get a specific question by ID.
+    Pass fresh=True right after a write so the read cannot land on a lagging replica.
     """
-    question = await question_repository.get_by_id(question_id)
-    if question:
-        return QuestionResponse(**question.dict())
-    return None
+    return await question_repository.get_by_id(question_id, fresh)
 
 
 async def update_question(question_id: int, question_update: QuestionUpdate) -> bool:
     """
     Update an existing question.
     """
-    question = await question_repository.get_by_id(question_id)
+    question = await question_repository.get_by_id(question_id, fresh=True)
     if not question:
         return False
 
@@ -49,11 +77,12 @@ async def delete_question(question_id: int) -> bool:
     """
     Delete a question. This will cascade delete all answers.
     """
-    question = await question_repository.get_by_id(question_id)
+    question = await question_repository.get_by_id(question_id, fresh=True)
     if not question:
         return False
 
     deleted = await question_repository.delete_question(question_id)
+    await vote_hub.resync(question_id)
     return deleted
 
 
@@ -81,26 +110,100 @@ async def submit_answer(answer: AnswerCreate) -> int:
             detail=f"Cannot verify user registration: {str(e)}"
         )
 
-    question = await question_repository.get_by_id(answer.question_id)
-    if not question:
+    try:
+        answer_id = await answer_buffer.submit(answer)
+    except answer_repository.QuestionNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Question with id {answer.question_id} does not exist"
         )
-
-    existing_answer = await answer_repository.get_by_user_and_question(
-        answer.user_id, answer.question_id
-    )
-    if existing_answer:
+    except answer_repository.DuplicateAnswerError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"User {answer.user_id} has already answered question {answer.question_id}. Use update endpoint to change the answer."
         )
-
-    answer_id = await answer_repository.create_answer(answer)
+    await vote_hub.publish(answer.question_id, {answer.selected_option: 1})
     return answer_id
 
 
+async def submit_answers_bulk(answers: List[AnswerCreate]) -> BulkAnswerResponse:
+    """
+    Submit many answers at once. Every row gets its own result instead of failing the whole batch.
+    """
+    if len(answers) > config.BULK_ANSWERS_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {config.BULK_ANSWERS_MAX_ROWS} answers can be submitted at once"
+        )
+
+    try:
+        user_infos = await user_service_api.verify_users_registered(
+            sorted({answer.user_id for answer in answers})
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Cannot verify user registration: {str(e)}"
+        )
+
+    results = [None] * len(answers)
+    to_insert = {}
+    for index, answer in enumerate(answers):
+        user_info = user_infos[answer.user_id]
+        key = (answer.user_id, answer.question_id)
+        if not user_info.get("exists"):
+            results[index] = (
+                "invalid_user", f"User with id {answer.user_id} does not exist"
+            )
+        elif not user_info.get("is_registered"):
+            results[index] = (
+                "invalid_user", f"User with id {answer.user_id} is not registered"
+            )
+        elif key in to_insert:
+            results[index] = (
+                "duplicate", f"User {answer.user_id} answered question {answer.question_id} earlier in this batch"
+            )
+        else:
+            to_insert[key] = answer
+
+    outcome = await answer_repository.create_answers_bulk(list(to_insert.values()))
+
+    deltas_by_question = {}
+    for key in outcome["created"]:
+        answer = to_insert[key]
+        deltas = deltas_by_question.setdefault(answer.question_id, {})
+        deltas[answer.selected_option] = deltas.get(answer.selected_option, 0) + 1
+    for question_id, deltas in deltas_by_question.items():
+        await vote_hub.publish(question_id, deltas)
+
+    response = []
+    for index, answer in enumerate(answers):
+        key = (answer.user_id, answer.question_id)
+        answer_id = None
+        if results[index] is not None:
+            result_status, detail = results[index]
+        elif answer.question_id in outcome["missing_questions"]:
+            result_status, detail = "missing_question", f"Question with id {answer.question_id} does not exist"
+        elif key in outcome["duplicates"]:
+            result_status, detail = (
+                "duplicate", f"User {answer.user_id} has already answered question {answer.question_id}"
+            )
+        else:
+            result_status, detail = "created", None
+            answer_id = outcome["created"][key]
+
+        response.append(BulkAnswerResult(
+            index=index,
+            user_id=answer.user_id,
+            question_id=answer.question_id,
+            status=result_status,
+            answer_id=answer_id,
+            detail=detail
+        ))
+
+    return BulkAnswerResponse(created=len(outcome["created"]), results=response)
+
+
 async def update_answer(user_id: int, question_id: int, answer_update: AnswerUpdate) -> bool:
     """
     Update an existing answer.
@@ -125,14 +228,15 @@ async def update_answer(user_id: int, question_id: int, answer_update: AnswerUpd
             detail=f"Cannot verify user registration: {str(e)}"
         )
 
-    existing_answer = await answer_repository.get_by_user_and_question(user_id, question_id)
-    if not existing_answer:
-        return False
-
-    updated = await answer_repository.update_answer(
+    previous_option = await answer_repository.update_answer(
         user_id, question_id, answer_update.selected_option
     )
-    return updated
+    if previous_option is None:
+        return False
+
+    if previous_option != answer_update.selected_option:
+        await vote_hub.publish(question_id, {previous_option: -1, answer_update.selected_option: 1})
+    return True
 
 
 async def get_question_option_counts(question_id: int) -> Optional[QuestionStatistics]:
@@ -161,6 +265,15 @@ async def get_question_option_counts(question_id: int) -> Optional[QuestionStati
     )
 
 
+async def stream_live_counts(question_id: int) -> AsyncIterator[dict]:
+    """
+    Yield live option-count snapshots for a question as votes come in.
+    """
+    async with vote_hub.subscribe(question_id) as queue:
+        while True:
+            yield await queue.get()
+
+
 async def get_question_total_responses(question_id: int) -> Optional[int]:
     """
     API 2: By question_id → Return how many users answer to this question in total.
@@ -173,26 +286,129 @@ async def get_question_total_responses(question_id: int) -> Optional[int]:
     return total
 
 
-async def get_user_answers(user_id: int) -> List[UserAnswerResponse]:
+def _to_utc(moment: datetime) -> datetime:
+    # Rollup buckets are naive UTC datetimes, as stored by the database.
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+async def get_question_timeseries(question_id: int, granularity: str, step: int = 1,
+                                  start: Optional[datetime] = None,
+                                  end: Optional[datetime] = None) -> Optional[QuestionTimeSeries]:
     """
-    API 3: By user_id → Return the user answer to each question he submitted.
+    Votes per option in consecutive buckets of `step` x `granularity` (minute, hour or day),
+    read from the pre-aggregated answer rollups. Buckets are aligned to the Unix epoch in UTC
+    and empty buckets are included with zero counts.
+    Defaults to the last TIMESERIES_DEFAULT_BUCKETS buckets up to now.
     """
-    answers = await answer_repository.get_answers_by_user(user_id)
+    question = await question_repository.get_by_id(question_id)
+    if not question:
+        return None
 
-    result = []
-    for answer in answers:
-        question = await question_repository.get_by_id(answer.question_id)
-        if question:
-            option_text = getattr(question, f"option_{answer.selected_option}")
-            result.append(UserAnswerResponse(
-                user_id=answer.user_id,
-                question_id=question.id,
-                question_title=question.title,
-                selected_option=answer.selected_option,
-                selected_option_text=option_text
-            ))
+    width = GRANULARITY_SECONDS[granularity] * step
+    end = _to_utc(end) if end else datetime.now(timezone.utc).replace(tzinfo=None)
+    start = _to_utc(start) if start else end - timedelta(seconds=width * config.TIMESERIES_DEFAULT_BUCKETS)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end")
 
-    return result
+    origin = _EPOCH + timedelta(seconds=(start - _EPOCH) // timedelta(seconds=width) * width)
+    bucket_count = -(-(end - origin) // timedelta(seconds=width))
+    if bucket_count > config.TIMESERIES_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range spans {bucket_count} buckets; at most {config.TIMESERIES_MAX_BUCKETS} are allowed. "
+                   f"Use a coarser granularity, a larger step or a shorter range."
+        )
+
+    counts_by_bucket = await answer_repository.get_option_timeseries(
+        question_id, granularity, origin, origin + timedelta(seconds=width * bucket_count), width
+    )
+    empty = {"option_1": 0, "option_2": 0, "option_3": 0, "option_4": 0}
+    buckets = []
+    for index in range(bucket_count):
+        counts = counts_by_bucket.get(index, empty)
+        buckets.append(TimeSeriesBucket.model_construct(
+            bucket_start=origin + timedelta(seconds=width * index),
+            total_responses=counts["option_1"] + counts["option_2"] + counts["option_3"] + counts["option_4"],
+            option_1_count=counts["option_1"],
+            option_2_count=counts["option_2"],
+            option_3_count=counts["option_3"],
+            option_4_count=counts["option_4"],
+        ))
+
+    return QuestionTimeSeries.model_construct(
+        question_id=question_id,
+        granularity=granularity,
+        step=step,
+        start=origin,
+        end=origin + timedelta(seconds=width * bucket_count),
+        buckets=buckets,
+    )
+
+
+async def get_question_breakdown(question_id: int, by: str) -> Optional[QuestionBreakdown]:
+    """
+    Option counts of one question split by a user attribute (age_band, joining_year or is_registered).
+    """
+    question = await question_repository.get_by_id(question_id)
+    if not question:
+        return None
+
+    breakdowns = await crosstab.breakdown([question], by, question_id=question_id)
+    return breakdowns[0]
+
+
+async def get_all_questions_breakdown(by: str) -> List[QuestionBreakdown]:
+    """
+    Option counts of every question split by a user attribute, in one pass over all answers.
+    """
+    questions = await question_repository.get_all()
+    return await crosstab.breakdown(questions, by)
+
+
+def _check_export(format: str, start: Optional[datetime], end: Optional[datetime]) -> None:
+    if format == "parquet" and not export.parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet export is not available: pyarrow is not installed"
+        )
+    if start and end and _to_utc(start) >= _to_utc(end):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+
+
+def export_answers(format: str, compress: bool, question_id: Optional[int] = None, user_id: Optional[int] = None,
+                   start: Optional[datetime] = None, end: Optional[datetime] = None) -> AsyncIterator[bytes]:
+    """
+    Stream answers matching the filters (created_at in [start, end)) encoded as csv, ndjson or parquet.
+    """
+    _check_export(format, start, end)
+    rows = answer_repository.iter_answer_rows(question_id, user_id,
+                                              _to_utc(start) if start else None, _to_utc(end) if end else None)
+    return export.encode(rows, export.ANSWER_COLUMNS, format, compress)
+
+
+def export_statistics(format: str, compress: bool, question_id: Optional[int] = None,
+                      start: Optional[datetime] = None, end: Optional[datetime] = None) -> AsyncIterator[bytes]:
+    """
+    Stream one row per question option with its answer count, all-time or for answers
+    created in [start, end) to the minute.
+    """
+    _check_export(format, start, end)
+    rows = answer_repository.iter_option_count_rows(question_id,
+                                                    _to_utc(start) if start else None, _to_utc(end) if end else None)
+    return export.encode(rows, export.STATISTICS_COLUMNS, format, compress)
+
+
+async def get_user_answers(user_id: int, limit: Optional[int] = None, offset: int = 0) -> List[UserAnswerResponse]:
+    """
+    API 3: By user_id → Return the user answer to each question he submitted.
+    """
+    answers = await answer_repository.get_answers_with_questions_by_user(user_id, limit, offset)
+    return [UserAnswerResponse.model_construct(**answer) for answer in answers]
 
 
 async def get_user_total_answered(user_id: int) -> int:
@@ -209,11 +425,13 @@ async def get_all_questions_statistics() -> List[AllQuestionsStatistics]:
     return how many users choose each of the question options.
     """
     questions = await question_repository.get_all()
+    counts_by_question = await answer_repository.get_option_counts_for_all_questions()
+    empty_counts = {"option_1": 0, "option_2": 0, "option_3": 0, "option_4": 0, "total": 0}
 
     result = []
     for question in questions:
-        option_counts = await answer_repository.get_option_counts_for_question(question.id)
-        total_responses = await answer_repository.count_answers_by_question(question.id)
+        option_counts = counts_by_question.get(question.id, empty_counts)
+        total_responses = option_counts["total"]
 
         statistics = {
             question.option_1: option_counts["option_1"],
@@ -222,7 +440,7 @@ async def get_all_questions_statistics() -> List[AllQuestionsStatistics]:
             question.option_4: option_counts["option_4"]
         }
 
-        result.append(AllQuestionsStatistics(
+        result.append(AllQuestionsStatistics.model_construct(
             question_id=question.id,
             question_title=question.title,
             total_responses=total_responses,
@@ -236,4 +454,27 @@ async def delete_user_answers(user_id: int) -> bool:
     """
     Delete all answers for a user. Called when user is deleted from User Service.
     """
-    return await answer_repository.delete_answers_by_user(user_id)
+    await user_service_api.invalidate_registrations([user_id])
+    user_attributes.user_attributes.remove([user_id])
+    deleted = await answer_repository.delete_answers_by_user(user_id)
+    await vote_hub.resync()
+    return deleted
+
+
+async def delete_users_answers(user_ids: List[int]) -> None:
+    """
+    Delete all answers for many users. Called by the User Service deletion outbox.
+    """
+    await user_service_api.invalidate_registrations(user_ids)
+    user_attributes.user_attributes.remove(user_ids)
+    await answer_repository.delete_answers_by_users(user_ids)
+    await vote_hub.resync()
+
+
+async def invalidate_user_registrations(user_ids: List[int]) -> None:
+    """
+    Forget cached registration status and pull the changed user attributes.
+    Called by User Service when users change.
+    """
+    await user_service_api.invalidate_registrations(user_ids)
+    user_attributes.wake()
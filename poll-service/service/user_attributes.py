@@ -0,0 +1,173 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from api.internal_api import user_service_api
+from config.config import Config
+
+config = Config()
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class UserAttributeStore:
+    """
+    Column-oriented copy of the user attributes the statistics need, one NumPy
+    array per attribute, all aligned and sorted by user id. About 19 bytes per user.
+
+    Every change swaps in new arrays instead of writing into the current ones, so a
+    reader holding `columns()` across awaits keeps a consistent snapshot.
+    """
+
+    def __init__(self):
+        self._columns = (
+            np.empty(0, dtype=np.int64),            # id
+            np.empty(0, dtype=np.int16),            # age
+            np.empty(0, dtype="datetime64[D]"),     # joining_date
+            np.empty(0, dtype=np.bool_),            # is_registered
+        )
+        self.watermark: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._columns[0])
+
+    def columns(self):
+        """
+        Return (ids, ages, joining_dates, is_registered) arrays.
+        """
+        return self._columns
+
+    def upsert(self, rows: List[dict]) -> None:
+        """
+        Insert or overwrite users from User Service change rows; later rows win.
+        """
+        if not rows:
+            return
+        ids = np.fromiter((row["id"] for row in rows), dtype=np.int64, count=len(rows))
+        ages = np.fromiter((row["age"] for row in rows), dtype=np.int16, count=len(rows))
+        joining_dates = np.array([row["joining_date"] for row in rows], dtype="datetime64[D]")
+        registered = np.fromiter((row["is_registered"] for row in rows), dtype=np.bool_, count=len(rows))
+
+        # Keep the last row for each id.
+        unique_ids, last_from_end = np.unique(ids[::-1], return_index=True)
+        keep = len(ids) - 1 - last_from_end
+        ids, ages, joining_dates, registered = unique_ids, ages[keep], joining_dates[keep], registered[keep]
+
+        current_ids, current_ages, current_dates, current_registered = self._columns
+        positions = np.searchsorted(current_ids, ids)
+        if len(current_ids):
+            existing = current_ids[np.minimum(positions, len(current_ids) - 1)] == ids
+        else:
+            existing = np.zeros(len(ids), dtype=np.bool_)
+
+        new_ages = current_ages.copy()
+        new_dates = current_dates.copy()
+        new_registered = current_registered.copy()
+        new_ages[positions[existing]] = ages[existing]
+        new_dates[positions[existing]] = joining_dates[existing]
+        new_registered[positions[existing]] = registered[existing]
+
+        added = ~existing
+        all_ids = np.concatenate([current_ids, ids[added]])
+        order = np.argsort(all_ids, kind="stable")
+        self._columns = (
+            all_ids[order],
+            np.concatenate([new_ages, ages[added]])[order],
+            np.concatenate([new_dates, joining_dates[added]])[order],
+            np.concatenate([new_registered, registered[added]])[order],
+        )
+
+    def remove(self, user_ids: Iterable[int]) -> None:
+        ids = self._columns[0]
+        keep = ~np.isin(ids, np.fromiter(user_ids, dtype=np.int64))
+        self._columns = tuple(column[keep] for column in self._columns)
+
+
+user_attributes = UserAttributeStore()
+
+_task: Optional[asyncio.Task] = None
+_wake_event: Optional[asyncio.Event] = None
+_refresh_lock = asyncio.Lock()
+
+
+async def refresh_once() -> int:
+    """
+    Pull users changed since the last refresh from the User Service.
+    Each refresh re-reads USER_ATTRIBUTES_OVERLAP_SECONDS before the watermark, so
+    changes committed late with an earlier updated_at (or still replicating on the
+    User Service side) are not missed; re-applying a row is harmless.
+    Returns the number of rows applied.
+    """
+    async with _refresh_lock:
+        since = _EPOCH
+        if user_attributes.watermark is not None:
+            since = max(_EPOCH, user_attributes.watermark - timedelta(seconds=config.USER_ATTRIBUTES_OVERLAP_SECONDS))
+        after_id = 0
+        newest = user_attributes.watermark
+        applied = 0
+
+        while True:
+            rows = await user_service_api.get_user_changes(since, after_id, config.USER_ATTRIBUTES_BATCH_SIZE)
+            user_attributes.upsert(rows)
+            applied += len(rows)
+            if rows:
+                since = datetime.fromisoformat(rows[-1]["updated_at"]).replace(tzinfo=None)
+                after_id = rows[-1]["id"]
+                newest = since if newest is None else max(newest, since)
+            if len(rows) < config.USER_ATTRIBUTES_BATCH_SIZE:
+                break
+
+        user_attributes.watermark = newest or _EPOCH
+        return applied
+
+
+async def ensure_loaded() -> None:
+    """
+    Make sure at least one full sync has completed, e.g. before the first breakdown.
+    """
+    if user_attributes.watermark is None:
+        await refresh_once()
+
+
+async def _run() -> None:
+    while True:
+        try:
+            await refresh_once()
+        except Exception as e:
+            print(f"User attribute refresh failed: {e}")
+
+        try:
+            await asyncio.wait_for(_wake_event.wait(), timeout=config.USER_ATTRIBUTES_REFRESH_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wake_event.clear()
+
+
+def wake() -> None:
+    """
+    Ask the refresher to run now, e.g. after the User Service reported user changes.
+    """
+    if _wake_event is not None:
+        _wake_event.set()
+
+
+async def start() -> None:
+    global _task, _wake_event
+    if not config.USER_ATTRIBUTES_REFRESH_ENABLED or _task is not None:
+        return
+    _wake_event = asyncio.Event()
+    _task = asyncio.create_task(_run())
+
+
+async def stop() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
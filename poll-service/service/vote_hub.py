@@ -0,0 +1,152 @@
+import asyncio
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+from cache import shared_store
+from config.config import Config
+from repository import answer_repository
+
+config = Config()
+
+_CHANNEL = "poll:votes"
+
+
+class _Channel:
+    def __init__(self):
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.counts: Optional[dict] = None
+        self.needs_resync = True
+        self.changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+
+class VoteHub:
+    """
+    In-process pub/sub of live option counts, one channel per question.
+
+    Writers publish count deltas after their transaction commits; the hub applies
+    them to the channel's snapshot and fans the snapshot out to subscribers,
+    coalescing bursts into at most `max_updates_per_second` messages per question.
+    Snapshots are reloaded from question_option_counts when a channel opens, when
+    a resync is requested, and every `resync_seconds`, which heals any drift.
+    Questions without subscribers cost nothing.
+
+    With several worker processes, deltas and resync requests are also broadcast
+    through the shared store so subscribers on every worker see every vote.
+    """
+
+    def __init__(self, max_updates_per_second: float, resync_seconds: float,
+                 load_counts: Callable[[int], Awaitable[dict]]):
+        self._min_interval = 1.0 / max_updates_per_second
+        self._resync_seconds = resync_seconds
+        self._load_counts = load_counts
+        self._channels: Dict[int, _Channel] = {}
+
+    async def publish(self, question_id: int, deltas: Dict[int, int]) -> None:
+        """
+        Apply option deltas, e.g. {2: -1, 3: 1} when an answer moves from option 2 to 3.
+        """
+        self._apply(question_id, deltas)
+        await shared_store.broadcast(_CHANNEL, {"question_id": question_id, "deltas": deltas})
+
+    async def resync(self, question_id: Optional[int] = None) -> None:
+        """
+        Reload counts from the database for one question, or all open channels.
+        """
+        self._mark_stale(question_id)
+        await shared_store.broadcast(_CHANNEL, {"question_id": question_id, "resync": True})
+
+    def on_broadcast(self, message: dict) -> None:
+        """
+        Apply a delta or resync request published by another worker.
+        """
+        if message.get("resync"):
+            self._mark_stale(message["question_id"])
+        else:
+            self._apply(message["question_id"], {int(option): delta for option, delta in message["deltas"].items()})
+
+    def _apply(self, question_id: int, deltas: Dict[int, int]) -> None:
+        channel = self._channels.get(question_id)
+        if channel is None:
+            return
+        if channel.counts is not None:
+            for option, delta in deltas.items():
+                channel.counts[f"option_{option}"] += delta
+        channel.changed.set()
+
+    def _mark_stale(self, question_id: Optional[int]) -> None:
+        channels = self._channels.values() if question_id is None else [self._channels.get(question_id)]
+        for channel in channels:
+            if channel is not None:
+                channel.needs_resync = True
+                channel.changed.set()
+
+    @asynccontextmanager
+    async def subscribe(self, question_id: int) -> AsyncIterator[asyncio.Queue]:
+        """
+        Yield a queue that always holds the latest snapshot for the question.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        channel = self._channels.get(question_id)
+        if channel is None:
+            channel = self._channels[question_id] = _Channel()
+            channel.changed.set()
+            channel.task = asyncio.create_task(self._run(question_id, channel))
+        elif channel.counts is not None:
+            queue.put_nowait(self._snapshot(question_id, channel))
+        channel.subscribers.add(queue)
+
+        try:
+            yield queue
+        finally:
+            channel.subscribers.discard(queue)
+            if not channel.subscribers:
+                self._channels.pop(question_id, None)
+                channel.task.cancel()
+
+    async def _run(self, question_id: int, channel: _Channel) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(channel.changed.wait(), timeout=self._resync_seconds)
+            except asyncio.TimeoutError:
+                channel.needs_resync = True
+            channel.changed.clear()
+
+            if channel.needs_resync:
+                channel.needs_resync = False
+                try:
+                    channel.counts = dict(await self._load_counts(question_id))
+                except Exception as e:
+                    print(f"Failed to load live counts for question {question_id}: {e}")
+                    channel.needs_resync = True
+
+            if channel.counts is not None:
+                snapshot = self._snapshot(question_id, channel)
+                for queue in channel.subscribers:
+                    if queue.full():
+                        queue.get_nowait()
+                    queue.put_nowait(snapshot)
+
+            await asyncio.sleep(self._min_interval)
+
+    @staticmethod
+    def _snapshot(question_id: int, channel: _Channel) -> dict:
+        counts = channel.counts
+        return {
+            "question_id": question_id,
+            "total_responses": sum(counts[f"option_{option}"] for option in range(1, 5)),
+            "option_1_count": counts["option_1"],
+            "option_2_count": counts["option_2"],
+            "option_3_count": counts["option_3"],
+            "option_4_count": counts["option_4"],
+        }
+
+
+vote_hub = VoteHub(
+    max_updates_per_second=config.LIVE_MAX_UPDATES_PER_SECOND,
+    resync_seconds=config.LIVE_RESYNC_SECONDS,
+    # Snapshots come from the primary so a lagging replica never rolls live counts back.
+    load_counts=partial(answer_repository.get_option_counts_for_question, fresh=True),
+)
+shared_store.subscribe(_CHANNEL, vote_hub.on_broadcast)
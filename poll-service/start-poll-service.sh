@@ -28,18 +28,24 @@ docker run -d \
   -e MYSQL_DATABASE=poll_db \
   -e MYSQL_ROOT_PASSWORD=root_password \
   -p 3307:3306 \
-  -v "$SCRIPT_DIR/resources/db-migrations:/docker-entrypoint-initdb.d" \
   mysql:8.0 --default-authentication-plugin=mysql_native_password 2>/dev/null || echo "Database container already exists (this is OK)"
 
 echo "⏳ Waiting for MySQL to initialize ()..."
 sleep 5
 
+echo "🗄️  Applying database migrations..."
+python migrate.py
+
 echo ""
 echo "✅ Setup complete!"
 echo ""
 echo "To start the Poll Service, run:"
 echo "  uvicorn main:app --reload --port 8001"
 echo ""
+echo "Or, to use every core, with several worker processes:"
+echo "  docker compose up -d redis"
+echo "  WORKERS=4 SHARED_STORE_URL=redis://localhost:6379/0 gunicorn -c gunicorn.conf.py main:app"
+echo ""
 echo "Then open: http://localhost:8001/docs"
 echo ""
 
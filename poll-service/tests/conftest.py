@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# Imported below, before pytest loads it as a plugin.
+pytest.register_assert_rewrite("service_common.testing")
+from service_common.testing import use_test_database  # noqa: E402
+
+# Tests import the service's modules the way main.py does, from the service directory.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+use_test_database()
+
+pytest_plugins = ["service_common.testing"]
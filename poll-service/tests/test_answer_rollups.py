@@ -0,0 +1,41 @@
+"""
+Rollup buckets follow UTC whatever the server's default time zone is.
+"""
+from datetime import datetime, timezone
+
+from service_common.testing import rolled_back
+from model.answer import AnswerCreate
+from model.question import QuestionCreate
+from repository import answer_repository, question_repository
+
+
+def test_connections_use_utc(db, run):
+    assert run(db.fetch_val("SELECT @@session.time_zone")) == "+00:00"
+
+
+def test_answer_is_counted_in_its_utc_buckets(db, run):
+    async def answer_and_read_buckets():
+        question_id = await question_repository.create_question(
+            QuestionCreate(title="Rollup buckets", option_1="a", option_2="b", option_3="c", option_4="d")
+        )
+        await answer_repository.create_answer(AnswerCreate(user_id=700101, question_id=question_id, selected_option=3))
+        created = await db.fetch_val(
+            "SELECT UNIX_TIMESTAMP(created_at) FROM answers WHERE question_id = :question_id",
+            values={"question_id": question_id},
+        )
+        rows = await db.fetch_all(
+            "SELECT granularity, bucket_start, selected_option, answer_count FROM answer_rollups "
+            "WHERE question_id = :question_id",
+            values={"question_id": question_id},
+        )
+        return created, rows
+
+    created, rows = run(rolled_back(db, answer_and_read_buckets))
+
+    created_utc = datetime.fromtimestamp(int(created), timezone.utc).replace(tzinfo=None)
+    assert sorted((row["granularity"], row["bucket_start"], row["selected_option"], row["answer_count"])
+                  for row in rows) == [
+        ("day", created_utc.replace(hour=0, minute=0, second=0), 3, 1),
+        ("hour", created_utc.replace(minute=0, second=0), 3, 1),
+        ("minute", created_utc.replace(second=0), 3, 1),
+    ]
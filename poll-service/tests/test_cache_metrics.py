@@ -0,0 +1,27 @@
+from prometheus_client import REGISTRY
+
+from cache.ttl_lru_cache import TTLLRUCache
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_lookups_and_evictions_are_exported():
+    before = {
+        "hit": _sample("cache_lookups_total", cache="metrics-test", result="hit"),
+        "miss": _sample("cache_lookups_total", cache="metrics-test", result="miss"),
+        "eviction": _sample("cache_evictions_total", cache="metrics-test"),
+    }
+    cache = TTLLRUCache(max_size=1, ttl_seconds=30, name="metrics-test")
+
+    cache.get("a")
+    cache.set("a", 1)
+    cache.get("a")
+    cache.set("b", 2)
+    cache.get("a")
+
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 2, 1)
+    assert _sample("cache_lookups_total", cache="metrics-test", result="hit") - before["hit"] == 1
+    assert _sample("cache_lookups_total", cache="metrics-test", result="miss") - before["miss"] == 2
+    assert _sample("cache_evictions_total", cache="metrics-test") - before["eviction"] == 1
@@ -0,0 +1,69 @@
+"""
+Concurrent submissions of the same answer rely on the unique_user_question key
+alone: exactly one insert wins and the other surfaces as DuplicateAnswerError.
+Overlapping bulk inserts split the shared pairs between them without deadlocking.
+"""
+import asyncio
+
+import pytest
+
+from model.answer import AnswerCreate
+from model.question import QuestionCreate
+from repository import answer_repository, question_repository
+from repository.answer_repository import DuplicateAnswerError
+
+USER_ID = 700001
+
+
+@pytest.fixture
+def question_id(db, run):
+    question_id = run(question_repository.create_question(
+        QuestionCreate(title="Concurrent answers", option_1="a", option_2="b", option_3="c", option_4="d")
+    ))
+    yield question_id
+    # Cascades to the answer, its option count and its rollups.
+    run(question_repository.delete_question(question_id))
+
+
+def test_concurrent_duplicate_submissions_create_one_answer(db, run, question_id):
+    answer = AnswerCreate(user_id=USER_ID, question_id=question_id, selected_option=2)
+
+    # Each task gets its own connection, so the two INSERTs really race.
+    results = run(asyncio.gather(
+        answer_repository.create_answer(answer),
+        answer_repository.create_answer(answer),
+        return_exceptions=True,
+    ))
+
+    created = [result for result in results if isinstance(result, int)]
+    failed = [result for result in results if isinstance(result, BaseException)]
+    assert len(created) == 1
+    assert len(failed) == 1 and isinstance(failed[0], DuplicateAnswerError)
+
+    rows = run(db.fetch_val(
+        "SELECT COUNT(*) FROM answers WHERE user_id = :user_id AND question_id = :question_id",
+        values={"user_id": USER_ID, "question_id": question_id},
+    ))
+    assert rows == 1
+    counts = run(answer_repository.get_option_counts_for_question(question_id, fresh=True))
+    assert counts == {"option_1": 0, "option_2": 1, "option_3": 0, "option_4": 0}
+
+
+def test_overlapping_bulk_inserts_split_the_shared_pairs(db, run, question_id):
+    user_ids = range(USER_ID + 10, USER_ID + 210)
+    first = [AnswerCreate(user_id=user_id, question_id=question_id, selected_option=1) for user_id in user_ids[:150]]
+    second = [AnswerCreate(user_id=user_id, question_id=question_id, selected_option=1) for user_id in user_ids[50:]]
+
+    outcomes = run(asyncio.gather(
+        answer_repository.create_answers_bulk(first),
+        answer_repository.create_answers_bulk(list(reversed(second))),
+    ))
+
+    created = [set(outcome["created"]) for outcome in outcomes]
+    assert not created[0] & created[1]
+    assert created[0] | created[1] == {(user_id, question_id) for user_id in user_ids}
+    assert outcomes[0]["duplicates"] == {(answer.user_id, question_id) for answer in first} - created[0]
+    assert outcomes[1]["duplicates"] == {(answer.user_id, question_id) for answer in second} - created[1]
+
+    counts = run(answer_repository.get_option_counts_for_question(question_id, fresh=True))
+    assert counts == {"option_1": 200, "option_2": 0, "option_3": 0, "option_4": 0}
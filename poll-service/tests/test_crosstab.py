@@ -0,0 +1,90 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from model.question import Question
+from service import crosstab, user_attributes
+
+QUESTIONS = [
+    Question(id=7, title="Favourite season", option_1="Spring", option_2="Summer", option_3="Autumn", option_4="Winter"),
+    Question(id=3, title="Morning or night", option_1="Morning", option_2="Night", option_3="Both", option_4="Neither"),
+]
+
+# (question_id, user_id, selected_option); user 99 has no attribute row.
+ANSWERS = [
+    np.array([[3, 1, 1], [3, 2, 2], [7, 1, 4]], dtype=np.int64),
+    np.array([[7, 2, 4], [7, 3, 1], [7, 99, 2], [5, 1, 1]], dtype=np.int64),
+]
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = user_attributes.UserAttributeStore()
+    store.upsert([
+        {"id": 1, "age": 17, "joining_date": date(2023, 3, 1), "is_registered": True},
+        {"id": 2, "age": 30, "joining_date": date(2024, 7, 9), "is_registered": False},
+        {"id": 3, "age": 70, "joining_date": date(2024, 1, 2), "is_registered": True},
+    ])
+    # Marks the copy as loaded, so breakdown() does not call the User Service.
+    store.watermark = datetime(2024, 12, 31)
+    monkeypatch.setattr(user_attributes, "user_attributes", store)
+
+    async def iter_answer_columns(question_id=None):
+        for batch in ANSWERS:
+            yield batch
+    monkeypatch.setattr(crosstab.answer_repository, "iter_answer_columns", iter_answer_columns)
+    return store
+
+
+def _groups(result, question_id: int) -> dict:
+    breakdown = next(item for item in result if item.question_id == question_id)
+    return {
+        group.group: [group.option_1_count, group.option_2_count, group.option_3_count, group.option_4_count]
+        for group in breakdown.groups
+    }
+
+
+def test_breakdown_by_age_band(run, store):
+    result = run(crosstab.breakdown(QUESTIONS, "age_band"))
+
+    assert [item.question_id for item in result] == [3, 7]
+    assert [item.question_title for item in result] == ["Morning or night", "Favourite season"]
+    assert _groups(result, 7) == {
+        "<18": [0, 0, 0, 1],
+        "18-24": [0, 0, 0, 0],
+        "25-34": [0, 0, 0, 1],
+        "35-44": [0, 0, 0, 0],
+        "45-54": [0, 0, 0, 0],
+        "55-64": [0, 0, 0, 0],
+        "65+": [1, 0, 0, 0],
+        "unknown": [0, 1, 0, 0],
+    }
+    assert _groups(result, 3)["<18"] == [1, 0, 0, 0]
+    assert _groups(result, 3)["25-34"] == [0, 1, 0, 0]
+
+
+def test_breakdown_by_joining_year_and_registration(run, store):
+    by_year = run(crosstab.breakdown(QUESTIONS, "joining_year"))
+    assert _groups(by_year, 7) == {"2023": [0, 0, 0, 1], "2024": [1, 0, 0, 1], "unknown": [0, 1, 0, 0]}
+
+    by_registration = run(crosstab.breakdown(QUESTIONS, "is_registered"))
+    assert _groups(by_registration, 7) == {
+        "not_registered": [0, 0, 0, 1],
+        "registered": [1, 0, 0, 1],
+        "unknown": [0, 1, 0, 0],
+    }
+    assert [group.total_responses for group in by_registration[1].groups] == [1, 2, 1]
+
+
+def test_breakdown_with_no_known_users(run, store):
+    store.remove([1, 2, 3])
+
+    result = run(crosstab.breakdown(QUESTIONS, "is_registered"))
+
+    assert _groups(result, 3) == {"not_registered": [0, 0, 0, 0], "registered": [0, 0, 0, 0], "unknown": [1, 1, 0, 0]}
+
+
+def test_breakdown_rejects_unknown_dimension(run, store):
+    with pytest.raises(ValueError):
+        run(crosstab.breakdown(QUESTIONS, "country"))
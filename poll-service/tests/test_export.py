@@ -0,0 +1,65 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from service import export
+
+ROWS = [
+    [(1, 10, 100, 1, datetime(2024, 1, 1, 12, 0, 0), datetime(2024, 1, 1, 12, 0, 0))],
+    [(2, 11, 100, 4, datetime(2024, 1, 2, 8, 30, 0), datetime(2024, 1, 3, 9, 0, 0)),
+     (3, 12, 101, 2, datetime(2024, 1, 2, 9, 15, 5), datetime(2024, 1, 2, 9, 15, 5))],
+]
+
+
+async def _batches(batches):
+    for batch in batches:
+        yield batch
+
+
+async def _collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+def _export(run, format: str, batches=ROWS, compress: bool = False) -> bytes:
+    return run(_collect(export.encode(_batches(batches), export.ANSWER_COLUMNS, format, compress)))
+
+
+def test_csv_has_header_and_every_row(run):
+    lines = list(csv.reader(io.StringIO(_export(run, "csv").decode())))
+
+    assert lines[0] == [name for name, _ in export.ANSWER_COLUMNS]
+    assert lines[1:] == [[str(value) for value in row] for batch in ROWS for row in batch]
+
+
+def test_csv_without_rows_is_header_only(run):
+    assert _export(run, "csv", batches=[]) == b"id,user_id,question_id,selected_option,created_at,updated_at\n"
+
+
+def test_ndjson_is_one_object_per_row(run):
+    objects = [json.loads(line) for line in _export(run, "ndjson").decode().splitlines()]
+
+    assert [item["id"] for item in objects] == [1, 2, 3]
+    assert objects[1] == {"id": 2, "user_id": 11, "question_id": 100, "selected_option": 4,
+                          "created_at": "2024-01-02T08:30:00", "updated_at": "2024-01-03T09:00:00"}
+
+
+def test_gzip_wraps_the_same_bytes(run):
+    assert gzip.decompress(_export(run, "ndjson", compress=True)) == _export(run, "ndjson")
+
+
+def test_parquet_round_trips_with_one_row_group_per_batch(run):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+
+    data = _export(run, "parquet")
+    parquet_file = pyarrow.parquet.ParquetFile(io.BytesIO(data))
+    table = parquet_file.read()
+
+    assert parquet_file.num_row_groups == len(ROWS)
+    assert table.column_names == [name for name, _ in export.ANSWER_COLUMNS]
+    assert [tuple(row.values()) for row in table.to_pylist()] == [row for batch in ROWS for row in batch]
+    assert str(table.schema.field("selected_option").type) == "int8"
@@ -0,0 +1,134 @@
+"""
+Every answer_repository / question_repository query, EXPLAINed against a seeded database.
+
+Each repository function runs with sample arguments inside a transaction that is
+rolled back, and every statement it issues is EXPLAINed first (see
+service_common.query_plans). A plan row that reads a whole table (type ALL) or a
+whole index (type index) fails the check unless the function is listed in
+FULL_SCAN_ALLOWED because it deliberately reads everything.
+"""
+from datetime import datetime
+
+import pytest
+
+from service_common.query_plans import PlanRecorder, full_scans
+from service_common.testing import rolled_back
+from model.answer import AnswerCreate
+from model.question import QuestionCreate, QuestionUpdate
+from repository import answer_repository, question_repository
+
+SEED_QUESTIONS = 300
+SEED_USERS = 200
+SEED_USER_ID_START = 100000
+
+FULL_SCAN_ALLOWED = {
+    "answer_repository.get_all_answers",
+    "answer_repository.get_option_counts_for_all_questions",
+    "answer_repository.iter_answer_columns.all",
+    "answer_repository.reconcile_option_counts",
+    "question_repository.get_all",
+}
+
+
+async def _drain(batches) -> None:
+    async for _ in batches:
+        pass
+
+
+CHECKS = [
+    ("question_repository.get_by_id", lambda: question_repository.get_by_id(1)),
+    ("question_repository.get_all", lambda: question_repository.get_all()),
+    ("question_repository.get_page", lambda: question_repository.get_page(1, 100)),
+    ("question_repository.create_question", lambda: question_repository.create_question(
+        QuestionCreate(title="Plan check question", option_1="a", option_2="b", option_3="c", option_4="d")
+    )),
+    ("question_repository.update_question", lambda: question_repository.update_question(
+        1, QuestionUpdate(title="Plan check title")
+    )),
+    ("answer_repository.get_by_id", lambda: answer_repository.get_by_id(1)),
+    ("answer_repository.get_by_user_and_question", lambda: answer_repository.get_by_user_and_question(1, 1)),
+    ("answer_repository.get_all_answers", lambda: answer_repository.get_all_answers()),
+    ("answer_repository.get_answers_by_user", lambda: answer_repository.get_answers_by_user(1)),
+    ("answer_repository.get_answers_with_questions_by_user",
+     lambda: answer_repository.get_answers_with_questions_by_user(1, 100, 0)),
+    ("answer_repository.get_answers_by_question", lambda: answer_repository.get_answers_by_question(1)),
+    ("answer_repository.count_answers_by_user", lambda: answer_repository.count_answers_by_user(1)),
+    ("answer_repository.count_answers_by_question", lambda: answer_repository.count_answers_by_question(1)),
+    ("answer_repository.get_option_counts_for_question",
+     lambda: answer_repository.get_option_counts_for_question(1)),
+    ("answer_repository.get_option_counts_for_all_questions",
+     lambda: answer_repository.get_option_counts_for_all_questions()),
+    ("answer_repository.get_option_timeseries", lambda: answer_repository.get_option_timeseries(
+        1, "minute", datetime(2024, 1, 1), datetime(2024, 1, 2), 900
+    )),
+    ("answer_repository.iter_answer_columns", lambda: _drain(answer_repository.iter_answer_columns(1))),
+    ("answer_repository.iter_answer_columns.all", lambda: _drain(answer_repository.iter_answer_columns())),
+    ("answer_repository.iter_answer_rows", lambda: _drain(answer_repository.iter_answer_rows(
+        1, None, datetime(2024, 1, 1), datetime(2024, 1, 2)
+    ))),
+    ("answer_repository.iter_answer_rows.by_user", lambda: _drain(answer_repository.iter_answer_rows(user_id=1))),
+    ("answer_repository.iter_option_count_rows", lambda: _drain(answer_repository.iter_option_count_rows())),
+    ("answer_repository.iter_option_count_rows.window", lambda: _drain(answer_repository.iter_option_count_rows(
+        None, datetime(2024, 1, 1), datetime(2024, 1, 2)
+    ))),
+    ("answer_repository.create_answer", lambda: answer_repository.create_answer(
+        AnswerCreate(user_id=900000, question_id=1, selected_option=1)
+    )),
+    ("answer_repository.create_answers_bulk", lambda: answer_repository.create_answers_bulk([
+        AnswerCreate(user_id=900001, question_id=1, selected_option=1),
+        AnswerCreate(user_id=900002, question_id=2, selected_option=2),
+    ])),
+    ("answer_repository.update_answer", lambda: answer_repository.update_answer(1, 1, 2)),
+    ("answer_repository.delete_answer", lambda: answer_repository.delete_answer(1)),
+    ("answer_repository.delete_answers_by_user", lambda: answer_repository.delete_answers_by_user(2)),
+    ("answer_repository.delete_answers_by_users", lambda: answer_repository.delete_answers_by_users([1, 2])),
+    ("answer_repository.reconcile_option_counts",
+     lambda: answer_repository.reconcile_option_counts(dry_run=True)),
+    ("question_repository.delete_question", lambda: question_repository.delete_question(1)),
+]
+
+
+async def _seed(database) -> None:
+    # Enough rows that the optimizer costs index access the way it would in production
+    # rather than scanning a handful of sample rows.
+    existing = await database.fetch_val(
+        "SELECT COUNT(*) FROM answers WHERE user_id >= :start", values={"start": SEED_USER_ID_START}
+    )
+    if existing:
+        return
+    await database.execute(f"""
+        INSERT /*+ SET_VAR(cte_max_recursion_depth = {SEED_QUESTIONS}) */
+        INTO questions (title, option_1, option_2, option_3, option_4)
+        WITH RECURSIVE seq (n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < {SEED_QUESTIONS})
+        SELECT CONCAT('Plan seed question ', n), 'a', 'b', 'c', 'd' FROM seq
+    """)
+    question_ids = [record["id"] for record in await database.fetch_all("SELECT id FROM questions ORDER BY id")]
+    answers = [
+        AnswerCreate(user_id=SEED_USER_ID_START + user, question_id=question_id,
+                     selected_option=(user + question_id) % 4 + 1)
+        for user in range(SEED_USERS)
+        for question_id in question_ids[user % 7::7]
+    ]
+    await answer_repository.create_answers_bulk(answers)
+    await database.execute("ANALYZE TABLE questions, answers, question_option_counts, answer_rollups")
+
+
+@pytest.fixture(scope="module")
+def seeded(db, run):
+    run(_seed(db))
+    return db
+
+
+@pytest.mark.parametrize("name, call", CHECKS, ids=[name for name, _ in CHECKS])
+def test_query_plan(seeded, run, name, call):
+    async def explain():
+        await question_repository.question_cache.clear()
+        with PlanRecorder(seeded) as recorder:
+            await call()
+        return recorder.statements
+
+    statements = run(rolled_back(seeded, explain))
+
+    assert statements, f"{name} issued no statement that could be EXPLAINed"
+    if name not in FULL_SCAN_ALLOWED:
+        assert full_scans(statements) == []
@@ -0,0 +1,36 @@
+"""
+_to_answer and _to_question build models from databases' own Record objects
+(databases 0.9.0, MySQL backend) without validation; the result must match what
+validating the same row produces.
+"""
+from service_common.testing import fetch_canned
+from model.answer import Answer
+from model.question import Question
+from repository import answer_repository, question_repository
+
+
+def _columns(select_list: str) -> list:
+    return [column.strip() for column in select_list.split(",")]
+
+
+def test_to_answer_matches_validated_model(run):
+    columns = _columns(answer_repository._COLUMNS)
+    rows = [(1, 10, 100, 2), (2, 11, 100, 4)]
+
+    records = run(fetch_canned(columns, rows))
+    answers = [answer_repository._to_answer(record) for record in records]
+
+    assert answers == [Answer(**dict(zip(columns, row))) for row in rows]
+    assert answers[0].model_dump_json() == '{"id":1,"user_id":10,"question_id":100,"selected_option":2}'
+    assert answers[0].model_fields_set == set(columns)
+
+
+def test_to_question_matches_validated_model(run):
+    columns = _columns(question_repository._COLUMNS)
+    rows = [(7, "Favourite colour?", "Red", "Green", "Blue", "Other")]
+
+    records = run(fetch_canned(columns, rows))
+    question = question_repository._to_question(records[0])
+
+    assert question == Question(**dict(zip(columns, rows[0])))
+    assert question.model_fields_set == set(columns)
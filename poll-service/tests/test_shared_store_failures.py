@@ -0,0 +1,72 @@
+"""
+With a shared store configured but Redis failing, caches degrade to misses and
+skipped stores, and write bookkeeping never raises after a committed write.
+"""
+import json
+
+import pytest
+import redis.asyncio as redis
+
+from cache import resource_versions, shared_store
+from cache.shared_store import SharedCache
+from cache.ttl_lru_cache import TTLLRUCache
+
+
+class _DownPipeline:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        raise redis.ConnectionError("Connection refused")
+
+
+class _DownRedis:
+    """
+    Client for a Redis server that refuses every command.
+    """
+
+    def pipeline(self, transaction=True):
+        return _DownPipeline()
+
+    def __getattr__(self, name):
+        async def refuse(*args, **kwargs):
+            raise redis.ConnectionError("Connection refused")
+        return refuse
+
+
+@pytest.fixture
+def redis_down(monkeypatch):
+    monkeypatch.setattr(shared_store, "_client", _DownRedis())
+    monkeypatch.setattr(resource_versions, "_missed_bump", False)
+
+
+@pytest.fixture
+def cache():
+    return SharedCache("test:cache", TTLLRUCache(max_size=10, ttl_seconds=30),
+                       encode=json.dumps, decode=json.loads)
+
+
+def test_reads_are_misses(run, redis_down, cache):
+    assert run(cache.get(1)) is None
+    assert run(cache.get_many([1, 2])) == {}
+    assert cache.local.misses == 3
+
+
+def test_generation_is_unknown_and_stores_are_skipped(run, redis_down, cache):
+    generation = run(cache.generation())
+
+    assert generation == shared_store.UNKNOWN_GENERATION
+    run(cache.set(1, {"exists": True}, generation))
+    run(cache.set(1, {"exists": True}))
+
+
+def test_invalidation_and_clear_do_not_raise(run, redis_down, cache):
+    run(cache.invalidate(1, 2))
+    run(cache.clear())
+
+
+def test_bump_does_not_raise_and_etag_is_withheld(run, redis_down):
+    run(resource_versions.bump("answers"))
+
+    assert resource_versions._missed_bump
+    assert run(resource_versions.etag("questions", "answers")) is None
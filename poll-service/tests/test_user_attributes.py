@@ -0,0 +1,63 @@
+from datetime import date
+
+from service.user_attributes import UserAttributeStore
+
+
+def _row(user_id: int, age: int, joining_date: date = date(2024, 1, 1), is_registered: bool = True) -> dict:
+    return {"id": user_id, "age": age, "joining_date": joining_date, "is_registered": is_registered}
+
+
+def _contents(store: UserAttributeStore) -> list:
+    ids, ages, joining_dates, is_registered = store.columns()
+    return list(zip(ids.tolist(), ages.tolist(), joining_dates.astype(str).tolist(), is_registered.tolist()))
+
+
+def test_upsert_keeps_columns_sorted_by_id():
+    store = UserAttributeStore()
+    store.upsert([_row(30, 40), _row(10, 20, date(2023, 5, 6), False)])
+    store.upsert([_row(20, 30)])
+
+    assert _contents(store) == [
+        (10, 20, "2023-05-06", False),
+        (20, 30, "2024-01-01", True),
+        (30, 40, "2024-01-01", True),
+    ]
+
+
+def test_upsert_overwrites_existing_users_and_adds_new_ones():
+    store = UserAttributeStore()
+    store.upsert([_row(1, 20), _row(2, 30)])
+    store.upsert([_row(2, 31, is_registered=False), _row(3, 40)])
+
+    assert _contents(store) == [
+        (1, 20, "2024-01-01", True),
+        (2, 31, "2024-01-01", False),
+        (3, 40, "2024-01-01", True),
+    ]
+
+
+def test_upsert_keeps_the_last_row_for_a_repeated_id():
+    store = UserAttributeStore()
+    store.upsert([_row(5, 20), _row(6, 60), _row(5, 21), _row(5, 22, date(2022, 2, 2))])
+
+    assert _contents(store) == [(5, 22, "2022-02-02", True), (6, 60, "2024-01-01", True)]
+
+
+def test_upsert_swaps_in_new_arrays():
+    store = UserAttributeStore()
+    store.upsert([_row(1, 20)])
+    snapshot = store.columns()
+    store.upsert([_row(1, 21), _row(2, 30)])
+
+    assert snapshot[0].tolist() == [1] and snapshot[1].tolist() == [20]
+    assert len(store) == 2
+
+
+def test_remove_drops_only_the_given_users():
+    store = UserAttributeStore()
+    store.upsert([_row(1, 20), _row(2, 30), _row(3, 40)])
+    store.remove([2, 99])
+
+    assert _contents(store) == [(1, 20, "2024-01-01", True), (3, 40, "2024-01-01", True)]
+    store.remove([])
+    assert len(store) == 2
@@ -1,21 +1,85 @@
+from typing import List, Optional
+
 import httpx
 
 from config.config import Config
+from service_common.instrumentation import InstrumentedTransport
 
 config = Config()
 
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=config.POLL_SERVICE_BASE_URL,
+        timeout=httpx.Timeout(
+            config.POLL_SERVICE_TIMEOUT_SECONDS,
+            connect=config.POLL_SERVICE_CONNECT_TIMEOUT_SECONDS,
+        ),
+        transport=InstrumentedTransport(
+            "poll-service",
+            http2=config.POLL_SERVICE_HTTP2,
+            limits=httpx.Limits(
+                max_connections=config.POLL_SERVICE_MAX_CONNECTIONS,
+                max_keepalive_connections=config.POLL_SERVICE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config.POLL_SERVICE_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        ),
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the shared Poll Service client, creating it on first use.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+    return _client
+
+
+async def start_client() -> None:
+    get_client()
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def delete_users_answers(user_ids: List[int]) -> None:
+    """
+    Delete the answers of many users in the Poll Service.
+    Raises exception if the Poll Service is unavailable or rejects the request.
+    """
+    url = "/internal/users/answers"
+    try:
+        response = await get_client().request("DELETE", url, json={"user_ids": user_ids})
+        response.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        raise Exception(f"Poll Service error: {exc}")
+    except httpx.RequestError as exc:
+        raise Exception(f"Cannot connect to Poll Service: {exc}")
 
-async def delete_user_answers(user_id: int) -> bool:
-    url = f"{config.POLL_SERVICE_BASE_URL}/internal/users/{user_id}/answers"
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.delete(url)
-            response.raise_for_status()
-            return True
-        except httpx.HTTPStatusError as exc:
-            print(f"Failed to delete answers for user {user_id}: {exc}")
-            return False
-        except httpx.RequestError as exc:
-            print(f"Request error while deleting answers for user {user_id}: {exc}")
-            return False
 
+async def notify_users_changed(user_ids: List[int]) -> bool:
+    """
+    Tell the Poll Service to drop its cached registration status for these users.
+    Best effort, bounded by POLL_SERVICE_NOTIFY_TIMEOUT_SECONDS so it cannot hold up
+    the write it follows; the Poll Service cache TTL covers notifications that are lost.
+    """
+    url = "/internal/users/registration-invalidations"
+    try:
+        response = await get_client().post(url, json={"user_ids": user_ids},
+                                           timeout=config.POLL_SERVICE_NOTIFY_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        return True
+    except httpx.HTTPStatusError as exc:
+        print(f"Failed to notify Poll Service about users {user_ids}: {exc}")
+        return False
+    except httpx.RequestError as exc:
+        print(f"Request error while notifying Poll Service about users {user_ids}: {exc}")
+        return False
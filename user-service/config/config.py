@@ -9,3 +9,31 @@ class Config(BaseSettings):
     MYSQL_PORT: str = "3306"
     DATABASE_URL: str = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
     POLL_SERVICE_BASE_URL: str = "http://localhost:8001"
+    POLL_SERVICE_TIMEOUT_SECONDS: float = 5.0
+    POLL_SERVICE_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    POLL_SERVICE_NOTIFY_TIMEOUT_SECONDS: float = 0.5
+    POLL_SERVICE_MAX_CONNECTIONS: int = 100
+    POLL_SERVICE_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    POLL_SERVICE_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    POLL_SERVICE_HTTP2: bool = False
+    STREAM_BATCH_SIZE: int = 1000
+    OUTBOX_DISPATCH_ENABLED: bool = True
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_RETRY_BASE_SECONDS: int = 1
+    OUTBOX_RETRY_MAX_SECONDS: int = 300
+    RUN_MIGRATIONS_ON_STARTUP: bool = False
+    MIGRATION_BACKFILL_BATCH_SIZE: int = 5000
+    MIGRATION_BACKFILL_PAUSE_SECONDS: float = 0.05
+    OUTBOX_CLAIM_SECONDS: int = 60
+    WORKERS: int = 1
+    BIND: str = "0.0.0.0:8000"
+    DATABASE_POOL_MIN_SIZE: int = 1
+    DATABASE_POOL_MAX_SIZE: int = 10
+    DATABASE_REPLICA_URL: str = ""
+    DATABASE_REPLICA_POOL_MIN_SIZE: int = 1
+    DATABASE_REPLICA_POOL_MAX_SIZE: int = 10
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 1.0
+    BULK_USERS_MAX_ROWS: int = 50000
+    BULK_INSERT_CHUNK_SIZE: int = 500
+    BULK_INSERT_MAX_ATTEMPTS: int = 3
@@ -1,19 +1,110 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, status
+import csv
+import json
+from datetime import date, datetime
+from typing import AsyncIterator, List, Optional, Union
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from model.user import User
 from model.user_create import UserCreate
 from model.user_update import UserUpdate
 from model.user_response import UserResponse
+from model.user_verify_batch import UserVerifyBatch, UserVerification
+from model.user_attributes import UserAttributes
+from model.user_bulk import BulkUserResponse
+from model.user_search import UserSearch
 from service import user_service
+from config.config import Config
+
+config = Config()
 
 router = APIRouter(prefix="/users", tags=["users"]
                    )
 
+# The list endpoint serializes trusted models straight to JSON bytes instead of
+# re-validating them through response_model.
+_USER_LIST = TypeAdapter(List[User])
+_USER_ATTRIBUTES_LIST = TypeAdapter(List[UserAttributes])
+
 
 @router.get("/", response_model=List[UserResponse], status_code=status.HTTP_200_OK)
-async def get_all_users():
-    users = await user_service.get_all()
-    return users
+async def get_all_users(after_id: Optional[int] = Query(None, ge=0),
+                        limit: Optional[int] = Query(None, ge=1, le=1000),
+                        format: str = Query("json", pattern="^(json|ndjson)$")):
+    """
+    Get all users.
+    Pass limit (and after_id from the X-Next-After-Id header) to page by id,
+    or format=ndjson to stream every user one JSON object per line.
+    """
+    if format == "ndjson":
+        lines = (
+            user.model_dump_json() + "\n"
+            async for user in user_service.iter_users(after_id)
+        )
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    if limit is None and after_id is None:
+        users = await user_service.get_all()
+        return Response(_USER_LIST.dump_json(users), media_type="application/json")
+
+    page_size = limit or 1000
+    users = await user_service.get_page(after_id, page_size)
+    headers = {"X-Next-After-Id": str(users[-1].id)} if len(users) == page_size else None
+    return Response(_USER_LIST.dump_json(users), media_type="application/json", headers=headers)
+
+
+@router.get("/search", response_model=List[UserResponse], status_code=status.HTTP_200_OK)
+async def search_users(email: Optional[str] = Query(None),
+                       first_name: Optional[str] = Query(None, min_length=1, description="First name prefix"),
+                       last_name: Optional[str] = Query(None, min_length=1, description="Last name prefix"),
+                       is_registered: Optional[bool] = Query(None),
+                       min_age: Optional[int] = Query(None, ge=0),
+                       max_age: Optional[int] = Query(None, ge=0),
+                       joined_from: Optional[date] = Query(None),
+                       joined_to: Optional[date] = Query(None),
+                       after_id: Optional[int] = Query(None, ge=0),
+                       limit: int = Query(100, ge=1, le=1000)):
+    """
+    Find users by exact email, first/last name prefix, registration, age range and
+    joining date range (ranges inclusive); all given filters must match.
+    Results are ordered by id; pass the X-Next-After-Id header as after_id for the next page.
+    """
+    filters = UserSearch(
+        email=email,
+        first_name_prefix=first_name,
+        last_name_prefix=last_name,
+        is_registered=is_registered,
+        min_age=min_age,
+        max_age=max_age,
+        joined_from=joined_from,
+        joined_to=joined_to,
+    )
+    users = await user_service.search(filters, after_id, limit)
+    headers = {"X-Next-After-Id": str(users[-1].id)} if len(users) == limit else None
+    return Response(_USER_LIST.dump_json(users), media_type="application/json", headers=headers)
+
+
+@router.post("/verify-batch", response_model=List[UserVerification], status_code=status.HTTP_200_OK)
+async def verify_users_registration(batch: UserVerifyBatch):
+    """
+    Verify many users in one call. Used by Poll Service for bulk workflows.
+    Returns exists/is_registered for each requested id.
+    """
+    results = await user_service.check_users_registered(batch.user_ids)
+    return list(results.values())
+
+
+@router.get("/changes", response_model=List[UserAttributes], status_code=status.HTTP_200_OK)
+async def get_user_changes(since: datetime = Query(datetime(1970, 1, 1)),
+                           after_id: int = Query(0, ge=0),
+                           limit: int = Query(1000, ge=1, le=10000)):
+    """
+    Users created or changed since a point in time, ordered by (updated_at, id).
+    Used by Poll Service to keep its copy of user attributes current: pass the last
+    row's updated_at and id as since/after_id to fetch the next page.
+    """
+    users = await user_service.get_changed_since(since, after_id, limit)
+    return Response(_USER_ATTRIBUTES_LIST.dump_json(users), media_type="application/json")
 
 
 @router.get("/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
@@ -34,6 +125,115 @@ async def create_user(user: UserCreate):
     return created_user
 
 
+def _too_many_rows() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"At most {config.BULK_USERS_MAX_ROWS} users can be imported at once"
+    )
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[bytes]:
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    yield pending
+
+
+async def _iter_csv_records(request: Request) -> AsyncIterator[List[str]]:
+    """
+    Parse CSV records as lines arrive, skipping blank lines. A quoted field may
+    span lines, so lines are collected until their quotes balance.
+    """
+    lines = []
+    quotes = 0
+    encoding = "utf-8-sig"
+    async for line in _iter_lines(request):
+        try:
+            text = line.decode(encoding)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Body is not valid UTF-8")
+        encoding = "utf-8"
+        lines.append(text + "\n")
+        quotes += text.count('"')
+        if quotes % 2:
+            continue
+        for record in csv.reader(lines):
+            if record:
+                yield record
+        lines = []
+        quotes = 0
+    if lines:
+        for record in csv.reader(lines):
+            if record:
+                yield record
+
+
+async def _read_bulk_rows(request: Request) -> List[Union[dict, str]]:
+    """
+    Parse a bulk import body into one dict per user, or an error string for a row
+    that could not be parsed. NDJSON and CSV are read line by line as they arrive and
+    stop at BULK_USERS_MAX_ROWS instead of buffering an oversized upload.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type in ("application/x-ndjson", "application/jsonl"):
+        rows = []
+        async for line in _iter_lines(request):
+            if not line.strip():
+                continue
+            if len(rows) == config.BULK_USERS_MAX_ROWS:
+                raise _too_many_rows()
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                rows.append(f"Invalid JSON: {e}")
+                continue
+            rows.append(row if isinstance(row, dict) else "Row must be a JSON object")
+        return rows
+
+    if content_type == "text/csv":
+        header = None
+        rows = []
+        async for record in _iter_csv_records(request):
+            if header is None:
+                header = record
+                continue
+            if len(rows) == config.BULK_USERS_MAX_ROWS:
+                raise _too_many_rows()
+            # Empty cells are left out so optional columns such as is_registered keep their default.
+            rows.append({key: value for key, value in zip(header, record) if value != ""})
+        return rows
+
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Body is not valid JSON")
+    users = body.get("users") if isinstance(body, dict) else None
+    if not isinstance(users, list) or not users:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='Body must be {"users": [...]} with at least one user'
+        )
+    return [row if isinstance(row, dict) else "Row must be a JSON object" for row in users]
+
+
+@router.post("/bulk", response_model=BulkUserResponse, status_code=status.HTTP_200_OK)
+async def create_users_bulk(request: Request):
+    """
+    Create many users at once, e.g. when onboarding a partner.
+    The body is JSON {"users": [UserCreate, ...]}, NDJSON (Content-Type: application/x-ndjson,
+    one UserCreate per line) or CSV (Content-Type: text/csv, with a header row of UserCreate fields).
+    Each row is reported by its position as created (with user_id), duplicate (email already
+    taken or repeated in the batch) or invalid (with the validation errors).
+    """
+    rows = await _read_bulk_rows(request)
+    response = await user_service.create_users_bulk(rows)
+    return Response(response.model_dump_json(), media_type="application/json")
+
+
 @router.put("/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
 async def update_user(user_id: int, user: UserUpdate):
     updated = await user_service.update_user(user_id, user)
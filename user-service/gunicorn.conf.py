@@ -0,0 +1,33 @@
+"""
+Multi-worker launch configuration.
+
+Usage:
+    WORKERS=4 gunicorn -c gunicorn.conf.py main:app
+
+Each worker is a separate process with its own event loop and database pool,
+so the service scales across cores. The User Service keeps no cross-request
+state in memory; every worker runs a deletion outbox dispatcher, and they
+claim rows from the outbox so each deletion is delivered once.
+"""
+import os
+import tempfile
+
+from config.config import Config
+
+config = Config()
+
+bind = config.BIND
+workers = config.WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+graceful_timeout = 30
+keepalive = 5
+
+if workers > 1:
+    # Let /metrics aggregate the histograms of every worker.
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="user-service-metrics-"))
+
+
+def child_exit(server, worker):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,6 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST
 from controller.user_controller import router as user_router
-from repository.database import database
+from repository.database import database, connect_all, disconnect_all
+from config.config import Config
+from migrations import runner
+from service_common.instrumentation import MetricsMiddleware, render_latest
+from api.internal_api import poll_service_api
+from service import outbox_dispatcher
+
+config = Config()
 
 app = FastAPI(
     title="User Service API",
@@ -8,17 +16,24 @@ app = FastAPI(
     version="1.0.0"
 )
 
+app.add_middleware(MetricsMiddleware)
 app.include_router(user_router)
 
 
 @app.on_event("startup")
 async def startup():
-    await database.connect()
+    await connect_all()
+    if config.RUN_MIGRATIONS_ON_STARTUP:
+        await runner.migrate(database)
+    await poll_service_api.start_client()
+    await outbox_dispatcher.start()
 
 
 @app.on_event("shutdown")
 async def shutdown():
-    await database.disconnect()
+    await outbox_dispatcher.stop()
+    await poll_service_api.close_client()
+    await disconnect_all()
 
 
 @app.get("/")
@@ -29,3 +44,10 @@ async def root():
         "version": "1.0.0"
     }
 
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint: request, database query and outbound call latencies.
+    """
+    return Response(render_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,22 @@
+"""
+This service's schema migrations: the shared runner in service_common.migrations,
+bound to resources/db-migrations and the backfill settings in config.
+"""
+import os
+from functools import partial
+
+from service_common import migrations
+from config.config import Config
+
+config = Config()
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "resources", "db-migrations")
+
+discover = partial(migrations.discover, MIGRATIONS_DIR)
+migrate = partial(migrations.migrate, directory=MIGRATIONS_DIR)
+backfill_in_batches = partial(
+    migrations.backfill_in_batches,
+    batch_size=config.MIGRATION_BACKFILL_BATCH_SIZE,
+    pause_seconds=config.MIGRATION_BACKFILL_PAUSE_SECONDS,
+)
@@ -0,0 +1,8 @@
+from datetime import date, datetime
+from pydantic import BaseModel
+class UserAttributes(BaseModel):
+    id: int
+    age: int
+    joining_date: date
+    is_registered: bool
+    updated_at: datetime
@@ -0,0 +1,11 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+class BulkUserResult(BaseModel):
+    index: int
+    email: Optional[str] = None
+    status: str = Field(..., description="created, duplicate or invalid")
+    user_id: Optional[int] = None
+    detail: Optional[str] = None
+class BulkUserResponse(BaseModel):
+    created: int
+    results: List[BulkUserResult]
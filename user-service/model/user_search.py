@@ -0,0 +1,12 @@
+from typing import Optional
+from pydantic import BaseModel
+from datetime import date
+class UserSearch(BaseModel):
+    email: Optional[str] = None
+    first_name_prefix: Optional[str] = None
+    last_name_prefix: Optional[str] = None
+    is_registered: Optional[bool] = None
+    min_age: Optional[int] = None
+    max_age: Optional[int] = None
+    joined_from: Optional[date] = None
+    joined_to: Optional[date] = None
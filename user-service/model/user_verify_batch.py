@@ -0,0 +1,10 @@
+from typing import List
+from pydantic import BaseModel, Field
+class UserVerifyBatch(BaseModel):
+    user_ids: List[int] = Field(..., min_length=1, max_length=10000)
+
+
+class UserVerification(BaseModel):
+    user_id: int
+    exists: bool
+    is_registered: bool
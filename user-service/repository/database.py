@@ -1,6 +1,32 @@
-from databases import Database
+from service_common.instrumentation import InstrumentedDatabase
 from config.config import Config
 
 config = Config()
-database = Database(config.DATABASE_URL)
+database = InstrumentedDatabase(
+    config.DATABASE_URL,
+    pool="primary",
+    min_size=config.DATABASE_POOL_MIN_SIZE,
+    max_size=config.DATABASE_POOL_MAX_SIZE,
+)
 
+# Read-only queries that tolerate replication lag go to the replica. Writes and
+# reads that must see a write just made stay on `database`. Without
+# DATABASE_REPLICA_URL both names refer to the primary.
+replica_database = InstrumentedDatabase(
+    config.DATABASE_REPLICA_URL,
+    pool="replica",
+    min_size=config.DATABASE_REPLICA_POOL_MIN_SIZE,
+    max_size=config.DATABASE_REPLICA_POOL_MAX_SIZE,
+) if config.DATABASE_REPLICA_URL else database
+
+
+async def connect_all() -> None:
+    await database.connect()
+    if replica_database is not database:
+        await replica_database.connect()
+
+
+async def disconnect_all() -> None:
+    if replica_database is not database:
+        await replica_database.disconnect()
+    await database.disconnect()
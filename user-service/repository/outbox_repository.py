@@ -0,0 +1,68 @@
+from typing import List
+from repository.database import database
+
+
+async def claim_due(limit: int, claim_seconds: int) -> List[dict]:
+    """
+    Claim up to `limit` due rows by pushing their next attempt `claim_seconds` out,
+    so dispatchers in other worker processes skip them while this one delivers.
+    A claim that is never resolved simply expires and the row is retried.
+    Ordered by next_attempt_at so idx_next_attempt_at serves both the range and the order.
+    """
+    query = """
+        SELECT id, user_id, attempts
+        FROM user_deletion_outbox
+        WHERE next_attempt_at <= CURRENT_TIMESTAMP
+        ORDER BY next_attempt_at, id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    """
+    async with database.transaction():
+        results = await database.fetch_all(query, values={"limit": limit})
+        rows = [dict(record) for record in results]
+        if rows:
+            values = {f"id_{i}": row["id"] for i, row in enumerate(rows)}
+            placeholders = ", ".join(f":{key}" for key in values)
+            values["claim_seconds"] = claim_seconds
+            await database.execute(
+                f"""
+                UPDATE user_deletion_outbox
+                SET next_attempt_at = CURRENT_TIMESTAMP + INTERVAL :claim_seconds SECOND
+                WHERE id IN ({placeholders})
+                """,
+                values,
+            )
+    return rows
+
+
+async def delete_delivered(outbox_ids: List[int]) -> None:
+    if not outbox_ids:
+        return
+    values = {f"id_{i}": outbox_id for i, outbox_id in enumerate(outbox_ids)}
+    placeholders = ", ".join(f":{key}" for key in values)
+    query = f"DELETE FROM user_deletion_outbox WHERE id IN ({placeholders})"
+    await database.execute(query, values)
+
+
+async def mark_failed(outbox_ids: List[int], error: str, retry_base_seconds: int, retry_max_seconds: int) -> None:
+    """
+    Record a failed delivery and schedule the next attempt with exponential backoff.
+    """
+    if not outbox_ids:
+        return
+    values = {f"id_{i}": outbox_id for i, outbox_id in enumerate(outbox_ids)}
+    placeholders = ", ".join(f":{key}" for key in values)
+    query = f"""
+        UPDATE user_deletion_outbox
+        SET next_attempt_at = CURRENT_TIMESTAMP
+                + INTERVAL LEAST(:retry_base_seconds * POW(2, attempts), :retry_max_seconds) SECOND,
+            attempts = attempts + 1,
+            last_error = :error
+        WHERE id IN ({placeholders})
+    """
+    values.update({
+        "error": error[:500],
+        "retry_base_seconds": retry_base_seconds,
+        "retry_max_seconds": retry_max_seconds,
+    })
+    await database.execute(query, values)
@@ -1,23 +1,145 @@
-from typing import List, Optional
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional
+from pymysql.err import OperationalError
 from model.user import User
 from model.user_create import UserCreate
 from model.user_update import UserUpdate
 from model.user_response import UserResponse
-from repository.database import database
+from model.user_attributes import UserAttributes
+from model.user_search import UserSearch
+from repository.database import database, replica_database
+from config.config import Config
+
+config = Config()
+
+ER_LOCK_DEADLOCK = 1213
+
+_COLUMNS = "id, first_name, last_name, email, age, address, joining_date, is_registered"
+_FIELDS = tuple(_COLUMNS.split(", "))
+
+
+def _to_user(record) -> User:
+    # Rows come from our own table, so skip validation and build the model directly.
+    # record._mapping is the driver row, which iterates like a tuple in _COLUMNS
+    # order; zipping it is much cheaper than looking each column up by name.
+    fields = dict(zip(_FIELDS, record._mapping))
+    # MySQL returns BOOLEAN as 0/1, which validation used to coerce.
+    fields["is_registered"] = bool(fields["is_registered"])
+    return User.model_construct(**fields)
 
 
 async def get_by_id(user_id: int) -> Optional[User]:
-    query = "SELECT * FROM users WHERE id = :user_id"
+    query = f"SELECT {_COLUMNS} FROM users WHERE id = :user_id"
     result = await database.fetch_one(query, values={"user_id": user_id})
     if result:
-        return User(**dict(result))
+        return _to_user(result)
     return None
 
 
 async def get_all() -> List[User]:
-    query = "SELECT * FROM users ORDER BY id"
-    results = await database.fetch_all(query)
-    return [User(**dict(record)) for record in results]
+    query = f"SELECT {_COLUMNS} FROM users ORDER BY id"
+    results = await replica_database.fetch_all(query)
+    return [_to_user(record) for record in results]
+
+
+async def get_page(after_id: Optional[int], limit: int) -> List[User]:
+    """
+    Keyset pagination: up to `limit` users with id greater than `after_id`, ordered by id.
+    """
+    query = f"SELECT {_COLUMNS} FROM users WHERE id > :after_id ORDER BY id LIMIT :limit"
+    results = await replica_database.fetch_all(query, values={"after_id": after_id or 0, "limit": limit})
+    return [_to_user(record) for record in results]
+
+
+def _like_prefix(prefix: str) -> str:
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _search_index(filters: UserSearch) -> Optional[str]:
+    """
+    The index the search is forced to read, for the selective filters only: an exact
+    email or a name prefix matches few rows, so reading them through their index and
+    sorting by id beats walking PRIMARY in id order, which the optimizer tends to
+    pick for ORDER BY id LIMIT. Age, joining date and registration ranges can match
+    most of the table, where that PRIMARY walk stopping at LIMIT is the cheaper plan,
+    so they are left to the optimizer.
+    """
+    if filters.email is not None:
+        return "email"
+    if filters.last_name_prefix:
+        return "idx_users_last_name"
+    if filters.first_name_prefix:
+        return "idx_users_first_name"
+    return None
+
+
+async def search(filters: UserSearch, after_id: Optional[int], limit: int) -> List[User]:
+    """
+    Keyset pagination over the users matching every given filter: up to `limit` with
+    id greater than `after_id`, ordered by id. Name filters match case-insensitive
+    prefixes; age and joining date ranges are inclusive.
+    """
+    conditions = ["id > :after_id"]
+    values = {"after_id": after_id or 0, "limit": limit}
+    if filters.email is not None:
+        conditions.append("email = :email")
+        values["email"] = filters.email
+    if filters.first_name_prefix:
+        conditions.append("first_name LIKE :first_name")
+        values["first_name"] = _like_prefix(filters.first_name_prefix)
+    if filters.last_name_prefix:
+        conditions.append("last_name LIKE :last_name")
+        values["last_name"] = _like_prefix(filters.last_name_prefix)
+    if filters.is_registered is not None:
+        conditions.append("is_registered = :is_registered")
+        values["is_registered"] = filters.is_registered
+    if filters.min_age is not None:
+        conditions.append("age >= :min_age")
+        values["min_age"] = filters.min_age
+    if filters.max_age is not None:
+        conditions.append("age <= :max_age")
+        values["max_age"] = filters.max_age
+    if filters.joined_from is not None:
+        conditions.append("joining_date >= :joined_from")
+        values["joined_from"] = filters.joined_from
+    if filters.joined_to is not None:
+        conditions.append("joining_date <= :joined_to")
+        values["joined_to"] = filters.joined_to
+
+    index = _search_index(filters)
+    table = f"users FORCE INDEX ({index})" if index else "users"
+    query = f"SELECT {_COLUMNS} FROM {table} WHERE {' AND '.join(conditions)} ORDER BY id LIMIT :limit"
+    results = await replica_database.fetch_all(query, values=values)
+    return [_to_user(record) for record in results]
+
+
+async def get_changed_since(since: datetime, after_id: int, limit: int) -> List[UserAttributes]:
+    """
+    Keyset scan over (updated_at, id): up to `limit` users changed at or after `since`,
+    continuing after `after_id` among users changed exactly at `since`.
+    """
+    query = """
+        SELECT id, age, joining_date, is_registered, updated_at
+        FROM users
+        WHERE updated_at >= :since
+          AND (updated_at > :since OR id > :after_id)
+        ORDER BY updated_at, id
+        LIMIT :limit
+    """
+    results = await replica_database.fetch_all(
+        query, values={"since": since, "after_id": after_id, "limit": limit}
+    )
+    return [
+        UserAttributes.model_construct(
+            id=record["id"],
+            age=record["age"],
+            joining_date=record["joining_date"],
+            is_registered=bool(record["is_registered"]),
+            updated_at=record["updated_at"],
+        )
+        for record in results
+    ]
 
 
 async def create_user(user: UserCreate) -> int:
@@ -42,6 +164,86 @@ async def create_user(user: UserCreate) -> int:
     return last_record_id["id"]
 
 
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _in_clause(name: str, items: list):
+    values = {f"{name}_{i}": item for i, item in enumerate(items)}
+    return ", ".join(f":{key}" for key in values), values
+
+
+async def create_users_bulk(users: List[UserCreate]) -> dict:
+    """
+    Insert many users in one transaction using chunked multi-row INSERT IGNOREs.
+    `users` must not contain the same email twice. An email that is already taken,
+    including by an import committing at the same time, is reported as a duplicate.
+    The whole transaction is retried if MySQL rolls it back to break a deadlock.
+    Returns dict with:
+      'duplicates': set of emails (lower-cased) already taken
+      'created': dict mapping lower-cased email to the new user id
+    """
+    # Inserting in email order makes overlapping imports take their unique-index
+    # locks in the same order, so they mostly queue instead of deadlocking.
+    users = sorted(users, key=lambda user: user.email.lower())
+    for attempt in range(1, config.BULK_INSERT_MAX_ATTEMPTS + 1):
+        try:
+            async with database.transaction():
+                return await _insert_users(users)
+        except OperationalError as exc:
+            if not exc.args or exc.args[0] != ER_LOCK_DEADLOCK or attempt == config.BULK_INSERT_MAX_ATTEMPTS:
+                raise
+            print(f"Bulk user insert deadlocked, retrying (attempt {attempt})")
+            await asyncio.sleep(0.05 * attempt)
+
+
+async def _insert_users(users: List[UserCreate]) -> dict:
+    # One lookup against the unique email index for the whole batch. As the
+    # transaction's first read it also fixes its REPEATABLE READ snapshot, so the
+    # read-backs below see rows that existed before plus this transaction's own
+    # inserts, never rows another import commits meanwhile.
+    placeholders, values = _in_clause("email", [user.email for user in users])
+    query = f"SELECT email FROM users WHERE email IN ({placeholders})"
+    existing = {record["email"].lower() for record in await database.fetch_all(query, values=values)}
+    to_insert = [user for user in users if user.email.lower() not in existing]
+
+    created = {}
+    for chunk in _chunks(to_insert, config.BULK_INSERT_CHUNK_SIZE):
+        rows = []
+        values = {}
+        for i, user in enumerate(chunk):
+            rows.append(f"(:first_name_{i}, :last_name_{i}, :email_{i}, :age_{i}, :address_{i}, "
+                        f":joining_date_{i}, :is_registered_{i})")
+            values[f"first_name_{i}"] = user.first_name
+            values[f"last_name_{i}"] = user.last_name
+            values[f"email_{i}"] = user.email
+            values[f"age_{i}"] = user.age
+            values[f"address_{i}"] = user.address
+            values[f"joining_date_{i}"] = user.joining_date
+            values[f"is_registered_{i}"] = user.is_registered
+        # IGNORE skips a row whose email was taken after the lookup above instead
+        # of failing the chunk with a duplicate key error (1062).
+        query = f"""
+                INSERT IGNORE INTO users (first_name, last_name, email, age, address, joining_date, is_registered)
+                VALUES {', '.join(rows)}
+                """
+        await database.execute(query, values)
+
+        # Read the ids back by email rather than assuming the chunk got consecutive ids.
+        # A skipped row is absent here: its competing row is not in this snapshot.
+        emails = {user.email.lower() for user in chunk}
+        placeholders, values = _in_clause("email", [user.email for user in chunk])
+        query = f"SELECT id, email FROM users WHERE email IN ({placeholders})"
+        for record in await database.fetch_all(query, values=values):
+            email = record["email"].lower()
+            if email in emails:
+                created[email] = record["id"]
+
+    duplicates = {user.email.lower() for user in users} - created.keys()
+    return {"duplicates": duplicates, "created": created}
+
+
 async def update_user(user_id: int, user: UserUpdate) -> bool:
     update_fields = []
     values = {"user_id": user_id}
@@ -77,8 +279,17 @@ async def update_user(user_id: int, user: UserUpdate) -> bool:
 
 
 async def delete_user(user_id: int) -> bool:
+    """
+    Delete a user and, in the same transaction, queue the deletion of their
+    poll answers in user_deletion_outbox.
+    """
     query = "DELETE FROM users WHERE id = :user_id"
-    result = await database.execute(query, values={"user_id": user_id})
+    outbox_query = "INSERT INTO user_deletion_outbox (user_id) VALUES (:user_id)"
+
+    async with database.transaction():
+        result = await database.execute(query, values={"user_id": user_id})
+        if result > 0:
+            await database.execute(outbox_query, values={"user_id": user_id})
     return result > 0
 
 
@@ -89,9 +300,26 @@ async def register_user(user_id: int, is_registered: bool) -> bool:
 
 
 async def check_user_registered(user_id: int) -> Optional[bool]:
+    # Read from the primary: the Poll Service re-verifies as soon as a change
+    # invalidates its cache and then caches the answer, so a lagging replica
+    # would hand it a stale status to keep for the whole cache TTL.
     query = "SELECT is_registered FROM users WHERE id = :user_id"
     result = await database.fetch_one(query, values={"user_id": user_id})
     if result:
         return result["is_registered"]
     return None
 
+
+async def check_users_registered(user_ids: List[int]) -> Dict[int, bool]:
+    """
+    Return is_registered for every existing user in user_ids, keyed by id.
+    Users that don't exist are absent from the result.
+    Reads the primary, for the same reason as check_user_registered.
+    """
+    if not user_ids:
+        return {}
+    values = {f"user_id_{i}": user_id for i, user_id in enumerate(user_ids)}
+    placeholders = ", ".join(f":{key}" for key in values)
+    query = f"SELECT id, is_registered FROM users WHERE id IN ({placeholders})"
+    results = await database.fetch_all(query, values=values)
+    return {record["id"]: bool(record["is_registered"]) for record in results}
@@ -0,0 +1,12 @@
+-- User deletions waiting to be cascaded to the Poll Service.
+-- Rows are written in the same transaction as the user delete and removed
+-- by the outbox dispatcher once the Poll Service has deleted the answers.
+CREATE TABLE IF NOT EXISTS user_deletion_outbox (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error VARCHAR(500) NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_next_attempt_at (next_attempt_at)
+);
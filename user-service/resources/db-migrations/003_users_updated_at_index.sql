@@ -0,0 +1,3 @@
+-- Supports the (updated_at, id) keyset scan behind GET /users/changes,
+-- which the Poll Service polls to keep its copy of user attributes current.
+ALTER TABLE users ADD INDEX idx_users_updated_at (updated_at, id);
@@ -0,0 +1,13 @@
+-- Indexes behind the filters of GET /users/search. Email lookups use the
+-- existing unique key. Name filters are prefix matches, so one index on
+-- (last_name, first_name) serves "last name starts with", alone or with a
+-- first name. The composite (is_registered, joining_date) index turns
+-- "registered users who joined between X and Y" into a single range.
+-- One ALTER TABLE adds them all: the statement succeeds or fails as a whole, so a
+-- failed run leaves no index behind to break the retry with "Duplicate key name".
+ALTER TABLE users
+    ADD INDEX idx_users_last_name (last_name, first_name),
+    ADD INDEX idx_users_first_name (first_name),
+    ADD INDEX idx_users_age (age),
+    ADD INDEX idx_users_joining_date (joining_date),
+    ADD INDEX idx_users_registered_joining_date (is_registered, joining_date);
@@ -0,0 +1,81 @@
+import asyncio
+from typing import Optional
+
+from api.internal_api import poll_service_api
+from config.config import Config
+from repository import outbox_repository
+
+config = Config()
+
+_task: Optional[asyncio.Task] = None
+_wake_event: Optional[asyncio.Event] = None
+
+
+async def dispatch_once() -> int:
+    """
+    Deliver one batch of due user deletions to the Poll Service.
+    Returns the number of outbox rows delivered.
+    """
+    rows = await outbox_repository.claim_due(config.OUTBOX_BATCH_SIZE, config.OUTBOX_CLAIM_SECONDS)
+    if not rows:
+        return 0
+
+    outbox_ids = [row["id"] for row in rows]
+    user_ids = sorted({row["user_id"] for row in rows})
+    try:
+        await poll_service_api.delete_users_answers(user_ids)
+    except Exception as e:
+        print(f"Failed to cascade deletion of users {user_ids} to Poll Service: {e}")
+        await outbox_repository.mark_failed(
+            outbox_ids, str(e), config.OUTBOX_RETRY_BASE_SECONDS, config.OUTBOX_RETRY_MAX_SECONDS
+        )
+        return 0
+
+    await outbox_repository.delete_delivered(outbox_ids)
+    return len(outbox_ids)
+
+
+async def _run() -> None:
+    while True:
+        try:
+            delivered = await dispatch_once()
+        except Exception as e:
+            print(f"User deletion outbox dispatcher error: {e}")
+            delivered = 0
+
+        if delivered >= config.OUTBOX_BATCH_SIZE:
+            continue
+
+        try:
+            await asyncio.wait_for(_wake_event.wait(), timeout=config.OUTBOX_POLL_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wake_event.clear()
+
+
+def wake() -> None:
+    """
+    Ask the dispatcher to run now instead of waiting for the next poll.
+    """
+    if _wake_event is not None:
+        _wake_event.set()
+
+
+async def start() -> None:
+    global _task, _wake_event
+    if not config.OUTBOX_DISPATCH_ENABLED or _task is not None:
+        return
+    _wake_event = asyncio.Event()
+    _task = asyncio.create_task(_run())
+
+
+async def stop() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
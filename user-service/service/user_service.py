@@ -1,11 +1,21 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Union
 from fastapi import HTTPException, status
+from pydantic import ValidationError
 from model.user import User
 from model.user_create import UserCreate
 from model.user_update import UserUpdate
 from model.user_response import UserResponse
+from model.user_attributes import UserAttributes
+from model.user_bulk import BulkUserResult, BulkUserResponse
+from model.user_search import UserSearch
+from model.user_verify_batch import UserVerification
 from repository import user_repository
 from api.internal_api import poll_service_api
+from service import outbox_dispatcher
+from config.config import Config
+
+config = Config()
 
 
 async def get_by_id(user_id: int) -> Optional[User]:
@@ -19,6 +29,41 @@ async def get_all() -> List[User]:
     return await user_repository.get_all()
 
 
+async def get_page(after_id: Optional[int], limit: int) -> List[User]:
+    return await user_repository.get_page(after_id, limit)
+
+
+async def search(filters: UserSearch, after_id: Optional[int], limit: int) -> List[User]:
+    if filters.min_age is not None and filters.max_age is not None and filters.min_age > filters.max_age:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="min_age must not be greater than max_age"
+        )
+    if filters.joined_from and filters.joined_to and filters.joined_from > filters.joined_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="joined_from must not be after joined_to"
+        )
+    return await user_repository.search(filters, after_id, limit)
+
+
+async def iter_users(after_id: Optional[int] = None) -> AsyncIterator[User]:
+    """
+    Yield all users with id greater than after_id, fetched in keyset batches.
+    """
+    while True:
+        users = await user_repository.get_page(after_id, config.STREAM_BATCH_SIZE)
+        for user in users:
+            yield user
+        if len(users) < config.STREAM_BATCH_SIZE:
+            return
+        after_id = users[-1].id
+
+
+async def get_changed_since(since: datetime, after_id: int, limit: int) -> List[UserAttributes]:
+    return await user_repository.get_changed_since(since, after_id, limit)
+
+
 async def create_user(user: UserCreate) -> int:
     try:
         user_id = await user_repository.create_user(user)
@@ -30,12 +75,81 @@ async def create_user(user: UserCreate) -> int:
         )
 
 
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in error.errors()
+    )
+
+
+async def create_users_bulk(rows: List[Union[dict, str]]) -> BulkUserResponse:
+    """
+    Create many users at once. Each row is a dict of UserCreate fields, or a string
+    describing why it could not be parsed; every row gets its own result instead of
+    failing the whole import.
+    """
+    if len(rows) > config.BULK_USERS_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {config.BULK_USERS_MAX_ROWS} users can be imported at once"
+        )
+
+    # Validation pass: field and email checks plus duplicates within the batch.
+    # Emails are compared lower-cased, as the unique index on users.email does.
+    results = [None] * len(rows)
+    emails = [None] * len(rows)
+    to_insert = {}
+    for index, row in enumerate(rows):
+        if isinstance(row, str):
+            results[index] = ("invalid", row)
+            continue
+        try:
+            user = UserCreate.model_validate(row)
+        except ValidationError as e:
+            results[index] = ("invalid", _validation_detail(e))
+            continue
+        emails[index] = user.email
+        key = user.email.lower()
+        if key in to_insert:
+            results[index] = ("duplicate", f"Email {user.email} appears earlier in this batch")
+        else:
+            to_insert[key] = user
+
+    outcome = {"duplicates": set(), "created": {}}
+    if to_insert:
+        outcome = await user_repository.create_users_bulk(list(to_insert.values()))
+
+    response = []
+    for index, email in enumerate(emails):
+        user_id = None
+        if results[index] is not None:
+            result_status, detail = results[index]
+        elif email.lower() in outcome["duplicates"]:
+            result_status, detail = "duplicate", f"A user with email {email} already exists"
+        else:
+            result_status, detail = "created", None
+            user_id = outcome["created"][email.lower()]
+
+        response.append(BulkUserResult(
+            index=index,
+            email=email,
+            status=result_status,
+            user_id=user_id,
+            detail=detail,
+        ))
+
+    return BulkUserResponse(created=len(outcome["created"]), results=response)
+
+
 async def update_user(user_id: int, user: UserUpdate) -> bool:
     existing_user = await user_repository.get_by_id(user_id)
     if not existing_user:
         return False
 
     updated = await user_repository.update_user(user_id, user)
+    if updated:
+        # Awaited so a client retrying right after this response already sees the
+        # new registration status in the Poll Service.
+        await poll_service_api.notify_users_changed([user_id])
     return updated
 
 
@@ -44,9 +158,9 @@ async def delete_user(user_id: int) -> bool:
     if not existing_user:
         return False
 
-    await poll_service_api.delete_user_answers(user_id)
-
     deleted = await user_repository.delete_user(user_id)
+    if deleted:
+        outbox_dispatcher.wake()
     return deleted
 
 
@@ -56,6 +170,10 @@ async def register_user(user_id: int, is_registered: bool) -> bool:
         return False
 
     updated = await user_repository.register_user(user_id, is_registered)
+    if updated:
+        # Awaited so a client retrying right after this response already sees the
+        # new registration status in the Poll Service.
+        await poll_service_api.notify_users_changed([user_id])
     return updated
 
 
@@ -66,3 +184,19 @@ async def check_user_registered(user_id: int) -> Optional[bool]:
     """
     return await user_repository.check_user_registered(user_id)
 
+
+async def check_users_registered(user_ids: List[int]) -> Dict[int, UserVerification]:
+    """
+    Check many users at once.
+    Returns dict keyed by user id with a UserVerification for every requested id.
+    """
+    unique_ids = list(dict.fromkeys(user_ids))
+    registered = await user_repository.check_users_registered(unique_ids)
+    return {
+        user_id: UserVerification(
+            user_id=user_id,
+            exists=user_id in registered,
+            is_registered=registered.get(user_id, False)
+        )
+        for user_id in unique_ids
+    }
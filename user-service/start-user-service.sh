@@ -29,18 +29,23 @@ docker run -d \
   -e MYSQL_DATABASE=user_db \
   -e MYSQL_ROOT_PASSWORD=root_password \
   -p 3306:3306 \
-  -v "$SCRIPT_DIR/resources/db-migrations:/docker-entrypoint-initdb.d" \
   mysql:8.0 --default-authentication-plugin=mysql_native_password 2>/dev/null || echo "Database container already exists (this is OK)"
 
 echo "⏳ Waiting for MySQL to initialize (15 seconds)..."
 sleep 15
 
+echo "🗄️  Applying database migrations..."
+python migrate.py
+
 echo ""
 echo "✅ Setup complete!"
 echo ""
 echo "To start the User Service, run:"
 echo "  uvicorn main:app --reload --port 8000"
 echo ""
+echo "Or, to use every core, with several worker processes:"
+echo "  WORKERS=4 gunicorn -c gunicorn.conf.py main:app"
+echo ""
 echo "Then open: http://localhost:8000/docs"
 echo ""
 
@@ -0,0 +1,43 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from controller import user_controller
+
+
+def _request(content_type: str, chunks):
+    messages = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {"type": "http", "method": "POST", "headers": [(b"content-type", content_type.encode())]}
+    return Request(scope, receive)
+
+
+def test_csv_rows_are_parsed_across_chunks(run):
+    body = ('\ufefffirst_name,last_name,email,address\r\n'
+            'John,Doe,john@example.com,"1 Main St\nSpringfield"\r\n'
+            '\r\n'
+            'Jane,"O""Brien",jane@example.com,\r\n').encode("utf-8")
+    chunks = [body[i:i + 7] for i in range(0, len(body), 7)]
+
+    rows = run(user_controller._read_bulk_rows(_request("text/csv", chunks)))
+
+    assert rows == [
+        {"first_name": "John", "last_name": "Doe", "email": "john@example.com", "address": "1 Main St\nSpringfield"},
+        {"first_name": "Jane", "last_name": 'O"Brien', "email": "jane@example.com"},
+    ]
+
+
+def test_csv_stops_at_max_rows(run, monkeypatch):
+    monkeypatch.setattr(user_controller.config, "BULK_USERS_MAX_ROWS", 2)
+    header = [b"first_name,email\n"]
+    rows = [b"User,user%d@example.com\n" % i for i in range(3)]
+
+    assert len(run(user_controller._read_bulk_rows(_request("text/csv", header + rows[:2])))) == 2
+    with pytest.raises(HTTPException) as error:
+        # The last chunk is never read: parsing stops at the first row over the cap.
+        run(user_controller._read_bulk_rows(_request("text/csv", header + rows + [b"\xff"])))
+    assert error.value.status_code == 413
@@ -0,0 +1,140 @@
+"""
+Every user_repository / outbox_repository query, EXPLAINed against a seeded database.
+
+Each repository function runs with sample arguments inside a transaction that is
+rolled back, and every statement it issues is EXPLAINed first (see
+service_common.query_plans). A plan row that reads a whole table (type ALL) or a
+whole index (type index) fails the check unless the function is listed in
+FULL_SCAN_ALLOWED because it deliberately reads everything.
+"""
+from datetime import date, datetime
+
+import pytest
+
+from service_common.query_plans import FULL_SCAN_TYPES, PlanRecorder, full_scans, plan_rows
+from service_common.testing import rolled_back
+from model.user_create import UserCreate
+from model.user_update import UserUpdate
+from model.user_search import UserSearch
+from repository import user_repository, outbox_repository
+
+SEED_USERS = 20000
+SEED_OUTBOX_ROWS = 2000
+SEED_EMAIL_DOMAIN = "plan-seed.example.com"
+
+FULL_SCAN_ALLOWED = {
+    "user_repository.get_all",
+    # Range filters that can match most users are left to the optimizer, which may
+    # walk PRIMARY in id order and stop at LIMIT rather than read a secondary index.
+    "user_repository.search.age",
+    "user_repository.search.joining_date",
+    "user_repository.search.registered_joining_date",
+}
+
+# Searches that force an index, so a dropped or renamed index fails here.
+EXPECTED_INDEXES = {
+    "user_repository.search.email": "email",
+    "user_repository.search.last_name": "idx_users_last_name",
+    "user_repository.search.first_name": "idx_users_first_name",
+}
+
+CHECKS = [
+    ("user_repository.get_by_id", lambda: user_repository.get_by_id(1)),
+    ("user_repository.get_all", lambda: user_repository.get_all()),
+    ("user_repository.get_page", lambda: user_repository.get_page(1, 100)),
+    ("user_repository.create_user", lambda: user_repository.create_user(UserCreate(
+        first_name="Plan", last_name="Check", email="plan.check@example.com", age=30,
+        address="1 Plan St", joining_date=date(2024, 1, 1)
+    ))),
+    ("user_repository.create_users_bulk", lambda: user_repository.create_users_bulk([
+        UserCreate(first_name="Plan", last_name="Bulk", email=f"plan.bulk.{i}@example.com", age=30,
+                   address="1 Plan St", joining_date=date(2024, 1, 1))
+        for i in range(3)
+    ])),
+    ("user_repository.update_user", lambda: user_repository.update_user(1, UserUpdate(age=29))),
+    ("user_repository.register_user", lambda: user_repository.register_user(1, True)),
+    ("user_repository.check_user_registered", lambda: user_repository.check_user_registered(1)),
+    ("user_repository.check_users_registered", lambda: user_repository.check_users_registered([1, 2, 3])),
+    ("user_repository.get_changed_since",
+     lambda: user_repository.get_changed_since(datetime(2024, 1, 1), 0, 1000)),
+    ("user_repository.search.email", lambda: user_repository.search(
+        UserSearch(email="john.doe@example.com"), None, 100
+    )),
+    ("user_repository.search.last_name", lambda: user_repository.search(
+        UserSearch(last_name_prefix="Do", first_name_prefix="J"), None, 100
+    )),
+    ("user_repository.search.first_name", lambda: user_repository.search(
+        UserSearch(first_name_prefix="Ja"), None, 100
+    )),
+    ("user_repository.search.age", lambda: user_repository.search(UserSearch(min_age=30, max_age=40), None, 100)),
+    ("user_repository.search.joining_date", lambda: user_repository.search(
+        UserSearch(joined_from=date(2024, 1, 1), joined_to=date(2024, 3, 31)), None, 100
+    )),
+    ("user_repository.search.registered_joining_date", lambda: user_repository.search(
+        UserSearch(is_registered=True, joined_from=date(2024, 1, 1), joined_to=date(2024, 3, 31)), None, 100
+    )),
+    ("user_repository.delete_user", lambda: user_repository.delete_user(3)),
+    ("outbox_repository.claim_due", lambda: outbox_repository.claim_due(100, 60)),
+    ("outbox_repository.mark_failed", lambda: outbox_repository.mark_failed([1], "plan check", 1, 300)),
+    ("outbox_repository.delete_delivered", lambda: outbox_repository.delete_delivered([1])),
+]
+
+
+async def _seed(database) -> None:
+    # Enough rows that the optimizer costs index access the way it would in production
+    # rather than scanning the three sample users.
+    existing = await database.fetch_val(
+        "SELECT COUNT(*) FROM users WHERE email LIKE :pattern", values={"pattern": f"%@{SEED_EMAIL_DOMAIN}"}
+    )
+    if existing:
+        return
+    await database.execute(f"""
+        INSERT /*+ SET_VAR(cte_max_recursion_depth = {SEED_USERS}) */
+        INTO users (first_name, last_name, email, age, address, joining_date, is_registered)
+        WITH RECURSIVE seq (n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < {SEED_USERS})
+        SELECT CONCAT('First', n), CONCAT('Last', n), CONCAT('user', n, '@{SEED_EMAIL_DOMAIN}'),
+               18 + n % 60, CONCAT(n, ' Seed St'), DATE('2020-01-01') + INTERVAL n % 1800 DAY, n % 2
+        FROM seq
+    """)
+    # Mostly future attempts, as in steady state where few deletions are due at once.
+    await database.execute(f"""
+        INSERT /*+ SET_VAR(cte_max_recursion_depth = {SEED_OUTBOX_ROWS}) */
+        INTO user_deletion_outbox (user_id, next_attempt_at)
+        WITH RECURSIVE seq (n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < {SEED_OUTBOX_ROWS})
+        SELECT n, CURRENT_TIMESTAMP + INTERVAL ((n % 100) - 5) MINUTE FROM seq
+    """)
+    await database.execute("ANALYZE TABLE users, user_deletion_outbox")
+
+
+@pytest.fixture(scope="module")
+def seeded(db, run):
+    run(_seed(db))
+    return db
+
+
+def _explain(database, call):
+    async def explain():
+        with PlanRecorder(database) as recorder:
+            await call()
+        return recorder.statements
+    return rolled_back(database, explain)
+
+
+@pytest.mark.parametrize("name, call", CHECKS, ids=[name for name, _ in CHECKS])
+def test_query_plan(seeded, run, name, call):
+    statements = run(_explain(seeded, call))
+
+    assert statements, f"{name} issued no statement that could be EXPLAINed"
+    if name not in FULL_SCAN_ALLOWED:
+        assert full_scans(statements) == []
+
+
+@pytest.mark.parametrize("name, index", EXPECTED_INDEXES.items())
+def test_search_reads_expected_index(seeded, run, name, index):
+    statements = run(_explain(seeded, dict(CHECKS)[name]))
+
+    rows = plan_rows(statements, "users")
+    assert rows, f"{name} did not read users"
+    for row in rows:
+        assert row["key"] == index
+        assert row["type"] not in FULL_SCAN_TYPES
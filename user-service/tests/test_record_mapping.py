@@ -0,0 +1,28 @@
+"""
+_to_user builds a User from databases' own Record objects (databases 0.9.0,
+MySQL backend) without validation; the result must match what validating the
+same row produces, including MySQL's 0/1 for BOOLEAN.
+"""
+from datetime import date
+
+from service_common.testing import fetch_canned
+from model.user import User
+from repository import user_repository
+
+
+def test_to_user_matches_validated_model(run):
+    columns = [column.strip() for column in user_repository._COLUMNS.split(",")]
+    rows = [
+        (1, "John", "Doe", "john.doe@example.com", 28, "123 Main St", date(2024, 1, 15), 1),
+        (3, "Bob", "Johnson", "bob.johnson@example.com", 45, "789 Pine Rd", date(2024, 3, 10), 0),
+    ]
+
+    records = run(fetch_canned(columns, rows))
+    users = [user_repository._to_user(record) for record in records]
+
+    assert users == [User(**dict(zip(columns, row))) for row in rows]
+    assert [user.is_registered for user in users] == [True, False]
+    assert users[0].model_dump_json() == (
+        '{"id":1,"first_name":"John","last_name":"Doe","email":"john.doe@example.com","age":28,'
+        '"address":"123 Main St","joining_date":"2024-01-15","is_registered":true}'
+    )
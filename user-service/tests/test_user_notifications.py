@@ -0,0 +1,44 @@
+import httpx
+import pytest
+
+from api.internal_api import poll_service_api
+from service import user_service
+
+
+@pytest.fixture
+def user_7(monkeypatch):
+    async def get_by_id(user_id):
+        return {"id": user_id}
+
+    async def register_user(user_id, is_registered):
+        return True
+
+    monkeypatch.setattr(user_service.user_repository, "get_by_id", get_by_id)
+    monkeypatch.setattr(user_service.user_repository, "register_user", register_user)
+
+
+def test_registration_change_is_notified_before_returning(run, monkeypatch, user_7):
+    notified = []
+
+    async def notify_users_changed(user_ids):
+        notified.append(user_ids)
+        return True
+
+    monkeypatch.setattr(user_service.poll_service_api, "notify_users_changed", notify_users_changed)
+
+    assert run(user_service.register_user(7, True))
+    assert notified == [[7]]
+
+
+def test_slow_poll_service_does_not_fail_the_write(run, monkeypatch, user_7):
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    client = httpx.AsyncClient(base_url="http://poll-service", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(poll_service_api, "get_client", lambda: client)
+
+    assert run(user_service.register_user(7, False))
+    assert timeouts == [poll_service_api.config.POLL_SERVICE_NOTIFY_TIMEOUT_SECONDS]
@@ -0,0 +1,18 @@
+import pytest
+
+from model.user_search import UserSearch
+from repository.user_repository import _search_index
+
+
+@pytest.mark.parametrize("filters, index", [
+    (UserSearch(email="john.doe@example.com", last_name_prefix="Do"), "email"),
+    (UserSearch(last_name_prefix="Do", first_name_prefix="J", min_age=30), "idx_users_last_name"),
+    (UserSearch(first_name_prefix="Ja", joined_from="2024-01-01"), "idx_users_first_name"),
+    (UserSearch(is_registered=True, joined_to="2024-03-31", min_age=30), None),
+    (UserSearch(joined_from="2024-01-01", max_age=40), None),
+    (UserSearch(is_registered=False, min_age=30), None),
+    (UserSearch(is_registered=True), None),
+    (UserSearch(), None),
+])
+def test_search_index_follows_filter_precedence(filters, index):
+    assert _search_index(filters) == index